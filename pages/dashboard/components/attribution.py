@@ -0,0 +1,171 @@
+import pandas as pd
+import plotly.graph_objects as go
+import streamlit as st
+from streamlit_extras.stylable_container import stylable_container
+from streamlit_gsheets import GSheetsConnection
+
+from utilities.aggregates import networth_series
+from utilities.attribution import get_attribution, summarize_attribution
+from utilities.helper import format_dollars, get_config_value
+
+PERIODS = ["Last Snapshot", "Year to Date", "Last 12 Months", "All Time"]
+
+
+@st.dialog("Net Worth Attribution", width="large")
+def attribution__dialog(df: pd.DataFrame):
+    st.dataframe(
+        df.drop(columns=["account_id"]).sort_values(
+            ["full_date", "change"], ascending=[False, True]
+        ),
+        hide_index=True,
+        column_config={
+            "previous_date": st.column_config.DateColumn("From"),
+            "full_date": st.column_config.DateColumn("To"),
+            "institution_name": st.column_config.TextColumn("Institution"),
+            "account_name": st.column_config.TextColumn("Account"),
+            "category": st.column_config.TextColumn("Category"),
+            **{
+                col: st.column_config.NumberColumn(
+                    col.replace("_", " ").title(), format="dollar"
+                )
+                for col in [
+                    "start_balance",
+                    "end_balance",
+                    "change",
+                    "contributions",
+                    "market",
+                ]
+            },
+        },
+    )
+    st.download_button(
+        label="Download",
+        data=df.to_csv(index=False),
+        icon=":material/download:",
+        file_name="networth_attribution.csv",
+    )
+
+
+def period_start(dates: pd.DatetimeIndex, period: str) -> pd.Timestamp:
+    """Last snapshot on or before the start of `period`, the base of the comparison."""
+    if period == "Last Snapshot":
+        return dates[-2]
+    if period == "All Time":
+        return dates[0]
+    if period == "Year to Date":
+        since = pd.Timestamp(dates[-1].year, 1, 1)
+    else:
+        since = dates[-1] - pd.DateOffset(years=1)
+    earlier = dates[dates <= since]
+    return earlier[-1] if len(earlier) else dates[0]
+
+
+def attribution__chart(start: float, end: float, summary: pd.DataFrame) -> go.Figure:
+    text_color = get_config_value("theme.ColorPalette.textColor")
+    steps = [("Start", start, "absolute")]
+    steps += [
+        (f"{row['category']} contributions", row["contributions"], "relative")
+        for _, row in summary.iterrows()
+        if row["contributions"] != 0
+    ]
+    steps += [
+        (f"{row['category']} market", row["market"], "relative")
+        for _, row in summary.iterrows()
+        if row["market"] != 0
+    ]
+    steps.append(("End", end, "total"))
+    labels, values, measures = zip(*steps)
+
+    fig = go.Figure(
+        go.Waterfall(
+            x=labels,
+            y=values,
+            measure=measures,
+            connector=dict(line=dict(color=text_color, width=1, dash="dot")),
+            increasing=dict(
+                marker=dict(color=get_config_value("theme.ColorPalette.blue"))
+            ),
+            decreasing=dict(
+                marker=dict(color=get_config_value("theme.ColorPalette.primaryColor"))
+            ),
+            totals=dict(marker=dict(color=text_color)),
+            hovertemplate="<b>%{x}:</b> $%{y:,.0f}<extra></extra>",
+        )
+    )
+    fig.update_layout(
+        height=350,
+        template="simple_white",
+        margin=dict(l=0, r=0, t=0, b=0),
+        paper_bgcolor="rgba(0,0,0,0)",
+        plot_bgcolor="rgba(0,0,0,0)",
+        showlegend=False,
+        yaxis=dict(
+            tickformat="$,.0f",
+            tickfont=dict(color=text_color),
+            showgrid=False,
+            showline=False,
+            fixedrange=True,
+        ),
+        xaxis=dict(tickfont=dict(color=text_color), showgrid=False, fixedrange=True),
+    )
+    return fig
+
+
+def networth_attribution_tile(conn: GSheetsConnection):
+
+    ## LOAD DATA
+    networth = networth_series(conn=conn).set_index("full_date")["networth"]
+    attribution = get_attribution(conn=conn)
+    if len(networth) < 2:
+        return
+
+    ## CREATE TILE
+    with stylable_container(
+        key="networth_attribution_component",
+        css_styles="""
+            {
+                background-color: #e3d8cc;
+                padding: 1rem 1rem 1rem 1rem;
+                border-radius: 0.5rem;
+                border-width: 0px;
+                border-style: solid;
+            }
+        """,
+    ):
+        col1, col2 = st.columns([8, 2])
+        with col2:
+            period = st.selectbox(
+                "Period",
+                options=PERIODS,
+                index=0,
+                label_visibility="collapsed",
+                key="attribution_period",
+            )
+            if st.button(
+                "☰ View", use_container_width=True, key="attribution_view_button"
+            ):
+                attribution__dialog(df=attribution)
+
+        since = period_start(networth.index, period)
+        summary = summarize_attribution(attribution, since=since)
+        start, end = networth.loc[since], networth.iloc[-1]
+
+        with col1:
+            st.markdown("### What Moved Net Worth")
+            metric_cols = st.columns(3)
+            metric_cols[0].metric("Change", format_dollars(end - start))
+            metric_cols[1].metric(
+                "Contributions", format_dollars(summary["contributions"].sum())
+            )
+            metric_cols[2].metric("Market", format_dollars(summary["market"].sum()))
+            st.caption(
+                f"{since:%b %d, %Y} to {networth.index[-1]:%b %d, %Y}. "
+                "Contributions are the transactions recorded in each account; "
+                "market is the rest of its balance change."
+            )
+
+        st.plotly_chart(
+            attribution__chart(start=start, end=end, summary=summary),
+            use_container_width=True,
+            config={"displayModeBar": False},
+        )
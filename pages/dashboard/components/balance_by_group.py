@@ -1,12 +1,12 @@
 import streamlit as st
-import pandas as pd
 import plotly.graph_objects as go
-import plotly.express as px
 
 from streamlit_extras.stylable_container import stylable_container
 
 from streamlit_gsheets import GSheetsConnection
 from utilities.helper import get_config_value
+from utilities.rollups import GRANULARITIES, STATISTICS, get_rollups
+from utilities.snapshots import asof_version, get_asof_balances, group_accounts
 
 
 def balance_by_group_tile(conn: GSheetsConnection):
@@ -43,22 +43,10 @@ def balance_by_group_tile(conn: GSheetsConnection):
         """,
     ):
         # --- Data ---
-        df = conn.query(
-            """
-            SELECT
-                full_date, 
-                category, 
-                CASE WHEN category = 'Home' THEN 'Home Equity' ELSE account_type END AS account_group, 
-                SUM(balance) AS total_balance
-            FROM balances
-            GROUP BY full_date, category, account_group
-            ORDER BY full_date, category, account_group;
-            """
-        )
-        df["full_date"] = pd.to_datetime(df["full_date"])
+        asof = get_asof_balances(conn=conn)
 
         # --- Controls ---
-        cols_top = st.columns([8, 1.25, 1.25])
+        cols_top = st.columns([6.75, 1.25, 1.25, 1.25])
         with cols_top[0]:
             st.markdown("### Balance by Group")
 
@@ -68,24 +56,36 @@ def balance_by_group_tile(conn: GSheetsConnection):
             )
 
         with cols_top[2]:
+            selected_granularity = st.selectbox(
+                "Period:", options=list(GRANULARITIES), index=0
+            )
+            selected_statistic = st.selectbox(
+                "Value:",
+                options=STATISTICS,
+                index=0,
+                format_func=str.title,
+                disabled=GRANULARITIES[selected_granularity] is None,
+            )
+
+        with cols_top[3]:
             selected_filltrace = st.toggle("Fill Traces", value=True)
             selected_stacktrace = (
                 st.toggle("Stack Traces", value=True) if selected_filltrace else False
             )
 
         # --- Aggregates ---
-        df_category = (
-            df.groupby(["full_date", "category"])["total_balance"].sum().reset_index()
+        group_col = "category" if selected_group == "Category" else "account_group"
+        daily = group_accounts(asof, conn=conn, by=group_col)
+        rollups = get_rollups(
+            conn=conn, name=group_col, daily=daily, version=asof_version(conn=conn)
         )
-        df_account_group = (
-            df.groupby(["full_date", "account_group"])["total_balance"]
-            .sum()
+        chart_df = (
+            rollups.series(selected_granularity, selected_statistic)
+            .rename_axis("full_date")
             .reset_index()
+            .melt(id_vars="full_date", value_name="total_balance")
         )
 
-        chart_df = df_category if selected_group == "Category" else df_account_group
-        group_col = "category" if selected_group == "Category" else "account_group"
-
         # --- Chart Columns ---
         cols_chart = st.columns([4, 0.5, 6])
 
@@ -135,7 +135,7 @@ def balance_by_group_tile(conn: GSheetsConnection):
                     zerolinewidth=1,
                     fixedrange=True,
                     constrain="domain",
-                    range=[df["full_date"].min(), df["full_date"].max()],
+                    range=[asof.index.min(), asof.index.max()],
                 ),
                 yaxis=dict(
                     tickformat="$,.0f",
@@ -175,12 +175,12 @@ def balance_by_group_tile(conn: GSheetsConnection):
 
         # --- Sunburst Chart ---
         with cols_chart[0]:
-            latest_date = df["full_date"].max()
-            latest_df = df[df["full_date"] == latest_date]
-
             sunburst_data = (
-                latest_df.groupby(["category", "account_group"])["total_balance"]
-                .sum()
+                group_accounts(
+                    asof.iloc[[-1]], conn=conn, by=["category", "account_group"]
+                )
+                .iloc[0]
+                .rename("total_balance")
                 .reset_index()
             )
 
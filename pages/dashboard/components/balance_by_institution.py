@@ -3,6 +3,8 @@ import numpy as np
 import streamlit as st
 from streamlit_extras.stylable_container import stylable_container
 
+from utilities.anomalies import get_balance_anomalies
+from utilities.snapshots import get_asof_balances, group_accounts
 from utilities.helper import get_config_value
 
 
@@ -13,25 +15,14 @@ def generate_balance_change_tables(conn, num_entries=6):
     Returns:
         Tuple[pd.DataFrame, ...]: A tuple of unstyled DataFrames (one per category).
     """
-    df = conn.read(worksheet="balances")
-    df["full_date"] = pd.to_datetime(df["full_date"])
-    df = df.sort_values("full_date")
-
-    # Filter to the last N unique dates
-    recent_dates = df["full_date"].drop_duplicates().sort_values().iloc[-num_entries:]
-    df_filtered = df[df["full_date"].isin(recent_dates)]
-
-    # Pivot balances
-    pivot_df = (
-        df_filtered.pivot_table(
-            index=["category", "institution_name"],
-            columns="full_date",
-            values="balance",
-            aggfunc="sum",
-        )
-        .sort_index(axis=1)
-        .fillna(0)
-    )
+    # Last N snapshot dates; accounts not updated on a date keep their last balance
+    recent = get_asof_balances(conn=conn).iloc[-num_entries:]
+    pivot_df = group_accounts(
+        recent, conn=conn, by=["category", "institution_name"]
+    ).T.sort_index(axis=1)
+
+    # Institutions with no open accounts in the window are left out
+    pivot_df = pivot_df[(pivot_df != 0).any(axis=1)]
 
     # Format column names
     pivot_df.columns = [
@@ -88,10 +79,23 @@ def generate_balance_change_tables(conn, num_entries=6):
     return tuple(result_tables)
 
 
-def style_balance_change_tables(tables_tuple):
+def anomaly_cells(anomalies: pd.DataFrame) -> set:
+    """(category, institution_name, date column) of every flagged balance."""
+    return set(
+        zip(
+            anomalies["category"],
+            anomalies["institution_name"],
+            pd.to_datetime(anomalies["full_date"]).dt.strftime("%Y-%m-%d"),
+        )
+    )
+
+
+def style_balance_change_tables(tables_tuple, anomalies: set = frozenset()):
     """
     Apply conditional styling to a tuple of balance DataFrames.
 
+    Balances in `anomalies` (see `anomaly_cells`) are highlighted.
+
     Returns:
         Tuple[Styler, ...]: A tuple of styled DataFrames.
     """
@@ -135,6 +139,12 @@ def style_balance_change_tables(tables_tuple):
                         style += f"background-color: {get_config_value('theme.ColorPalette.secondaryBackgroundColor')}; font-weight: bold;"
                     if col in ["Last Change", "Change"]:
                         style = highlight_change(df.loc[i], col)
+                    elif (
+                        df.loc[i, "category"],
+                        df.loc[i, "institution_name"],
+                        col,
+                    ) in anomalies:
+                        style = f"background-color: {get_config_value('theme.ColorPalette.yellow')}; font-weight: bold"
                     style_df.at[i, col] = style.strip("; ")
             return style_df
 
@@ -191,7 +201,14 @@ def balance_by_institution_over_time_tile(conn):
         raw_tables = generate_balance_change_tables(
             conn, num_entries=selected_number_of_periods
         )
-        styled_tables = style_balance_change_tables(raw_tables)
+        anomalies = get_balance_anomalies(conn=conn)
+        anomalies = anomalies[
+            anomalies["full_date"]
+            >= get_asof_balances(conn=conn).index[-selected_number_of_periods:].min()
+        ]
+        styled_tables = style_balance_change_tables(
+            raw_tables, anomalies=anomaly_cells(anomalies)
+        )
 
         # === Manual Rendering ===
         for raw_df, styled_df in zip(raw_tables, styled_tables):
@@ -227,3 +244,40 @@ def balance_by_institution_over_time_tile(conn):
                 hide_index=True,
                 use_container_width=True,
             )
+
+        # === Anomalies ===
+        if not anomalies.empty:
+            with st.expander(f"⚠️ {len(anomalies)} unusual balance changes"):
+                st.caption(
+                    "Highlighted balances changed far more than the account usually "
+                    "does, or look like a typo. Check them against your statements."
+                )
+                st.dataframe(
+                    anomalies.sort_values("full_date", ascending=False),
+                    column_order=[
+                        "full_date",
+                        "institution_name",
+                        "account_name",
+                        "previous",
+                        "balance",
+                        "change",
+                        "reason",
+                    ],
+                    column_config={
+                        "full_date": st.column_config.DateColumn("Date"),
+                        "institution_name": st.column_config.TextColumn("Institution"),
+                        "account_name": st.column_config.TextColumn("Account"),
+                        "previous": st.column_config.NumberColumn(
+                            "Previous", format="dollar"
+                        ),
+                        "balance": st.column_config.NumberColumn(
+                            "Balance", format="dollar"
+                        ),
+                        "change": st.column_config.NumberColumn(
+                            "Change", format="dollar"
+                        ),
+                        "reason": st.column_config.TextColumn("Reason"),
+                    },
+                    hide_index=True,
+                    use_container_width=True,
+                )
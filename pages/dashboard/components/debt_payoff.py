@@ -0,0 +1,196 @@
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import streamlit as st
+from streamlit_extras.stylable_container import stylable_container
+from streamlit_gsheets import GSheetsConnection
+
+from utilities.debts import (
+    STRATEGIES,
+    debt_payoff_months,
+    get_debts,
+    get_payoff,
+    payoff_orders,
+)
+from utilities.helper import format_dollars, get_config_value
+
+
+def format_months(months: float) -> str:
+    """Months as "3 yr 4 mo"; "Never" for NaN."""
+    if np.isnan(months):
+        return "Never"
+    years, rest = divmod(int(months), 12)
+    if not years:
+        return f"{rest} mo"
+    return f"{years} yr {rest} mo" if rest else f"{years} yr"
+
+
+def payoff__chart(simulation: dict) -> go.Figure:
+    """Total balance owed per strategy, month by month."""
+    text_color = get_config_value("theme.ColorPalette.textColor")
+    colors = [
+        get_config_value("theme.ColorPalette.primaryColor"),
+        get_config_value("theme.ColorPalette.blue"),
+        text_color,
+    ]
+    totals = simulation["balances"].sum(axis=2)
+    dates = pd.date_range(
+        pd.Timestamp.today().normalize(),
+        periods=totals.shape[1],
+        freq=pd.DateOffset(months=1),
+    )
+
+    fig = go.Figure()
+    for strategy, values, color in zip(STRATEGIES, totals, colors):
+        fig.add_trace(
+            go.Scatter(
+                x=dates,
+                y=values,
+                mode="lines",
+                name=strategy,
+                line=dict(color=color, width=2),
+                hovertemplate=(
+                    f"<b>{strategy}</b><br>%{{x|%b %Y}}: $%{{y:,.0f}}<extra></extra>"
+                ),
+            )
+        )
+    fig.update_layout(
+        height=300,
+        template="simple_white",
+        margin=dict(l=0, r=0, t=0, b=0),
+        paper_bgcolor="rgba(0,0,0,0)",
+        plot_bgcolor="rgba(0,0,0,0)",
+        legend=dict(orientation="h", y=-0.15, font=dict(color=text_color)),
+        yaxis=dict(
+            tickformat="$,.0f",
+            tickfont=dict(color=text_color),
+            showgrid=False,
+            fixedrange=True,
+        ),
+        xaxis=dict(tickfont=dict(color=text_color), showgrid=False, fixedrange=True),
+    )
+    return fig
+
+
+def debt_payoff_tile(conn: GSheetsConnection):
+
+    ## LOAD DATA
+    debts = get_debts(conn=conn)
+    if debts.empty:
+        return
+
+    ## CREATE TILE
+    with stylable_container(
+        key="debt_payoff_component",
+        css_styles="""
+            {
+                background-color: #e3d8cc;
+                padding: 1rem 1rem 1rem 1rem;
+                border-radius: 0.5rem;
+                border-width: 0px;
+                border-style: solid;
+            }
+        """,
+    ):
+        col1, col2 = st.columns([8, 2])
+        with col1:
+            st.markdown("### Debt Payoff")
+            st.caption(
+                "Every plan pays all minimums plus the extra amount each month; "
+                "a cleared debt's payment rolls over to the next. Avalanche pays "
+                "the highest rate first, snowball the smallest balance, custom "
+                "your priority."
+            )
+        with col2:
+            extra_payment = st.number_input(
+                "Extra / Month",
+                min_value=0.0,
+                value=0.0,
+                step=50.0,
+                key="debt_extra_payment",
+            )
+
+        # Custom priority starts from the avalanche order
+        default_priority = np.empty(len(debts), dtype=int)
+        default_priority[payoff_orders(debts, range(len(debts)))[0]] = np.arange(
+            1, len(debts) + 1
+        )
+        edited = st.data_editor(
+            debts.assign(priority=default_priority),
+            hide_index=True,
+            use_container_width=True,
+            disabled=["name", "balance", "interest_rate", "minimum_payment"],
+            column_order=[
+                "name",
+                "balance",
+                "interest_rate",
+                "minimum_payment",
+                "priority",
+            ],
+            column_config={
+                "name": st.column_config.TextColumn("Account"),
+                "balance": st.column_config.NumberColumn("Balance", format="dollar"),
+                "interest_rate": st.column_config.NumberColumn("APR", format="percent"),
+                "minimum_payment": st.column_config.NumberColumn(
+                    "Minimum", format="dollar"
+                ),
+                "priority": st.column_config.NumberColumn(
+                    "Custom Priority",
+                    min_value=1,
+                    step=1,
+                    required=True,
+                    help="Order the custom plan pays extra toward (1 first).",
+                ),
+            },
+            key="debt_custom_priority",
+        )
+
+        summary, simulation = get_payoff(
+            conn=conn,
+            extra_payment=extra_payment,
+            custom=edited["priority"].fillna(len(debts)).tolist(),
+        )
+
+        metric_cols = st.columns(len(summary))
+        for col, (_, row) in zip(metric_cols, summary.iterrows()):
+            col.metric(
+                row["strategy"],
+                format_months(row["months"]),
+                delta=(
+                    f"{format_dollars(row['interest'])} interest"
+                    if not np.isnan(row["months"])
+                    else "Payments below interest"
+                ),
+                delta_color="off",
+            )
+
+        st.plotly_chart(
+            payoff__chart(simulation),
+            use_container_width=True,
+            config={"displayModeBar": False},
+        )
+
+        with st.expander("Payoff Dates"):
+            months = debt_payoff_months(simulation)
+            st.dataframe(
+                pd.DataFrame(
+                    {
+                        "Account": debts["name"],
+                        **{
+                            strategy: [format_months(m) for m in months[i]]
+                            for i, strategy in enumerate(STRATEGIES)
+                        },
+                    }
+                ),
+                hide_index=True,
+                use_container_width=True,
+            )
+
+        missing = debts.loc[
+            (debts["interest_rate"] == 0) | (debts["minimum_payment"] == 0), "name"
+        ]
+        if len(missing):
+            st.caption(
+                f"Rate or minimum payment is 0 for {', '.join(missing)}; set "
+                "`interest_rate` and `minimum_payment` on the accounts sheet."
+            )
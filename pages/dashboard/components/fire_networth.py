@@ -4,13 +4,9 @@ import pandas as pd
 import numpy as np
 from streamlit_extras.stylable_container import stylable_container
 
-from utilities.gsheets import load_worksheet
+from utilities.aggregates import fi_targets
 from pages.dashboard.functions.charts import percent_to_target__chart
 
-from utilities.calculations import *
-from utilities.helper import *
-from pages.dashboard.functions.charts import *
-
 
 @st.dialog("Financial Independence")
 def financial_independence_track__dialog(df: pd.DataFrame):
@@ -60,50 +56,10 @@ def financial_independence_track__dialog(df: pd.DataFrame):
 
 def financial_independence_tile(conn: GSheetsConnection):
 
-    # --- Load and prepare net worth data ---
-    networth_df = (
-        load_worksheet(conn=conn, worksheet="balances")
-        .groupby("full_date")["balance"]
-        .sum()
-        .reset_index()
-        .rename(columns={"balance": "networth"})
-        .assign(full_date=lambda df: pd.to_datetime(df["full_date"]))
-        .sort_values("full_date")
-    )
-
-    # --- Load balances and income data ---
-    balances_df = conn.query("SELECT DISTINCT full_date FROM balances;")
-    income_df = conn.read(worksheet="income")
-
-    # Ensure datetime format for date comparisons
-    balances_df["full_date"] = pd.to_datetime(balances_df["full_date"])
-    income_df["effective_start_date"] = pd.to_datetime(
-        income_df["effective_start_date"]
-    )
-    income_df["effective_end_date"] = pd.to_datetime(
-        income_df["effective_end_date"], errors="coerce"
-    ).fillna(datetime.today())
-
-    # --- Build time series of total income by full_date ---
-    result_df = balances_df.copy()
-    result_df["total_income"] = result_df["full_date"].apply(
-        lambda date: income_df[
-            (income_df["effective_start_date"] <= date)
-            & (income_df["effective_end_date"] >= date)
-        ]["income"].sum()
-    )
-
-    # Calculate dynamic FI target and merge with net worth
-    result_df["financial_independence_target"] = (
-        result_df["total_income"] * st.session_state["replacement_income_rate"]
-    ) / 0.04
-    result_df = result_df.merge(
-        networth_df[["full_date", "networth"]], on="full_date", how="inner"
-    )
-    result_df["percent_to_target"] = (
-        result_df["networth"] / result_df["financial_independence_target"]
+    # --- Net worth vs. income-based FI target per snapshot date ---
+    result_df = fi_targets(
+        conn=conn, replacement_income_rate=st.session_state["replacement_income_rate"]
     )
-    result_df = result_df.sort_values(by=["full_date"], ascending=True)
 
     fire_number = result_df.loc[result_df["full_date"].idxmax()][
         "financial_independence_target"
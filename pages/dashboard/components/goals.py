@@ -0,0 +1,186 @@
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import streamlit as st
+from streamlit_extras.stylable_container import stylable_container
+from streamlit_gsheets import GSheetsConnection
+
+from utilities.goals import (
+    GOAL_COLUMNS,
+    STATUS_BEHIND,
+    STATUS_ON_TRACK,
+    STATUS_REACHED,
+    get_goal_projection,
+    goal_paths,
+    load_goals,
+)
+from utilities.gsheets import write_worksheet
+from utilities.helper import get_config_value
+
+
+@st.dialog("Goals", width="large")
+def goals__dialog(conn: GSheetsConnection):
+    """
+    Edit the `goals` worksheet.
+    """
+    st.caption(
+        "Funding accounts are comma-separated account names (or Institution - "
+        "Account), account types or categories; leave blank to track net worth. "
+        "Expected return is annual (e.g. 0.06); blank uses the Settings return."
+    )
+    goals_df = load_goals(conn=conn).reindex(columns=GOAL_COLUMNS)
+    edited_df = st.data_editor(
+        goals_df,
+        num_rows="dynamic",
+        use_container_width=True,
+        hide_index=True,
+        column_config={
+            "goal": st.column_config.TextColumn("Goal", required=True),
+            "target_amount": st.column_config.NumberColumn(
+                "Target", format="dollar", min_value=0, required=True
+            ),
+            "target_date": st.column_config.TextColumn("Target Date", required=True),
+            "funding_accounts": st.column_config.TextColumn("Funding Accounts"),
+            "expected_return": st.column_config.NumberColumn(
+                "Expected Return", format="%.3f"
+            ),
+        },
+    )
+    if st.button("Save", type="primary"):
+        write_worksheet(conn=conn, worksheet="goals", df=edited_df, base=goals_df)
+        st.success("Goals saved.")
+
+
+def goal_paths__chart(df: pd.DataFrame, months: int) -> go.Figure:
+    """Projected percent of target for each goal over the next `months` months."""
+    text_color = get_config_value("theme.ColorPalette.textColor")
+    dates = pd.date_range(
+        pd.Timestamp.today().normalize(),
+        periods=months + 1,
+        freq=pd.DateOffset(months=1),
+    )
+    target = df["target"].to_numpy()[:, None]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        percent = np.where(target > 0, goal_paths(df, months) / target, np.nan)
+
+    fig = go.Figure()
+    for name, values in zip(df["goal"], percent):
+        fig.add_trace(
+            go.Scatter(
+                x=dates,
+                y=values,
+                mode="lines",
+                name=name,
+                hovertemplate=(
+                    f"<b>{name}</b><br>%{{x|%b %Y}}: %{{y:.0%}}<extra></extra>"
+                ),
+            )
+        )
+    fig.add_hline(y=1, line=dict(color=text_color, width=1, dash="dot"))
+    fig.update_layout(
+        height=350,
+        template="simple_white",
+        margin=dict(l=0, r=0, t=0, b=0),
+        paper_bgcolor="rgba(0,0,0,0)",
+        plot_bgcolor="rgba(0,0,0,0)",
+        legend=dict(orientation="h", y=-0.15, font=dict(color=text_color)),
+        yaxis=dict(
+            tickformat=".0%",
+            tickfont=dict(color=text_color),
+            showgrid=False,
+            fixedrange=True,
+        ),
+        xaxis=dict(tickfont=dict(color=text_color), showgrid=False, fixedrange=True),
+    )
+    return fig
+
+
+def goals_tile(conn: GSheetsConnection):
+
+    ## LOAD DATA
+    df = get_goal_projection(
+        conn=conn,
+        default_return=st.session_state["target_return_on_investment"] or 0.0,
+    )
+
+    ## CREATE TILE
+    with stylable_container(
+        key="goals_component",
+        css_styles="""
+            {
+                background-color: #e3d8cc;
+                padding: 1rem 1rem 1rem 1rem;
+                border-radius: 0.5rem;
+                border-width: 0px;
+                border-style: solid;
+            }
+        """,
+    ):
+        col1, col2 = st.columns([8, 2])
+        with col1:
+            st.markdown("### Goals")
+        with col2:
+            if st.button("☰ Goals", use_container_width=True, key="edit_goals"):
+                goals__dialog(conn=conn)
+
+        if df.empty:
+            st.info(
+                "No goals yet. Use **☰ Goals** to add a target amount, date and "
+                "the accounts that fund it."
+            )
+            return
+
+        metric_cols = st.columns(3)
+        for col, status in zip(
+            metric_cols, [STATUS_REACHED, STATUS_ON_TRACK, STATUS_BEHIND]
+        ):
+            col.metric(status, f"{(df['status'] == status).sum()} of {len(df)}")
+
+        st.dataframe(
+            df.sort_values(["status", "progress"], ascending=[True, False]),
+            hide_index=True,
+            use_container_width=True,
+            column_order=[
+                "goal",
+                "status",
+                "progress",
+                "current",
+                "target",
+                "target_date",
+                "projected",
+                "pace",
+                "required_monthly",
+            ],
+            column_config={
+                "goal": st.column_config.TextColumn("Goal", pinned=True),
+                "status": st.column_config.TextColumn("Status"),
+                "progress": st.column_config.ProgressColumn(
+                    "Progress", format="percent", min_value=0, max_value=1
+                ),
+                "current": st.column_config.NumberColumn("Current", format="dollar"),
+                "target": st.column_config.NumberColumn("Target", format="dollar"),
+                "target_date": st.column_config.TextColumn("By"),
+                "projected": st.column_config.NumberColumn(
+                    "Projected",
+                    format="dollar",
+                    help="Balance by the target date at the expected return and "
+                    "the last year's deposit pace.",
+                ),
+                "pace": st.column_config.NumberColumn(
+                    "Monthly Deposits", format="dollar"
+                ),
+                "required_monthly": st.column_config.NumberColumn(
+                    "Needed Monthly",
+                    format="dollar",
+                    help="Monthly deposit that reaches the target by the date.",
+                ),
+            },
+        )
+
+        with st.expander("Projected Progress"):
+            horizon = int(np.ceil(df["months_left"].max())) or 12
+            st.plotly_chart(
+                goal_paths__chart(df, months=horizon),
+                use_container_width=True,
+                config={"displayModeBar": False},
+            )
@@ -4,11 +4,9 @@ import pandas as pd
 import numpy as np
 from streamlit_extras.stylable_container import stylable_container
 
-from utilities.gsheets import load_worksheet
+from utilities.aggregates import investments_series, networth_series
 from pages.dashboard.functions.charts import percent_to_target__chart
 
-from utilities.calculations import *
-
 TARGET_INVESTMENT_TO_ASSET_RATE = 0.85
 
 
@@ -72,18 +70,9 @@ def investments_to_assets__dialog(df):
 def investments_to_assets_tile(conn: GSheetsConnection):
     """ """
 
-    df = conn.query(
-        """
-        select
-          full_date
-        , sum(balance) as networth
-        , sum(case when category = 'Investments' then balance end) as total_investments
-        , total_investments / networth as investment_to_asset_rate
-        from balances
-        group by full_date
-    """
-    )
-    df["full_date"] = pd.to_datetime(df["full_date"])
+    # Accounts not updated on a date keep their last balance (as-of matrix)
+    df = networth_series(conn=conn).merge(investments_series(conn=conn), on="full_date")
+    df["investment_to_asset_rate"] = df["total_investments"] / df["networth"]
     df["percent_to_target"] = (
         df["investment_to_asset_rate"] / TARGET_INVESTMENT_TO_ASSET_RATE
     )
@@ -3,7 +3,8 @@ from streamlit_gsheets import GSheetsConnection
 import pandas as pd
 from streamlit_extras.stylable_container import stylable_container
 
-from utilities.gsheets import load_worksheet
+from utilities.snapshots import asof_version, get_asof_balances
+from utilities.rollups import GRANULARITIES, get_rollups
 from pages.dashboard.functions.charts import networth__chart
 
 
@@ -28,14 +29,15 @@ def networth_over_time__dialog(df: pd.DataFrame):
 def networth_tile(conn: GSheetsConnection):
 
     ## LOAD DATA
-    balance_df = load_worksheet(conn=conn, worksheet="balances")
-    df = (balance_df.groupby("full_date")["balance"].sum().reset_index()).rename(
-        columns={"balance": "networth"}
-    )
+    # Accounts not updated on a date keep their last balance (as-of matrix)
+    df = get_asof_balances(conn=conn).sum(axis=1).rename("networth").reset_index()
 
-    # Ensure full_date is a datetime object and sort
-    df["full_date"] = pd.to_datetime(df["full_date"])
-    df = df.sort_values("full_date")
+    rollups = get_rollups(
+        conn=conn,
+        name="networth",
+        daily=df.set_index("full_date")[["networth"]],
+        version=asof_version(conn=conn),
+    )
 
     ## CREATE TILE
     with stylable_container(
@@ -66,9 +68,23 @@ def networth_tile(conn: GSheetsConnection):
         with col2:
             if st.button("☰ View", use_container_width=True):
                 networth_over_time__dialog(df=df)
+            granularity = st.selectbox(
+                "Period",
+                options=list(GRANULARITIES),
+                index=0,
+                label_visibility="collapsed",
+            )
+
+        # Bucketed views plot the closing balance with the bucket's low-high range
+        chart_df = rollups.series(granularity, "last")
+        if GRANULARITIES[granularity] is not None:
+            chart_df = chart_df.assign(
+                networth_min=rollups.series(granularity, "min")["networth"],
+                networth_max=rollups.series(granularity, "max")["networth"],
+            )
 
         st.plotly_chart(
-            networth__chart(df=df),
+            networth__chart(df=chart_df.rename_axis("full_date").reset_index()),
             use_container_width=True,
             config={"displayModeBar": False},
         )
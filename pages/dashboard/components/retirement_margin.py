@@ -4,9 +4,8 @@ import pandas as pd
 import numpy as np
 from streamlit_extras.stylable_container import stylable_container
 
-from utilities.gsheets import load_worksheet
-
-from utilities.calculations import *
+from utilities.aggregates import retirement_margin_projection
+from utilities.returns import realized_return
 
 
 @st.dialog("Retirement Margin", width="large")
@@ -88,111 +87,28 @@ def retirement_margin__dialog(df: pd.DataFrame):
 
 def retirement_margin_tile(conn: GSheetsConnection):
 
-    # Load and prepare investment balance data
-    df = (
-        conn.query(
-            """
-            SELECT full_date, SUM(CASE WHEN category = 'Investments' THEN balance END) AS total_investments 
-            FROM balances 
-            GROUP BY full_date
-        """
-        )
-        .assign(full_date=lambda x: pd.to_datetime(x["full_date"]))
-        .sort_values("full_date")
-        .reset_index(drop=True)
-    )
-
-    # Calculate age at each date
-    df["age"] = df["full_date"].apply(
-        lambda d: calculate_age(from_date=st.session_state["birthdate"], to_date=d)
-    )
-
-    # Load and prepare income data
-    income_df = conn.read(worksheet="income")
-    income_df["effective_start_date"] = pd.to_datetime(
-        income_df["effective_start_date"]
-    )
-    income_df["effective_end_date"] = pd.to_datetime(
-        income_df["effective_end_date"], errors="coerce"
-    ).fillna(datetime.today())
-
-    # Calculate total income active at each full_date
-    df["total_income"] = df["full_date"].apply(
-        lambda date: income_df[
-            (income_df["effective_start_date"] <= date)
-            & (income_df["effective_end_date"] >= date)
-        ]["income"].sum()
-    )
-
-    # Calculate derived values
-    df["years_to_retirement"] = st.session_state["target_retirement_age"] - df["age"]
-    replacement_rate = st.session_state["replacement_income_rate"]
-    roi = st.session_state["target_return_on_investment"]
-    savings_rate = st.session_state["target_savings_rate"]
-    inflation = st.session_state["inflation_rate"]
-
-    # Compute current value financial independence target
-    df["financial_independence_target__cv"] = (
-        df["total_income"] * replacement_rate
-    ) / 0.04
-
-    # Calculate future value of current investments
-    df["current_investments__fv"] = df.apply(
-        lambda row: future_value(
-            row["total_investments"], roi, row["years_to_retirement"]
-        ),
-        axis=1,
+    # Investments' money-weighted return to date, optionally used instead of the
+    # assumed return (toggle below; its state is read before it is drawn)
+    realized = realized_return(conn=conn)
+    use_realized = realized is not None and st.session_state.get(
+        "use_realized_return", False
     )
 
-    # Calculate future value of additional monthly investments
-    df["additional_investments__fv"] = df.apply(
-        lambda row: future_value_of_payments(
-            payment=(row["total_income"] * savings_rate) / 12,
-            annual_rate=roi,
-            years=row["years_to_retirement"],
-            payments_per_year=12,
+    # Projected nest egg vs. FI target per snapshot date
+    df = retirement_margin_projection(
+        conn=conn,
+        birthdate=st.session_state["birthdate"],
+        target_retirement_age=st.session_state["target_retirement_age"],
+        replacement_income_rate=st.session_state["replacement_income_rate"],
+        target_return_on_investment=(
+            realized
+            if use_realized
+            else st.session_state["target_return_on_investment"]
         ),
-        axis=1,
+        target_savings_rate=st.session_state["target_savings_rate"],
+        inflation_rate=st.session_state["inflation_rate"],
     )
 
-    # Total projected retirement fund (future value)
-    df["retirement_egg__fv"] = (
-        df["current_investments__fv"] + df["additional_investments__fv"]
-    )
-
-    # Future value of financial independence target, adjusted for inflation
-    df["financial_independence_target__fv"] = df.apply(
-        lambda row: future_value(
-            row["financial_independence_target__cv"],
-            inflation,
-            row["years_to_retirement"],
-        ),
-        axis=1,
-    )
-
-    # Margin in future and present value terms
-    df["retirement_margin__fv"] = (
-        df["retirement_egg__fv"] - df["financial_independence_target__fv"]
-    )
-
-    df["retirement_margin__cv"] = df.apply(
-        lambda row: present_value(
-            row["retirement_margin__fv"], inflation, row["years_to_retirement"]
-        ),
-        axis=1,
-    )
-
-    # Present value of total retirement egg
-    df["retirement_egg__cv"] = df.apply(
-        lambda row: present_value(
-            row["retirement_egg__fv"], inflation, row["years_to_retirement"]
-        ),
-        axis=1,
-    )
-
-    # Estimated annual income in retirement (4% rule)
-    df["est_income_in_retirement__cv"] = df["retirement_egg__cv"] * 0.04
-
     ## CREATE TILE
     with stylable_container(
         key="retirement_margin",
@@ -230,3 +146,14 @@ def retirement_margin_tile(conn: GSheetsConnection):
             value=np.minimum(progress, 1),
             text=f"Percent to Target: **{progress*100:.1f}%**",
         )
+        st.toggle(
+            "Use realized return",
+            key="use_realized_return",
+            disabled=realized is None,
+            help=(
+                f"Project with your investments' {realized:.1%} money-weighted "
+                "return to date instead of the assumed return in Settings."
+                if realized is not None
+                else "Needs investment balances on at least two dates."
+            ),
+        )
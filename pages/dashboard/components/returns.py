@@ -0,0 +1,95 @@
+import pandas as pd
+import streamlit as st
+from streamlit_extras.stylable_container import stylable_container
+from streamlit_gsheets import GSheetsConnection
+
+from utilities.returns import RETURN_WINDOWS, get_realized_returns
+
+RETURN_COLUMN_CONFIG = {
+    "name": st.column_config.TextColumn("Name"),
+    "category": st.column_config.TextColumn("Category"),
+    "end_balance": st.column_config.NumberColumn("Balance", format="dollar"),
+    "contributions": st.column_config.NumberColumn("Contributions", format="dollar"),
+    "gain": st.column_config.NumberColumn("Gain", format="dollar"),
+    "years": st.column_config.NumberColumn("Years", format="%.1f"),
+    "twr_annualized": st.column_config.NumberColumn(
+        "Time-Weighted",
+        format="percent",
+        help="Annualized return with deposits and withdrawals factored out: how "
+        "the holdings performed.",
+    ),
+    "irr": st.column_config.NumberColumn(
+        "Money-Weighted",
+        format="percent",
+        help="Annual internal rate of return of the account's cash flows: how "
+        "your money performed, including the timing of deposits.",
+    ),
+}
+
+
+@st.dialog("Realized Returns", width="large")
+def returns__dialog(df: pd.DataFrame):
+    st.dataframe(
+        df[df["level"] == "Account"].sort_values(["category", "end_balance"]),
+        hide_index=True,
+        use_container_width=True,
+        column_order=list(RETURN_COLUMN_CONFIG),
+        column_config=RETURN_COLUMN_CONFIG,
+    )
+    st.download_button(
+        label="Download",
+        data=df.to_csv(index=False),
+        icon=":material/download:",
+        file_name="realized_returns.csv",
+    )
+
+
+def realized_returns_tile(conn: GSheetsConnection):
+    with stylable_container(
+        key="realized_returns_component",
+        css_styles="""
+            {
+                background-color: #e3d8cc;
+                padding: 1rem 1rem 1rem 1rem;
+                border-radius: 0.5rem;
+                border-width: 0px;
+                border-style: solid;
+            }
+        """,
+    ):
+        col1, col2 = st.columns([8, 2])
+        with col2:
+            window = st.selectbox(
+                "Window",
+                options=list(RETURN_WINDOWS),
+                index=len(RETURN_WINDOWS) - 1,
+                label_visibility="collapsed",
+                key="returns_window",
+            )
+
+        ## LOAD DATA
+        df = get_realized_returns(conn=conn, years=RETURN_WINDOWS[window])
+
+        with col2:
+            if st.button("☰ View", use_container_width=True, key="returns_view"):
+                returns__dialog(df=df)
+        with col1:
+            st.markdown("### Realized Returns")
+            st.caption(
+                "Computed from balance snapshots and the transactions recorded in "
+                "each account. Compare with your assumed "
+                f"{st.session_state['target_return_on_investment']:.1%} return."
+                if st.session_state.get("target_return_on_investment") is not None
+                else "Computed from balance snapshots and the transactions recorded "
+                "in each account."
+            )
+
+        st.dataframe(
+            df[df["level"] == "Category"],
+            hide_index=True,
+            use_container_width=True,
+            column_order=[
+                col for col in RETURN_COLUMN_CONFIG if col not in ("category", "years")
+            ],
+            column_config=RETURN_COLUMN_CONFIG,
+        )
@@ -0,0 +1,113 @@
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import streamlit as st
+from streamlit_extras.stylable_container import stylable_container
+from streamlit_gsheets import GSheetsConnection
+
+from utilities.helper import get_config_value
+from utilities.risk import GROWTH_WINDOWS, get_balance_risk
+
+# Selector label -> column of the daily frame the risk store tracks
+RISK_SERIES = {"Net Worth": "networth", "Investments": "total_investments"}
+
+
+def format_percent(value: float) -> str:
+    return "–" if np.isnan(value) else f"{value:.1%}"
+
+
+def drawdown__chart(history: pd.DataFrame) -> go.Figure:
+    """Drawdown from the running peak at every snapshot."""
+    text_color = get_config_value("theme.ColorPalette.textColor")
+    fig = go.Figure(
+        go.Scatter(
+            x=history.index,
+            y=history["drawdown"],
+            mode="lines",
+            fill="tozeroy",
+            line=dict(color=get_config_value("theme.ColorPalette.primaryColor")),
+            hovertemplate="<b>%{x|%b %d, %Y}:</b> %{y:.1%}<extra></extra>",
+        )
+    )
+    fig.update_layout(
+        height=250,
+        template="simple_white",
+        margin=dict(l=0, r=0, t=0, b=0),
+        paper_bgcolor="rgba(0,0,0,0)",
+        plot_bgcolor="rgba(0,0,0,0)",
+        showlegend=False,
+        yaxis=dict(
+            tickformat=".0%",
+            tickfont=dict(color=text_color),
+            showgrid=False,
+            fixedrange=True,
+        ),
+        xaxis=dict(tickfont=dict(color=text_color), showgrid=False, fixedrange=True),
+    )
+    return fig
+
+
+def risk_tile(conn: GSheetsConnection):
+
+    ## LOAD DATA
+    store = get_balance_risk(conn=conn)
+    if len(store.series) == 0 or len(store.history("networth")) < 2:
+        return
+
+    ## CREATE TILE
+    with stylable_container(
+        key="risk_component",
+        css_styles="""
+            {
+                background-color: #e3d8cc;
+                padding: 1rem 1rem 1rem 1rem;
+                border-radius: 0.5rem;
+                border-width: 0px;
+                border-style: solid;
+            }
+        """,
+    ):
+        col1, col2 = st.columns([8, 2])
+        with col2:
+            series = st.selectbox(
+                "Series",
+                options=list(RISK_SERIES),
+                index=0,
+                label_visibility="collapsed",
+                key="risk_series",
+            )
+        stats = store.stats(RISK_SERIES[series])
+
+        with col1:
+            st.markdown("### Risk & Growth")
+            st.caption(
+                "Volatility is annualized from the change between snapshots; "
+                "drawdowns are measured from the running peak."
+            )
+
+        metric_cols = st.columns(3 + len(GROWTH_WINDOWS))
+        metric_cols[0].metric("Volatility", format_percent(stats["volatility"]))
+        metric_cols[1].metric(
+            "Max Drawdown",
+            format_percent(stats["max_drawdown"]),
+            delta=f"{format_percent(stats['drawdown'])} now",
+            delta_color="off",
+        )
+        metric_cols[2].metric(
+            "Longest Drawdown",
+            f"{stats['longest_drawdown_days'] / 30.4375:.0f} mo",
+            delta=(
+                f"{stats['drawdown_days'] / 30.4375:.0f} mo below peak now"
+                if stats["drawdown_days"]
+                else "At peak"
+            ),
+            delta_color="off",
+        )
+        for col, label in zip(metric_cols[3:], GROWTH_WINDOWS):
+            col.metric(f"Growth, {label}", format_percent(stats[label]))
+
+        st.plotly_chart(
+            drawdown__chart(store.history(RISK_SERIES[series])),
+            use_container_width=True,
+            config={"displayModeBar": False},
+        )
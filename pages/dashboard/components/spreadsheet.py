@@ -1,27 +1,47 @@
 import streamlit as st
-from utilities.auth import *
 from streamlit_gsheets import GSheetsConnection
 import pandas as pd
-import plotly.graph_objects as go
 from streamlit_extras.stylable_container import stylable_container
 
-from utilities.sidebar import show_app_sidebar
-from utilities.helper import *
-from utilities.gsheets import *
+from utilities.helper import convert_for_download
+from utilities.snapshots import get_asof_balances, group_accounts
+from utilities.wide_balances import TOTAL_COLUMN, get_wide_balances
+
+PAGE_SIZE_OPTIONS = [25, 50, 100, 250]
+
+
+def recent_group_balances(conn: GSheetsConnection, by: str) -> pd.DataFrame:
+    """
+    Balance per account group on the latest and the previous snapshot date.
+
+    Returns:
+    - pd.DataFrame: `cat`, `current_balance`, `last_balance` and `difference`, one
+      row per group with a balance on either date.
+    """
+    asof = get_asof_balances(conn=conn)
+    recent = group_accounts(asof.iloc[-2:], conn=conn, by=by)
+    df = pd.DataFrame(
+        {
+            "current_balance": recent.iloc[-1],
+            "last_balance": recent.iloc[0],
+        }
+    ).rename_axis("cat")
+    df = df[(df["current_balance"] != 0) | (df["last_balance"] != 0)]
+    return df.assign(
+        difference=df["current_balance"] - df["last_balance"]
+    ).reset_index()
 
 
 def balances_spreadsheet(conn: GSheetsConnection):
 
-    # Read Balances (convert to datetime, and round balance)
-    balances_df = conn.read(worksheet="balances").assign(
-        full_date=lambda x: pd.to_datetime(x["full_date"]),
-        balance=lambda x: x["balance"].round(2),
-    )
+    # Date × account balances, regrouped only when the worksheets change
+    store = get_wide_balances(conn=conn)
+    if store.wide.empty:
+        st.info("Add balances to see them here.")
+        return
 
-    # Read Recent Categorized Balances
-    recent_category_balances_df = read_sql(
-        conn=conn, ddl="pages/dashboard/ddl/categorized_balances_most_recent.sql"
-    )
+    # Latest vs previous snapshot per asset class, balances carried forward
+    recent_category_balances_df = recent_group_balances(conn=conn, by="asset_class")
 
     # Create a column per category balance
     cols = st.columns(len(recent_category_balances_df))
@@ -47,41 +67,62 @@ def balances_spreadsheet(conn: GSheetsConnection):
                     delta_color="normal",  # or use "inverse"/"off"/"normal" as needed
                 )
 
-    # Pivot Long Balances to Wide-on-Account Balances
-    balances_df_pivot = balances_df.pivot(
-        index="full_date",
-        values="balance",
-        columns=[
-            "institution_name",
-            "account_name",
-        ],
-    ).fillna(0)
-
-    # Add the 'Total' column by summing across all existing columns
-    total_col = (
-        "Total",
-        "Networth",
-    )
-    balances_df_pivot[total_col] = balances_df_pivot.sum(axis=1)
+    # --- Window Controls ---
+    dates = store.wide.index
+    accounts = [col for col in store.wide.columns if col != TOTAL_COLUMN]
+
+    controls = st.columns([2, 5, 1, 1])
+    with controls[0]:
+        date_range = st.date_input(
+            "Date Range",
+            value=(dates.min().date(), dates.max().date()),
+            min_value=dates.min().date(),
+            max_value=dates.max().date(),
+        )
+    with controls[1]:
+        selected_accounts = st.multiselect(
+            "Accounts",
+            options=accounts,
+            format_func=lambda col: f"{col[0]} · {col[1]}",
+            placeholder="All accounts",
+        )
+    with controls[2]:
+        page_size = st.selectbox("Rows", options=PAGE_SIZE_OPTIONS, index=1)
+
+    # A range picker returns a single date while the user is mid-selection
+    start_date = pd.Timestamp(date_range[0])
+    end_date = pd.Timestamp(date_range[-1])
+    selected_accounts = selected_accounts or None
 
-    # Reorder columns
-    balances_df_pivot = balances_df_pivot[
-        [total_col] + [col for col in balances_df_pivot.columns if col != total_col]
-    ]
+    _, total_rows = store.window(start_date, end_date, selected_accounts, page_size=1)
+    with controls[3]:
+        page = st.number_input(
+            "Page",
+            min_value=1,
+            max_value=max(1, -(-total_rows // page_size)),
+            value=1,
+        )
 
-    # Show DataFrame (ordered full_date desc)
+    # Only the visible page is materialized and sent to the browser
+    page_df, _ = store.window(
+        start_date, end_date, selected_accounts, page=page, page_size=page_size
+    )
     st.dataframe(
-        balances_df_pivot.sort_values(by="full_date", ascending=False),
+        page_df,
         column_config={
             "full_date": st.column_config.DateColumn("Date", format="MM/DD/YYYY"),
         },
         height=550,
     )
+    st.caption(f"Showing {len(page_df):,} of {total_rows:,} dates.")
 
-    # Download Button
+    # Download Button (selected date range and accounts, all pages)
+    range_df, _ = store.window(
+        start_date, end_date, selected_accounts, page_size=max(total_rows, 1)
+    )
     st.download_button(
         label="Download CSV",
-        data=convert_for_download(balances_df_pivot),
+        data=convert_for_download(range_df),
         file_name="data.csv",
         mime="text/csv",
         icon=":material/download:",
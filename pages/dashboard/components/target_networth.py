@@ -4,10 +4,11 @@ import pandas as pd
 import numpy as np
 from streamlit_extras.stylable_container import stylable_container
 
-from utilities.gsheets import load_worksheet
+from utilities.aggregates import networth_series
+from utilities.gsheets import read_sql
 from pages.dashboard.functions.charts import percent_to_target__chart
 
-from utilities.calculations import *
+from utilities.calculations import calculate_age, calculate_target_networth
 
 
 @st.dialog("Target Networth")
@@ -60,20 +61,13 @@ def target_networth_rate__dialog(df: pd.DataFrame):
 def target_networth_tile(conn: GSheetsConnection):
 
     # --- Load and prepare net worth data ---
-    networth_df = (
-        load_worksheet(conn=conn, worksheet="balances")
-        .groupby("full_date")["balance"]
-        .sum()
-        .reset_index()
-        .rename(columns={"balance": "networth"})
-    )
-    networth_df["full_date"] = pd.to_datetime(networth_df["full_date"])
-    networth_df = networth_df.sort_values("full_date")
+    networth_df = networth_series(conn=conn)
 
     # --- Calculate overall target and progress ---
     current_age = calculate_age(from_date=st.session_state["birthdate"])
-    income = conn.query(
-        "select sum(income) as total_income from income where effective_end_date = '12/31/9999';"
+    income = read_sql(
+        conn,
+        "select sum(income) as total_income from income where effective_end_date = '12/31/9999';",
     )
     total_income = income["total_income"].loc[0]
     target_networth = calculate_target_networth(
@@ -8,19 +8,8 @@ from utilities.gsheets import (
     settings_assumptions,
 )
 
-from pages.dashboard.components.spreadsheet import balances_spreadsheet
-from pages.dashboard.components.networth import networth_tile
-from pages.dashboard.components.target_networth import target_networth_tile
-from pages.dashboard.components.fire_networth import financial_independence_tile
-from pages.dashboard.components.investments_to_assets import investments_to_assets_tile
-from pages.dashboard.components.retirement_margin import retirement_margin_tile
-from pages.dashboard.components.balance_by_group import balance_by_group_tile
-from pages.dashboard.components.balance_by_institution import (
-    balance_by_institution_over_time_tile,
-)
-
-from utilities.helper import *
-
+from utilities.helper import check_balance_staleness, check_fx_rates, render_footer
+from utilities.metrics import tile_timer
 
 # ----------------- HEADER ----------------- #
 st.set_page_config(layout="wide", page_title="Product Dashboard")
@@ -37,7 +26,7 @@ with header_cols[0]:
 with header_cols[1]:
     st.write("")
     st.write("")
-    refresh_connection()
+    refresh_connection(conn=conn)
 with header_cols[2]:
     st.write("")
     st.write("")
@@ -45,43 +34,91 @@ with header_cols[2]:
         settings_assumptions(conn=conn)
 
 check_balance_staleness(conn)
+check_fx_rates(conn)
 
 ## ----------- BALANCES DASHBOARD ----------- ##
 if view_type == "Dashboard":
 
+    # Tile components (and Plotly) are only imported for the view that needs them
+    from pages.dashboard.components.networth import networth_tile
+    from pages.dashboard.components.attribution import networth_attribution_tile
+    from pages.dashboard.components.returns import realized_returns_tile
+    from pages.dashboard.components.risk import risk_tile
+    from pages.dashboard.components.goals import goals_tile
+    from pages.dashboard.components.debt_payoff import debt_payoff_tile
+    from pages.dashboard.components.target_networth import target_networth_tile
+    from pages.dashboard.components.fire_networth import financial_independence_tile
+    from pages.dashboard.components.investments_to_assets import (
+        investments_to_assets_tile,
+    )
+    from pages.dashboard.components.retirement_margin import retirement_margin_tile
+    from pages.dashboard.components.balance_by_group import balance_by_group_tile
+    from pages.dashboard.components.balance_by_institution import (
+        balance_by_institution_over_time_tile,
+    )
+
     row_one_columns = st.columns([4, 3, 3])
 
     # NETWORTH OVER TIME
-    with row_one_columns[0]:
+    with row_one_columns[0], tile_timer("dashboard", "networth"):
         networth_tile(conn=conn)
 
     # SUPPORTING NETWORTH MEASURES
     with row_one_columns[1]:
 
         ## TARGET NETWORTH
-        target_networth_tile(conn=conn)
+        with tile_timer("dashboard", "target_networth"):
+            target_networth_tile(conn=conn)
 
         ## INVESTMENTS TO ASSETS
-        investments_to_assets_tile(conn=conn)
+        with tile_timer("dashboard", "investments_to_assets"):
+            investments_to_assets_tile(conn=conn)
 
     with row_one_columns[2]:
 
         ## FINANCIAL INDEPENDENCE TRACK
-        financial_independence_tile(conn=conn)
+        with tile_timer("dashboard", "financial_independence"):
+            financial_independence_tile(conn=conn)
 
         ## RETIREMENT MARGIN
-        retirement_margin_tile(conn=conn)
+        with tile_timer("dashboard", "retirement_margin"):
+            retirement_margin_tile(conn=conn)
+
+    # GOALS
+    with tile_timer("dashboard", "goals"):
+        goals_tile(conn=conn)
+
+    # DEBT PAYOFF
+    with tile_timer("dashboard", "debt_payoff"):
+        debt_payoff_tile(conn=conn)
+
+    # NETWORTH CHANGE ATTRIBUTION
+    with tile_timer("dashboard", "networth_attribution"):
+        networth_attribution_tile(conn=conn)
+
+    # REALIZED RETURNS
+    with tile_timer("dashboard", "realized_returns"):
+        realized_returns_tile(conn=conn)
+
+    # RISK & GROWTH
+    with tile_timer("dashboard", "risk"):
+        risk_tile(conn=conn)
 
     # BALANCE BY GROUP
-    balance_by_group_tile(conn=conn)
+    with tile_timer("dashboard", "balance_by_group"):
+        balance_by_group_tile(conn=conn)
 
     # BALANCE BY CATEGORY OVER TIME
-    balance_by_institution_over_time_tile(conn=conn)
+    with tile_timer("dashboard", "balance_by_institution"):
+        balance_by_institution_over_time_tile(conn=conn)
 
 
 ## ---------- BALANCES SPREADSHEET ---------- ##
 elif view_type == "Spreadsheet":
 
-    balances_spreadsheet(conn=conn)
+    from pages.dashboard.components.spreadsheet import balances_spreadsheet
+
+    with tile_timer("dashboard", "balances_spreadsheet"):
+        balances_spreadsheet(conn=conn)
 
 render_footer()
@@ -1,13 +1,34 @@
 import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
-from utilities.helper import *
+from utilities.helper import get_config_value
 
 
 def networth__chart(df: pd.DataFrame):
     # Line chart
     fig = go.Figure()
 
+    # Low-high band for bucketed (weekly/monthly/...) views
+    if "networth_min" in df.columns:
+        for bound in ["networth_max", "networth_min"]:
+            fig.add_trace(
+                go.Scatter(
+                    x=df["full_date"],
+                    y=df[bound],
+                    mode="lines",
+                    line=dict(
+                        color=get_config_value("theme.ColorPalette.textColor"),
+                        width=1,
+                        dash="dot",
+                    ),
+                    showlegend=False,
+                    hovertemplate=(
+                        f"<b>{'High' if bound == 'networth_max' else 'Low'}:</b> "
+                        "$%{y:,.2f}<extra></extra>"
+                    ),
+                )
+            )
+
     # Trace with solid fill
     fig.add_trace(
         go.Scatter(
@@ -59,7 +80,7 @@ def networth__chart(df: pd.DataFrame):
             constrain="domain",
             range=[
                 0,
-                df["networth"].max() * 1.02,
+                df.filter(like="networth").max().max() * 1.02,
             ],
         ),
         template="simple_white",
@@ -2,7 +2,6 @@ import streamlit as st
 
 st.set_page_config(layout="centered")
 
-from streamlit_extras.stylable_container import stylable_container
 from utilities.auth import is_logged_in, logout_button, open_login_page
 
 
@@ -120,6 +119,9 @@ st.write("\n")  # Add vertical spacing
 # -----------------------------
 # Footer
 # -----------------------------
+# Imported here so the header and sections paint before streamlit_extras loads
+from streamlit_extras.stylable_container import stylable_container
+
 with stylable_container(
     key="my_container",
     css_styles="""
@@ -0,0 +1,154 @@
+import pandas as pd
+import streamlit as st
+from streamlit_extras.stylable_container import stylable_container
+from streamlit_gsheets import GSheetsConnection
+
+from utilities.budgets import (
+    BUDGET_COLUMNS,
+    STATUS_AHEAD,
+    STATUS_OVER,
+    budget_vs_actual,
+    elapsed_fraction,
+    load_budgets,
+    unbudgeted_spend,
+)
+from utilities.gsheets import write_worksheet
+from utilities.helper import format_dollars
+from utilities.transactions import SAVINGS_GROUP, get_month_group_cents
+
+
+@st.dialog("Budgets", width="large")
+def budgets__dialog(conn: GSheetsConnection):
+    """
+    Edit the monthly budget per transaction group on the `budgets` worksheet.
+    """
+    st.caption(
+        "One monthly limit per group. To change a budget, close the old row with an "
+        "end date and add a new row, so past months keep their budget."
+    )
+    budgets_df = load_budgets(conn=conn).reindex(columns=BUDGET_COLUMNS)
+    edited_df = st.data_editor(
+        budgets_df,
+        num_rows="dynamic",
+        use_container_width=True,
+        hide_index=True,
+        column_config={
+            "group": st.column_config.TextColumn("Group", required=True),
+            "budget": st.column_config.NumberColumn(
+                "Monthly Budget", format="dollar", min_value=0, required=True
+            ),
+            "effective_start_date": st.column_config.TextColumn("Start Date"),
+            "effective_end_date": st.column_config.TextColumn("End Date"),
+        },
+    )
+    if st.button("Save", type="primary"):
+        write_worksheet(conn=conn, worksheet="budgets", df=edited_df, base=budgets_df)
+        st.success("Budgets saved.")
+
+
+def _status_icon(status: str) -> str:
+    return {STATUS_OVER: "🔴", STATUS_AHEAD: "🟠"}.get(status, "🟢")
+
+
+def budget_tile(conn: GSheetsConnection):
+    # --- Data ---
+    cents = get_month_group_cents(conn=conn)
+    budgets = load_budgets(conn=conn)
+    today = pd.Timestamp.today().normalize()
+    this_month = today.replace(day=1)
+
+    months = sorted(
+        set(cents.index.get_level_values("full_date")) | {this_month}, reverse=True
+    )
+
+    with stylable_container(
+        key="budget_tile",
+        css_styles="""
+            {
+                background-color: #e3d8cc;
+                padding: 1rem 1rem 2rem 1rem;
+                border-radius: 0.5rem;
+                border-width: 0px;
+                border-style: solid;
+            }
+        """,
+    ):
+        # --- Controls ---
+        header_cols = st.columns([7, 1.5, 1.5])
+        with header_cols[0]:
+            st.markdown("### Budget vs. Actual")
+        with header_cols[1]:
+            month = st.selectbox(
+                "Month:",
+                options=months,
+                format_func=lambda m: m.strftime("%b %Y"),
+                key="budget_month",
+            )
+        with header_cols[2]:
+            st.write("")
+            st.write("")
+            if st.button("☰ Budgets", use_container_width=True, key="edit_budgets"):
+                budgets__dialog(conn=conn)
+
+        df = budget_vs_actual(cents, budgets, month=month, today=today)
+        if df.empty:
+            st.info(
+                "No budgets for this month yet. Use **☰ Budgets** to set a monthly "
+                "limit per group."
+            )
+            return
+
+        # --- Totals ---
+        elapsed = elapsed_fraction(month, today)
+        metric_cols = st.columns(4)
+        metric_cols[0].metric("Budgeted", f"${df['budget'].sum():,.0f}")
+        metric_cols[1].metric(
+            "Spent",
+            f"${df['spent'].sum():,.0f}",
+            delta=f"{format_dollars(df['remaining'].sum())} left",
+            delta_color="normal" if df["remaining"].sum() >= 0 else "inverse",
+        )
+        if elapsed < 1:
+            metric_cols[2].metric(
+                "Projected",
+                f"${df['projected'].sum():,.0f}",
+                help=f"Spend so far extrapolated; {elapsed:.0%} of the month has passed.",
+            )
+        metric_cols[3].metric(
+            "Unbudgeted Spend",
+            f"${unbudgeted_spend(cents, budgets, month, exclude=(SAVINGS_GROUP,)):,.0f}",
+        )
+
+        # --- Per group ---
+        st.dataframe(
+            df.assign(status=df["status"].map(lambda s: f"{_status_icon(s)} {s}")),
+            hide_index=True,
+            use_container_width=True,
+            column_order=[
+                "group",
+                "status",
+                "used",
+                "budget",
+                "spent",
+                "remaining",
+                *(["expected", "projected"] if elapsed < 1 else []),
+            ],
+            column_config={
+                "group": st.column_config.TextColumn("Group"),
+                "status": st.column_config.TextColumn("Status"),
+                "used": st.column_config.ProgressColumn(
+                    "Used", format="percent", min_value=0, max_value=1
+                ),
+                "budget": st.column_config.NumberColumn("Budget", format="dollar"),
+                "spent": st.column_config.NumberColumn("Spent", format="dollar"),
+                "remaining": st.column_config.NumberColumn(
+                    "Remaining", format="dollar"
+                ),
+                "expected": st.column_config.NumberColumn(
+                    "Expected by Today", format="dollar"
+                ),
+                "projected": st.column_config.NumberColumn(
+                    "Projected", format="dollar"
+                ),
+            },
+        )
@@ -0,0 +1,184 @@
+import pandas as pd
+import plotly.graph_objects as go
+import streamlit as st
+from streamlit_extras.stylable_container import stylable_container
+from streamlit_gsheets import GSheetsConnection
+
+from utilities.forecast import HORIZONS, CashFlowForecast, cash_flow_forecast
+from utilities.helper import format_dollars, get_config_value
+
+
+@st.dialog("Recurring Items", width="large")
+def recurring_items__dialog(forecast: CashFlowForecast):
+    st.caption(
+        "Merchants charged about the same amount in most of the last six months. "
+        "Each is forecast at its typical monthly amount; the rest of the spending "
+        "is forecast from monthly averages."
+    )
+    st.dataframe(
+        forecast.recurring,
+        hide_index=True,
+        use_container_width=True,
+        column_config={
+            "description": st.column_config.TextColumn("Description"),
+            "group": st.column_config.TextColumn("Group"),
+            "months_seen": st.column_config.NumberColumn("Months Seen"),
+            "amount": st.column_config.NumberColumn("Monthly Amount", format="dollar"),
+        },
+    )
+
+
+def cash_flow__chart(df: pd.DataFrame) -> go.Figure:
+    text_color = get_config_value("theme.ColorPalette.textColor")
+    fig = go.Figure()
+    fig.add_trace(
+        go.Bar(
+            x=df["full_date"],
+            y=df["income"],
+            name="Income",
+            marker_color=get_config_value("theme.ColorPalette.blue"),
+            hovertemplate="<b>Income:</b> $%{y:,.0f}<extra></extra>",
+        )
+    )
+    fig.add_trace(
+        go.Bar(
+            x=df["full_date"],
+            y=df["expenses"],
+            name="Expenses",
+            marker_color=get_config_value("theme.ColorPalette.primaryColor"),
+            hovertemplate="<b>Expenses:</b> $%{y:,.0f}<extra></extra>",
+        )
+    )
+    fig.add_trace(
+        go.Scatter(
+            x=df["full_date"],
+            y=df["cumulative_net"],
+            name="Cumulative Net",
+            mode="lines",
+            line=dict(color=text_color, width=2),
+            hovertemplate=(
+                "<b>Month:</b> %{x|%b %Y}<br>"
+                "<b>Cumulative Net:</b> $%{y:,.0f}<extra></extra>"
+            ),
+        )
+    )
+    fig.update_layout(
+        barmode="relative",
+        height=350,
+        template="simple_white",
+        margin=dict(l=0, r=0, t=0, b=0),
+        paper_bgcolor="rgba(0,0,0,0)",
+        plot_bgcolor="rgba(0,0,0,0)",
+        bargap=0.2,
+        hovermode="x unified",
+        legend=dict(orientation="h", y=-0.15, font=dict(color=text_color)),
+        yaxis=dict(
+            tickformat="$,.0f",
+            tickfont=dict(color=text_color),
+            showgrid=False,
+            showline=False,
+            zeroline=True,
+            fixedrange=True,
+        ),
+        xaxis=dict(
+            tickfont=dict(color=text_color),
+            showgrid=False,
+            showline=False,
+            fixedrange=True,
+        ),
+    )
+    return fig
+
+
+def cash_flow_forecast_tile(conn: GSheetsConnection):
+    with stylable_container(
+        key="cash_flow_forecast_tile",
+        css_styles="""
+            {
+                background-color: #e3d8cc;
+                padding: 1rem 1rem 2rem 1rem;
+                border-radius: 0.5rem;
+                border-width: 0px;
+                border-style: solid;
+            }
+        """,
+    ):
+        # --- Controls ---
+        header_cols = st.columns([7, 1.5, 1.5])
+        with header_cols[0]:
+            st.markdown("### Cash-Flow Forecast")
+        with header_cols[1]:
+            horizon = st.selectbox(
+                "Horizon:",
+                options=HORIZONS,
+                format_func=lambda months: f"{months} months",
+                key="forecast_horizon",
+            )
+
+        # --- Data ---
+        forecast = cash_flow_forecast(conn=conn, horizon=horizon)
+        totals = forecast.totals()
+
+        with header_cols[2]:
+            st.write("")
+            st.write("")
+            if st.button("☰ Recurring", use_container_width=True, key="recurring"):
+                recurring_items__dialog(forecast=forecast)
+
+        if totals.empty:
+            st.info("Add transactions and income to see a forecast.")
+            return
+
+        # --- Totals ---
+        metric_cols = st.columns(4)
+        metric_cols[0].metric(
+            "Monthly Income",
+            f"${totals['income'].mean():,.0f}",
+            help=(
+                f"Active income at the {forecast.take_home_rate:.0%} take-home rate "
+                "seen in the last year of transactions."
+                if forecast.take_home_rate is not None
+                else "Gross active income; no Income transactions in the last year."
+            ),
+        )
+        metric_cols[1].metric("Monthly Expenses", f"${-totals['expenses'].mean():,.0f}")
+        metric_cols[2].metric("Monthly Net", format_dollars(totals["net"].mean()))
+        metric_cols[3].metric(
+            f"Net over {horizon} Months",
+            format_dollars(totals["cumulative_net"].iloc[-1]),
+        )
+
+        st.plotly_chart(
+            cash_flow__chart(totals),
+            use_container_width=True,
+            config={"displayModeBar": False},
+        )
+
+        # --- Per group ---
+        with st.expander("Forecast by Group"):
+            by_group = (
+                forecast.monthly.pivot_table(
+                    index="full_date",
+                    columns="group",
+                    values="amount",
+                    aggfunc="sum",
+                    fill_value=0,
+                )
+                .reset_index()
+                .sort_values("full_date")
+            )
+            st.dataframe(
+                by_group,
+                hide_index=True,
+                use_container_width=True,
+                column_config={
+                    "full_date": st.column_config.DateColumn(
+                        "Month", format="MMM YYYY", pinned=True
+                    ),
+                    **{
+                        col: st.column_config.NumberColumn(format="dollar")
+                        for col in by_group.columns
+                        if col != "full_date"
+                    },
+                },
+            )
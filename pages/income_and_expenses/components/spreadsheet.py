@@ -1,13 +1,10 @@
 import streamlit as st
-import pandas as pd
-import numpy as np
 
 from streamlit_gsheets import GSheetsConnection
 from streamlit_extras.stylable_container import stylable_container
 
-from utilities.auth import *
-from utilities.helper import *
-from utilities.gsheets import *
+from utilities.helper import convert_for_download, get_config_value
+from utilities.aggregates import monthly_transactions
 
 
 def style_and_render_metric(group: str, amount: float, key_suffix: str):
@@ -44,10 +41,8 @@ def style_and_render_metric(group: str, amount: float, key_suffix: str):
 
 
 def transactions_spreadsheet(conn: GSheetsConnection):
-    # Read categorized transaction data grouped by month
-    transactions_group_by_month_df = read_sql(
-        conn=conn, ddl="pages/income_and_expenses/ddl/transaction_groups_by_month.sql"
-    )
+    # Transaction totals per month and group (excluding Savings transfers)
+    transactions_group_by_month_df = monthly_transactions(conn=conn)
 
     # Pivot and compute savings as total of all columns
     pivoted_df = (
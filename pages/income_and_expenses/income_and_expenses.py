@@ -8,9 +8,8 @@ from utilities.gsheets import (
     settings_assumptions,
 )
 
-from pages.income_and_expenses.components.spreadsheet import transactions_spreadsheet
-
-from utilities.helper import *
+from utilities.helper import check_transactions_staleness, render_footer
+from utilities.metrics import tile_timer
 
 st.set_page_config(layout="wide", page_title="Income & Expenses")
 
@@ -26,7 +25,7 @@ with header_cols[0]:
 with header_cols[1]:
     st.write("")
     st.write("")
-    refresh_connection()
+    refresh_connection(conn=conn)
 with header_cols[2]:
     st.write("")
     st.write("")
@@ -36,10 +35,24 @@ with header_cols[2]:
 check_transactions_staleness(conn)
 
 if view_type == "Dashboard":
-    st.warning("This page is under construction.", icon="⚠️")
+    from pages.income_and_expenses.components.budget import budget_tile
+    from pages.income_and_expenses.components.forecast import (
+        cash_flow_forecast_tile,
+    )
+
+    with tile_timer("income_and_expenses", "budget"):
+        budget_tile(conn=conn)
+
+    with tile_timer("income_and_expenses", "cash_flow_forecast"):
+        cash_flow_forecast_tile(conn=conn)
 
 if view_type == "Spreadsheet":
-    transactions_spreadsheet(conn)
+    from pages.income_and_expenses.components.spreadsheet import (
+        transactions_spreadsheet,
+    )
+
+    with tile_timer("income_and_expenses", "transactions_spreadsheet"):
+        transactions_spreadsheet(conn)
 
 
 render_footer()
@@ -0,0 +1,50 @@
+from collections import Counter
+
+import pandas as pd
+
+
+def hot_functions(stacks: Counter) -> pd.DataFrame:
+    """
+    Self and total samples per function, hottest (by self time) first.
+
+    Self samples count where the function was on top of the stack; total samples
+    count every stack the function appears in (recursion counted once).
+    """
+    self_samples, total_samples = Counter(), Counter()
+    for stack, count in stacks.items():
+        self_samples[stack[-1]] += count
+        for name in set(stack):
+            total_samples[name] += count
+
+    n = sum(stacks.values()) or 1
+    df = (
+        pd.DataFrame({"self_samples": self_samples, "total_samples": total_samples})
+        .fillna(0)
+        .astype(int)
+    )
+    return (
+        df.assign(self_pct=df["self_samples"] / n, total_pct=df["total_samples"] / n)
+        .rename_axis("function")
+        .reset_index()
+        .sort_values(["self_samples", "total_samples"], ascending=False)
+        .reset_index(drop=True)
+    )
+
+
+def flame_nodes(stacks: Counter) -> pd.DataFrame:
+    """
+    Call tree nodes (id, parent, label, samples) for an icicle / flame chart.
+    """
+    samples = Counter()
+    for stack, count in stacks.items():
+        for depth in range(1, len(stack) + 1):
+            samples[stack[:depth]] += count
+
+    return pd.DataFrame(
+        {
+            "id": [";".join(path) for path in samples],
+            "parent": [";".join(path[:-1]) for path in samples],
+            "label": [path[-1] for path in samples],
+            "samples": list(samples.values()),
+        }
+    )
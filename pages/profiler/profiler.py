@@ -0,0 +1,101 @@
+import streamlit as st
+import plotly.graph_objects as go
+
+from pages.profiler.functions.profiles import flame_nodes, hot_functions
+from utilities.helper import get_config_value, render_footer
+from utilities.profiler import PROFILE_DIR, list_profiles, load_profile
+
+# ----------------- HEADER ----------------- #
+st.set_page_config(layout="wide", page_title="Profiler")
+
+st.title("Rerun Profiler")
+st.write(
+    "Use **Profile Next Rerun** in the sidebar of the Networth Dashboard or "
+    "Income & Expenses page to capture where a rerun spends its time. "
+    f"Profiles are saved to `{PROFILE_DIR}/` as folded stacks."
+)
+
+profiles = list_profiles()
+if not profiles:
+    st.info("No profiles captured yet.")
+    st.stop()
+
+# ----------------- CONTROLS ----------------- #
+control_cols = st.columns([6, 2, 2])
+with control_cols[0]:
+    selected_profile = st.selectbox(
+        "Profile", options=profiles, format_func=lambda path: path.stem
+    )
+with control_cols[1]:
+    top_n = st.number_input("Top Functions", min_value=5, max_value=100, value=20)
+with control_cols[2]:
+    include_library = st.toggle(
+        "Include Library Code",
+        value=True,
+        help="Hide to only list functions defined in this app.",
+    )
+
+stacks, seconds = load_profile(selected_profile)
+n_samples = sum(stacks.values())
+
+metric_cols = st.columns(3)
+metric_cols[0].metric("Wall Time", f"{seconds:,.2f} s")
+metric_cols[1].metric("Samples", f"{n_samples:,}")
+metric_cols[2].metric("Unique Stacks", f"{len(stacks):,}")
+
+# ----------------- FLAME GRAPH ----------------- #
+st.markdown("### Flame Graph")
+nodes = flame_nodes(stacks)
+fig = go.Figure(
+    go.Icicle(
+        ids=nodes["id"],
+        parents=nodes["parent"],
+        labels=nodes["label"],
+        values=nodes["samples"],
+        branchvalues="total",
+        tiling=dict(orientation="v", flip="y"),
+        marker=dict(colorscale=[[0, "#ecebe3"], [1, "#bb5a38"]]),
+        marker_colors=nodes["samples"],
+        hovertemplate="<b>%{label}</b><br>%{value} samples<extra></extra>",
+        maxdepth=12,
+    )
+)
+fig.update_layout(
+    height=600,
+    margin=dict(l=0, r=0, t=10, b=0),
+    paper_bgcolor="rgba(0,0,0,0)",
+    font=dict(color=get_config_value("theme.ColorPalette.textColor")),
+)
+st.plotly_chart(fig, use_container_width=True)
+
+# ----------------- HOT FUNCTIONS ----------------- #
+st.markdown("### Hot Functions")
+hot_df = hot_functions(stacks)
+if not include_library:
+    hot_df = hot_df[hot_df["function"].str.contains(r"\((?:pages|utilities)/")]
+
+st.dataframe(
+    hot_df.head(int(top_n)),
+    hide_index=True,
+    use_container_width=True,
+    column_config={
+        "function": st.column_config.TextColumn("Function", width="large"),
+        "self_samples": st.column_config.NumberColumn("Self Samples"),
+        "total_samples": st.column_config.NumberColumn("Total Samples"),
+        "self_pct": st.column_config.ProgressColumn(
+            "Self %", format="percent", min_value=0, max_value=1
+        ),
+        "total_pct": st.column_config.ProgressColumn(
+            "Total %", format="percent", min_value=0, max_value=1
+        ),
+    },
+)
+
+st.download_button(
+    label="Download Folded Stacks",
+    data=selected_profile.read_text(),
+    file_name=selected_profile.name,
+    icon=":material/download:",
+)
+
+render_footer()
@@ -1,5 +1,8 @@
 import streamlit as st
-from utilities.auth import *
+from utilities.auth import is_logged_in
+from utilities.metrics import RERUN_SECONDS, start_metrics_exporter
+from utilities.profiler import profile_rerun
+from utilities.scheduler import start_warm_cache
 
 # Non-Authentication Pages
 no_auth_pages = {"": [st.Page("pages/home/home.py", title="Home")]}
@@ -13,8 +16,17 @@ auth_pages = {
             title="Income & Expenses",
         ),
     ],
+    "Developer": [
+        st.Page("pages/profiler/profiler.py", title="Profiler"),
+    ],
 }
 
+# Keep worksheets and dashboard aggregates warm in the background
+start_warm_cache()
+
+# Export data-layer and render metrics in the Prometheus text format
+start_metrics_exporter()
+
 # Only show authentication pages if the user is logged in
 if is_logged_in():
     pages = {**no_auth_pages, **auth_pages}
@@ -23,4 +35,8 @@ else:
 
 # Navigation Setup
 pg = st.navigation(pages, position="sidebar", expanded=True)
-pg.run()
+
+# Timed for the metrics exporter; sampled when "Profile Next Rerun" was clicked on
+# a profiled page
+with RERUN_SECONDS.time(page=pg.url_path or "home"), profile_rerun(page=pg.url_path):
+    pg.run()
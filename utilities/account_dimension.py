@@ -0,0 +1,181 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+from streamlit_gsheets import GSheetsConnection
+
+from utilities.currency import currency_version, fx_matrix, load_fx_rates
+from utilities.gsheets import load_worksheet, worksheet_version
+
+ACCOUNT_KEY = ["institution_name", "account_name"]
+
+DIMENSION_COLUMNS = [
+    "account_id",
+    "institution_name",
+    "account_name",
+    "category",
+    "account_type",
+    "balance_type",
+    "currency",
+    "account_group",
+    "asset_class",
+    "liquidity",
+]
+
+
+def account_ids(df: pd.DataFrame) -> np.ndarray:
+    """
+    Stable integer id for each (institution_name, account_name) pair.
+
+    The id is a hash of the key, so it does not change when rows are reordered or
+    accounts are added, and balances can compute it without a lookup.
+    """
+    keys = df[ACCOUNT_KEY].astype(str).apply(lambda col: col.str.strip())
+    return pd.util.hash_pandas_object(keys, index=False).to_numpy().view("int64")
+
+
+def classify_accounts(accounts: pd.DataFrame) -> pd.DataFrame:
+    """
+    Derive the grouping attributes used across the dashboard, once per account.
+
+    Parameters:
+    - accounts (pd.DataFrame): One row per account with `category` and `account_type`.
+
+    Returns:
+    - pd.DataFrame: `accounts` with `account_group`, `asset_class` and `liquidity`.
+    """
+    category = accounts["category"].fillna("")
+    account_type = accounts["account_type"].fillna("")
+    lowered = account_type.str.lower()
+
+    is_home = category == "Home"
+    is_investment = category == "Investments"
+    is_retirement = is_investment & lowered.str.contains("ira|401")
+    is_brokerage = is_investment & ~is_retirement & lowered.str.contains("brokerage")
+
+    return accounts.assign(
+        # Balance by Group: homes are shown as equity, everything else by type
+        account_group=np.where(is_home, "Home Equity", account_type),
+        # Summary tiles: investments split into retirement and taxable money
+        asset_class=np.select(
+            [is_retirement, is_brokerage, is_investment],
+            ["Retirement", "Brokerage", account_type],
+            default=category,
+        ),
+        liquidity=np.select(
+            [
+                is_home,
+                is_investment & ~is_brokerage,
+                is_brokerage | (category == "Banking"),
+            ],
+            ["Illiquid", "Restricted", "Liquid"],
+            default="Other",
+        ),
+    )
+
+
+def build_account_dimension(
+    accounts: pd.DataFrame, balances: pd.DataFrame
+) -> pd.DataFrame:
+    """
+    Build the account dimension table.
+
+    Accounts come from the `accounts` worksheet; the most recent row wins when an
+    account was reopened. Accounts that only appear in `balances` (e.g. closed before
+    the accounts sheet existed) are classified from their latest balance row.
+
+    Parameters:
+    - accounts (pd.DataFrame): Rows of the `accounts` worksheet.
+    - balances (pd.DataFrame): Rows of the `balances` worksheet.
+
+    Returns:
+    - pd.DataFrame: One row per account, keyed by integer `account_id`.
+    """
+    accounts = accounts.assign(
+        start=pd.to_datetime(accounts["effective_start_date"], errors="coerce")
+    ).sort_values("start", na_position="first")
+    balance_accounts = balances.assign(
+        start=pd.to_datetime(balances["full_date"], errors="coerce")
+    ).sort_values("start", na_position="first")
+
+    dim = pd.concat(
+        [
+            balance_accounts.reindex(columns=DIMENSION_COLUMNS[1:7]),
+            accounts.reindex(columns=DIMENSION_COLUMNS[1:7]),
+        ],
+        ignore_index=True,
+    )
+    dim.insert(0, "account_id", account_ids(dim))
+    dim = dim.drop_duplicates("account_id", keep="last")
+
+    return classify_accounts(dim)[DIMENSION_COLUMNS].reset_index(drop=True)
+
+
+@st.cache_data(show_spinner=False)
+def _account_dimension(
+    _conn: GSheetsConnection, accounts_version: int, balances_version: int
+) -> pd.DataFrame:
+    return build_account_dimension(
+        accounts=load_worksheet(conn=_conn, worksheet="accounts"),
+        balances=load_worksheet(conn=_conn, worksheet="balances"),
+    )
+
+
+def get_account_dimension(conn: GSheetsConnection) -> pd.DataFrame:
+    """Account dimension, rebuilt only when `accounts` or `balances` changes."""
+    return _account_dimension(
+        _conn=conn,
+        accounts_version=worksheet_version(conn=conn, worksheet="accounts"),
+        balances_version=worksheet_version(conn=conn, worksheet="balances"),
+    )
+
+
+@st.cache_data(show_spinner=False)
+def _balance_facts(
+    _conn: GSheetsConnection,
+    balances_version: int,
+    accounts_version: int,
+    currency_version: tuple,
+) -> pd.DataFrame:
+    balances = load_worksheet(conn=_conn, worksheet="balances")
+    facts = pd.DataFrame(
+        {
+            "full_date": balances["full_date"],
+            "dt": pd.to_datetime(balances["full_date"], errors="coerce"),
+            "account_id": account_ids(balances),
+            "balance": pd.to_numeric(balances["balance"], errors="coerce"),
+        }
+    )
+
+    # Each row at its account's rate on its date
+    dim = get_account_dimension(conn=_conn)
+    dates = pd.DatetimeIndex(facts["dt"].dropna().unique()).sort_values()
+    if len(dates):
+        rates, _ = fx_matrix(
+            dates, dim["currency"], load_fx_rates(conn=_conn), base=currency_version[1]
+        )
+        row = dates.get_indexer(facts["dt"])
+        column = pd.Index(dim["account_id"]).get_indexer(facts["account_id"])
+        facts["balance"] *= np.where(row >= 0, rates[row, column], np.nan)
+    return facts
+
+
+def get_balance_facts(conn: GSheetsConnection) -> pd.DataFrame:
+    """
+    Balance rows reduced to (full_date, dt, account_id, balance), with balances
+    in the base currency.
+
+    Join to `get_account_dimension` on `account_id` for any grouping attribute.
+    """
+    return _balance_facts(
+        _conn=conn,
+        balances_version=worksheet_version(conn=conn, worksheet="balances"),
+        accounts_version=worksheet_version(conn=conn, worksheet="accounts"),
+        currency_version=currency_version(conn=conn),
+    )
+
+
+# Tables `read_sql` builds instead of reading a worksheet
+DERIVED_TABLES = {
+    "account_dim": get_account_dimension,
+    "balance_facts": get_balance_facts,
+}
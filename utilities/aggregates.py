@@ -0,0 +1,191 @@
+from datetime import datetime
+
+import pandas as pd
+import streamlit as st
+from streamlit_gsheets import GSheetsConnection
+
+from utilities.calculations import (
+    future_value,
+    future_value_of_payments,
+    present_value,
+)
+from utilities.currency import currency_version
+from utilities.gsheets import load_worksheet, worksheet_version
+from utilities.snapshots import get_asof_balances, group_accounts
+from utilities.transactions import get_month_group_cents, monthly_group_totals
+
+# Safe withdrawal rate used to size the financial independence target
+WITHDRAWAL_RATE = 0.04
+
+
+# -----------------------------
+# Cached builders
+# -----------------------------
+# Each builder takes the content versions of the worksheets it reads, so its
+# st.cache_data entry is reused until one of them changes. The page tiles and the
+# warm-cache scheduler call them with the same arguments and share the entries.
+@st.cache_data(show_spinner=False)
+def _networth_series(
+    _conn: GSheetsConnection,
+    balances_version: int,
+    accounts_version: int,
+    currency_version: tuple,
+) -> pd.DataFrame:
+    return get_asof_balances(conn=_conn).sum(axis=1).rename("networth").reset_index()
+
+
+@st.cache_data(show_spinner=False)
+def _income_by_date(
+    _conn: GSheetsConnection,
+    balances_version: int,
+    accounts_version: int,
+    income_version: int,
+) -> pd.DataFrame:
+    dates = get_asof_balances(conn=_conn).index
+    income_df = load_worksheet(conn=_conn, worksheet="income")
+    start = pd.to_datetime(income_df["effective_start_date"]).to_numpy()
+    end = (
+        pd.to_datetime(income_df["effective_end_date"], errors="coerce")
+        .fillna(datetime.today())
+        .to_numpy()
+    )
+
+    # Snapshot dates × income rows: active where start <= date <= end
+    d = dates.to_numpy()[:, None]
+    active = (start <= d) & (d <= end)
+    return pd.DataFrame(
+        {
+            "full_date": dates,
+            "total_income": active @ income_df["income"].astype(float).to_numpy(),
+        }
+    )
+
+
+@st.cache_data(show_spinner=False)
+def _investments_series(
+    _conn: GSheetsConnection,
+    balances_version: int,
+    accounts_version: int,
+    currency_version: tuple,
+) -> pd.DataFrame:
+    by_category = group_accounts(get_asof_balances(conn=_conn), _conn, "category")
+    investments = by_category.get("Investments", pd.Series(0.0, by_category.index))
+    return investments.rename("total_investments").reset_index()
+
+
+@st.cache_data(show_spinner=False)
+def _monthly_transactions(
+    _conn: GSheetsConnection, transactions_version: int
+) -> pd.DataFrame:
+    return monthly_group_totals(get_month_group_cents(conn=_conn))
+
+
+def _versions(conn: GSheetsConnection, *worksheets: str) -> dict:
+    return {
+        f"{ws}_version": worksheet_version(conn=conn, worksheet=ws) for ws in worksheets
+    }
+
+
+# -----------------------------
+# Aggregates
+# -----------------------------
+def networth_series(conn: GSheetsConnection) -> pd.DataFrame:
+    """Net worth per snapshot date (`full_date`, `networth`), balances carried forward."""
+    return _networth_series(
+        _conn=conn,
+        **_versions(conn, "balances", "accounts"),
+        currency_version=currency_version(conn=conn),
+    )
+
+
+def income_by_date(conn: GSheetsConnection) -> pd.DataFrame:
+    """Total income active on each snapshot date (`full_date`, `total_income`)."""
+    return _income_by_date(
+        _conn=conn, **_versions(conn, "balances", "accounts", "income")
+    )
+
+
+def investments_series(conn: GSheetsConnection) -> pd.DataFrame:
+    """Investment balances per snapshot date (`full_date`, `total_investments`)."""
+    return _investments_series(
+        _conn=conn,
+        **_versions(conn, "balances", "accounts"),
+        currency_version=currency_version(conn=conn),
+    )
+
+
+def monthly_transactions(conn: GSheetsConnection) -> pd.DataFrame:
+    """Monthly transaction cube (`full_date`, `group`, `total_amount`)."""
+    return _monthly_transactions(_conn=conn, **_versions(conn, "transactions"))
+
+
+def fi_targets(conn: GSheetsConnection, replacement_income_rate: float) -> pd.DataFrame:
+    """
+    Financial independence target and progress per snapshot date.
+
+    Parameters:
+    - conn (GSheetsConnection): Connection to the worksheets.
+    - replacement_income_rate (float): Share of income needed in retirement.
+
+    Returns:
+    - pd.DataFrame: `full_date`, `total_income`, `financial_independence_target`,
+      `networth`, `percent_to_target`, sorted by date.
+    """
+    df = income_by_date(conn)
+    df["financial_independence_target"] = (
+        df["total_income"] * replacement_income_rate
+    ) / WITHDRAWAL_RATE
+    df = df.merge(networth_series(conn), on="full_date", how="inner")
+    df["percent_to_target"] = df["networth"] / df["financial_independence_target"]
+    return df.sort_values(by=["full_date"], ascending=True).reset_index(drop=True)
+
+
+def retirement_margin_projection(
+    conn: GSheetsConnection,
+    birthdate: pd.Timestamp,
+    target_retirement_age: int,
+    replacement_income_rate: float,
+    target_return_on_investment: float,
+    target_savings_rate: float,
+    inflation_rate: float,
+) -> pd.DataFrame:
+    """
+    Projected retirement nest egg versus the inflation-adjusted FI target per date.
+
+    Suffixes: `__fv` are future (retirement-date) dollars, `__cv` present dollars.
+
+    Returns:
+    - pd.DataFrame: One row per snapshot date, sorted by date.
+    """
+    df = investments_series(conn).merge(income_by_date(conn), on="full_date")
+    roi, inflation = target_return_on_investment, inflation_rate
+
+    df["age"] = (df["full_date"] - birthdate).dt.days / 365.25
+    df["years_to_retirement"] = target_retirement_age - df["age"]
+    years = df["years_to_retirement"]
+
+    df["financial_independence_target__cv"] = (
+        df["total_income"] * replacement_income_rate
+    ) / WITHDRAWAL_RATE
+    df["current_investments__fv"] = future_value(df["total_investments"], roi, years)
+    df["additional_investments__fv"] = future_value_of_payments(
+        payment=(df["total_income"] * target_savings_rate) / 12,
+        annual_rate=roi,
+        years=years,
+        payments_per_year=12,
+    )
+    df["retirement_egg__fv"] = (
+        df["current_investments__fv"] + df["additional_investments__fv"]
+    )
+    df["financial_independence_target__fv"] = future_value(
+        df["financial_independence_target__cv"], inflation, years
+    )
+    df["retirement_margin__fv"] = (
+        df["retirement_egg__fv"] - df["financial_independence_target__fv"]
+    )
+    df["retirement_margin__cv"] = present_value(
+        df["retirement_margin__fv"], inflation, years
+    )
+    df["retirement_egg__cv"] = present_value(df["retirement_egg__fv"], inflation, years)
+    df["est_income_in_retirement__cv"] = df["retirement_egg__cv"] * WITHDRAWAL_RATE
+    return df.sort_values("full_date").reset_index(drop=True)
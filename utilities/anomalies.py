@@ -0,0 +1,217 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+from numpy.lib.stride_tricks import sliding_window_view
+from streamlit_gsheets import GSheetsConnection
+
+from utilities.account_dimension import account_ids, get_account_dimension
+from utilities.gsheets import load_worksheet, worksheet_version
+from utilities.snapshots import observed_balances
+
+# Each change is compared with the account's changes over this many earlier
+# snapshots, once at least MIN_HISTORY of them were reported
+ANOMALY_WINDOW = 24
+MIN_HISTORY = 6
+
+# Robust z-score (median / MAD) above which a change is unusual; above the usual
+# 3.5 since every account is checked on every snapshot
+Z_THRESHOLD = 5.0
+MAD_SCALE = 1.4826
+
+# Floor on the spread, as a fraction of the previous balance, so accounts with
+# flat histories are not flagged for every small move
+MIN_SPREAD_FRACTION = 0.01
+
+# A new balance within this fraction of the old one shifted by a power of ten
+# (or with its sign flipped) looks like a typo
+ENTRY_TOLERANCE = 0.05
+
+REASON_OUTLIER = "Unusual change"
+REASON_DECIMAL = "Misplaced decimal or digit?"
+REASON_SIGN = "Sign flipped?"
+
+ANOMALY_COLUMNS = [
+    "full_date",
+    "account_id",
+    "institution_name",
+    "account_name",
+    "category",
+    "previous",
+    "balance",
+    "change",
+    "z_score",
+    "reason",
+]
+
+
+def robust_z(
+    change: np.ndarray, history: np.ndarray, previous: np.ndarray
+) -> np.ndarray:
+    """
+    Robust z-score of each change against its window of earlier changes.
+
+    Parameters:
+    - change (np.ndarray): Changes, any shape.
+    - history (np.ndarray): Earlier changes, shaped like `change` plus a last
+      window axis; NaN where not reported.
+    - previous (np.ndarray): Balance each change starts from, shaped like `change`.
+
+    Returns:
+    - np.ndarray: (change - median) / (1.4826 × MAD), NaN where the window has
+      fewer than MIN_HISTORY changes.
+    """
+    with warnings.catch_warnings():
+        # Windows without any reported change
+        warnings.simplefilter("ignore", RuntimeWarning)
+        median = np.nanmedian(history, axis=-1)
+        mad = np.nanmedian(np.abs(history - median[..., None]), axis=-1)
+
+    spread = np.fmax(MAD_SCALE * mad, MIN_SPREAD_FRACTION * np.abs(previous))
+    z = (change - median) / np.fmax(spread, 1.0)
+    return np.where((~np.isnan(history)).sum(axis=-1) >= MIN_HISTORY, z, np.nan)
+
+
+def entry_errors(previous: np.ndarray, balance: np.ndarray) -> np.ndarray:
+    """
+    Data-entry heuristics: the new balance is the old one with its decimal point
+    (or a digit) shifted, or with its sign flipped.
+
+    Returns:
+    - np.ndarray: REASON_DECIMAL, REASON_SIGN or "" per element.
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = np.abs(balance) / np.abs(previous)
+        power = np.rint(np.log10(ratio))
+        shifted = np.abs(ratio / 10.0**power - 1) < ENTRY_TOLERANCE
+    valid = np.isfinite(ratio) & (ratio > 0)
+    decimal = valid & (power != 0) & shifted
+    sign = valid & (previous * balance < 0) & (np.abs(ratio - 1) < ENTRY_TOLERANCE)
+    return np.select([decimal, sign], [REASON_DECIMAL, REASON_SIGN], default="")
+
+
+def change_matrix(observed: pd.DataFrame) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Previous reported balance and change at every reported (date, account).
+
+    Returns:
+    - tuple: `previous` and `change`, shaped like `observed`; NaN where the
+      account was not reported or has no earlier balance.
+    """
+    previous = observed.ffill().shift(1).to_numpy()
+    return previous, observed.to_numpy() - previous
+
+
+def change_windows(change: np.ndarray) -> np.ndarray:
+    """
+    The ANOMALY_WINDOW changes before each row, shaped (dates + 1, accounts,
+    window); the last row is the window for the next snapshot.
+    """
+    padded = np.vstack([np.full((ANOMALY_WINDOW, change.shape[1]), np.nan), change])
+    return sliding_window_view(padded, ANOMALY_WINDOW, axis=0)
+
+
+def detect_anomalies(observed: pd.DataFrame) -> pd.DataFrame:
+    """
+    Flag reported balance changes far outside each account's recent history, or
+    that look like data-entry errors, across all accounts and dates at once.
+
+    Parameters:
+    - observed (pd.DataFrame): Output of `observed_balances`.
+
+    Returns:
+    - pd.DataFrame: `full_date`, `account_id`, `previous`, `balance`, `change`,
+      `z_score` and `reason`, one row per flagged balance.
+    """
+    previous, change = change_matrix(observed)
+    balance = observed.to_numpy()
+    z = robust_z(change, change_windows(change)[:-1], previous)
+    reason = entry_errors(previous, balance)
+
+    flagged = ~np.isnan(change) & ((np.abs(z) > Z_THRESHOLD) | (reason != ""))
+    rows, cols = np.nonzero(flagged)
+    return pd.DataFrame(
+        {
+            "full_date": observed.index.to_numpy()[rows],
+            "account_id": observed.columns.to_numpy()[cols],
+            "previous": previous[rows, cols],
+            "balance": balance[rows, cols],
+            "change": change[rows, cols],
+            "z_score": z[rows, cols],
+            "reason": np.where(
+                reason[rows, cols] != "", reason[rows, cols], REASON_OUTLIER
+            ),
+        }
+    )
+
+
+# -----------------------------
+# Cached detection
+# -----------------------------
+@st.cache_data(show_spinner=False)
+def _observed(_conn: GSheetsConnection, balances_version: int) -> pd.DataFrame:
+    return observed_balances(load_worksheet(conn=_conn, worksheet="balances"))
+
+
+@st.cache_data(show_spinner=False)
+def _anomalies(
+    _conn: GSheetsConnection, balances_version: int, accounts_version: int
+) -> pd.DataFrame:
+    anomalies = detect_anomalies(_observed(_conn, balances_version))
+    dim = get_account_dimension(conn=_conn)[
+        ["account_id", "institution_name", "account_name", "category"]
+    ]
+    return anomalies.merge(dim, on="account_id", how="left")[ANOMALY_COLUMNS]
+
+
+def get_balance_anomalies(conn: GSheetsConnection) -> pd.DataFrame:
+    """
+    `detect_anomalies` for the `balances` worksheet with account names, rebuilt
+    only when `balances` or `accounts` changes.
+    """
+    return _anomalies(
+        _conn=conn,
+        balances_version=worksheet_version(conn=conn, worksheet="balances"),
+        accounts_version=worksheet_version(conn=conn, worksheet="accounts"),
+    )
+
+
+def check_new_balances(conn: GSheetsConnection, records: pd.DataFrame) -> pd.DataFrame:
+    """
+    Score balances about to be added against each account's latest history.
+
+    Parameters:
+    - conn (GSheetsConnection): Connection to the spreadsheet.
+    - records (pd.DataFrame): New `balances` rows (institution_name,
+      account_name, balance).
+
+    Returns:
+    - pd.DataFrame: The flagged rows of `records` with `previous`, `change`,
+      `z_score` and `reason`.
+    """
+    observed = _observed(
+        conn, balances_version=worksheet_version(conn=conn, worksheet="balances")
+    )
+    if observed.empty:
+        return records.iloc[:0]
+    columns = observed.columns.get_indexer(account_ids(records))
+    known = columns >= 0
+
+    previous, change = change_matrix(observed)
+    last = observed.ffill().to_numpy()[-1]
+    windows = change_windows(change)[-1]
+
+    balance = pd.to_numeric(records["balance"], errors="coerce").to_numpy()
+    prior = np.where(known, last[columns], np.nan)
+    history = np.where(known[:, None], windows[columns], np.nan)
+    z = robust_z(balance - prior, history, prior)
+    reason = entry_errors(prior, balance)
+
+    flagged = ~np.isnan(prior) & ((np.abs(z) > Z_THRESHOLD) | (reason != ""))
+    return records.assign(
+        previous=prior,
+        change=balance - prior,
+        z_score=z,
+        reason=np.where(reason != "", reason, REASON_OUTLIER),
+    )[flagged]
@@ -0,0 +1,171 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+from streamlit_gsheets import GSheetsConnection
+
+from utilities.account_dimension import account_ids, get_account_dimension
+from utilities.currency import currency_version
+from utilities.gsheets import worksheet_version
+from utilities.snapshots import get_asof_balances, get_fx_rates
+from utilities.transactions import get_transactions
+
+ATTRIBUTION_COLUMNS = [
+    "previous_date",
+    "full_date",
+    "account_id",
+    "institution_name",
+    "account_name",
+    "category",
+    "start_balance",
+    "end_balance",
+    "change",
+    "contributions",
+    "market",
+]
+
+
+def period_flows(asof: pd.DataFrame, transactions: pd.DataFrame) -> pd.DataFrame:
+    """
+    Net transaction amount per account between consecutive snapshots.
+
+    Row `k` holds the transactions dated after snapshot k-1 and up to (including)
+    snapshot k; the first row is always 0, as is any account without transactions.
+
+    Parameters:
+    - asof (pd.DataFrame): Date × account_id matrix from `get_asof_balances`.
+    - transactions (pd.DataFrame): Output of `get_transactions`.
+
+    Returns:
+    - pd.DataFrame: Dollars, shaped (and labelled) like `asof`.
+    """
+    dates = asof.index.to_numpy()
+    n_periods, n_accounts = asof.shape
+
+    period = np.searchsorted(dates, transactions["full_date"].to_numpy(), side="left")
+    account = asof.columns.get_indexer(account_ids(transactions))
+    keep = (period >= 1) & (period < n_periods) & (account >= 0)
+    flows = np.bincount(
+        period[keep] * n_accounts + account[keep],
+        weights=transactions["amount_cents"].to_numpy()[keep],
+        minlength=n_periods * n_accounts,
+    ).reshape(n_periods, n_accounts)
+    return pd.DataFrame(flows / 100, index=asof.index, columns=asof.columns)
+
+
+def attribute_changes(asof: pd.DataFrame, flows: pd.DataFrame) -> pd.DataFrame:
+    """
+    Split every account's balance change between consecutive snapshots into
+    contributions and market movement.
+
+    Contributions are the account's net transaction amount in the period (see
+    `period_flows`); market movement is the rest of the change (gains, interest,
+    appreciation, untracked flows).
+
+    Parameters:
+    - asof (pd.DataFrame): Date × account_id matrix from `get_asof_balances`.
+    - flows (pd.DataFrame): Output of `period_flows`.
+
+    Returns:
+    - pd.DataFrame: One row per snapshot pair and account whose balance or flows
+      changed: `previous_date`, `full_date`, `account_id`, `start_balance`,
+      `end_balance`, `change`, `contributions`, `market`.
+    """
+    dates = asof.index.to_numpy()
+    balances = asof.to_numpy()
+    start, end = balances[:-1], balances[1:]
+    contributions = flows.to_numpy()[1:]
+    changed = (start != end) | (contributions != 0)
+    rows, cols = np.nonzero(changed)
+
+    change = (end - start)[rows, cols]
+    return pd.DataFrame(
+        {
+            "previous_date": dates[:-1][rows],
+            "full_date": dates[1:][rows],
+            "account_id": asof.columns.to_numpy()[cols],
+            "start_balance": start[rows, cols],
+            "end_balance": end[rows, cols],
+            "change": change,
+            "contributions": contributions[rows, cols],
+            "market": change - contributions[rows, cols],
+        }
+    )
+
+
+@st.cache_data(show_spinner=False)
+def _period_flows(
+    _conn: GSheetsConnection,
+    balances_version: int,
+    accounts_version: int,
+    transactions_version: int,
+    currency_version: tuple,
+) -> pd.DataFrame:
+    flows = period_flows(get_asof_balances(conn=_conn), get_transactions(conn=_conn))
+    return flows * get_fx_rates(conn=_conn)
+
+
+def _versions(conn: GSheetsConnection) -> dict:
+    return {
+        **{
+            f"{ws}_version": worksheet_version(conn=conn, worksheet=ws)
+            for ws in ["balances", "accounts", "transactions"]
+        },
+        "currency_version": currency_version(conn=conn),
+    }
+
+
+def get_period_flows(conn: GSheetsConnection) -> pd.DataFrame:
+    """
+    `period_flows` for the current worksheets, aligned with `get_asof_balances`.
+
+    Transactions are recorded in their account's currency; each period's flows
+    are converted at the rate of the snapshot that closes it.
+    """
+    return _period_flows(_conn=conn, **_versions(conn))
+
+
+@st.cache_data(show_spinner=False)
+def _attribution(
+    _conn: GSheetsConnection,
+    balances_version: int,
+    accounts_version: int,
+    transactions_version: int,
+    currency_version: tuple,
+) -> pd.DataFrame:
+    asof = get_asof_balances(conn=_conn)
+    attribution = attribute_changes(asof, get_period_flows(conn=_conn))
+    dim = get_account_dimension(conn=_conn)[
+        ["account_id", "institution_name", "account_name", "category"]
+    ]
+    return attribution.merge(dim, on="account_id", how="left")[ATTRIBUTION_COLUMNS]
+
+
+def get_attribution(conn: GSheetsConnection) -> pd.DataFrame:
+    """
+    Attribution table (see `attribute_changes`) with account names and category,
+    rebuilt only when `balances`, `accounts` or `transactions` changes.
+    """
+    return _attribution(_conn=conn, **_versions(conn))
+
+
+def summarize_attribution(
+    attribution: pd.DataFrame, since: pd.Timestamp, by: str = "category"
+) -> pd.DataFrame:
+    """
+    Contributions and market movement per `by` group over the periods ending after
+    `since`.
+
+    Returns:
+    - pd.DataFrame: `by`, `contributions`, `market`, `change`, sorted by |change|.
+    """
+    periods = attribution[attribution["full_date"] > since]
+    summary = (
+        periods.groupby(periods[by].fillna("Other"))[
+            ["contributions", "market", "change"]
+        ]
+        .sum()
+        .reset_index()
+    )
+    return summary.reindex(
+        summary["change"].abs().sort_values(ascending=False).index
+    ).reset_index(drop=True)
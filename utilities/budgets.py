@@ -0,0 +1,117 @@
+import numpy as np
+import pandas as pd
+from gspread.exceptions import WorksheetNotFound
+from streamlit_gsheets import GSheetsConnection
+
+from utilities.gsheets import effective_window, load_worksheet
+
+# Columns of the `budgets` worksheet: a monthly spending limit per transaction
+# group, active between the effective dates (blank end date: still active)
+BUDGET_COLUMNS = ["group", "budget", "effective_start_date", "effective_end_date"]
+
+STATUS_OVER = "Over budget"
+STATUS_AHEAD = "Ahead of pace"
+STATUS_ON_TRACK = "On track"
+
+
+def load_budgets(conn: GSheetsConnection) -> pd.DataFrame:
+    """The `budgets` worksheet, or an empty frame when the sheet has none yet."""
+    try:
+        return load_worksheet(conn=conn, worksheet="budgets")
+    except WorksheetNotFound:
+        return pd.DataFrame(columns=BUDGET_COLUMNS)
+
+
+def active_budgets(budgets: pd.DataFrame, month: pd.Timestamp) -> pd.Series:
+    """
+    Monthly budget per group for the calendar month starting at `month`.
+
+    A budget row applies when its effective window overlaps the month; if several
+    rows of a group do, the one that started last wins.
+
+    Returns:
+    - pd.Series: Budget in dollars indexed by group.
+    """
+    budgets = budgets.reindex(columns=BUDGET_COLUMNS).dropna(subset=["group"])
+    if budgets.empty:
+        return pd.Series(dtype=float, name="budget")
+
+    start, end = effective_window(budgets)
+    month_end = month + pd.offsets.MonthBegin(1)
+    active = budgets[
+        (start.fillna(pd.Timestamp.min) < month_end) & (end > month)
+    ].assign(_start=start)
+    active = active.assign(
+        group=active["group"].astype(str).str.strip(),
+        budget=pd.to_numeric(active["budget"], errors="coerce"),
+    ).dropna(subset=["budget"])
+    return (
+        active.sort_values("_start", kind="stable")
+        .groupby("group")["budget"]
+        .last()
+        .astype(float)
+    )
+
+
+def elapsed_fraction(month: pd.Timestamp, today: pd.Timestamp) -> float:
+    """Share of `month` that has passed by the end of `today` (0 to 1)."""
+    days = month.days_in_month
+    return float(np.clip(((today.normalize() - month).days + 1) / days, 0, 1))
+
+
+def budget_vs_actual(
+    cents: pd.Series, budgets: pd.DataFrame, month: pd.Timestamp, today: pd.Timestamp
+) -> pd.DataFrame:
+    """
+    Compare each budgeted group's spend in `month` with its budget and pace.
+
+    Spend is the negated net amount of the group's transactions, so refunds reduce
+    it. For the current month, `expected` is the budget prorated to today and
+    `projected` extrapolates the spend so far to the whole month.
+
+    Parameters:
+    - cents (pd.Series): Month × group cents from `get_month_group_cents`.
+    - budgets (pd.DataFrame): The `budgets` worksheet.
+    - month (pd.Timestamp): First day of the month to compare.
+    - today (pd.Timestamp): Date the pacing is measured at.
+
+    Returns:
+    - pd.DataFrame: One row per budgeted group with `budget`, `spent`, `remaining`,
+      `used` (spent / budget), `expected`, `projected` and `status`, sorted by `used`.
+    """
+    budget = active_budgets(budgets, month)
+    if month in cents.index.get_level_values("full_date"):
+        month_cents = cents.xs(month, level="full_date")
+    else:
+        month_cents = pd.Series(dtype="int64")
+    spent = (-month_cents / 100).reindex(budget.index, fill_value=0.0)
+
+    elapsed = elapsed_fraction(month, today)
+    df = pd.DataFrame({"budget": budget, "spent": spent})
+    df["remaining"] = df["budget"] - df["spent"]
+    df["used"] = df["spent"] / df["budget"].where(df["budget"] != 0)
+    df["expected"] = df["budget"] * elapsed
+    df["projected"] = df["spent"] / elapsed if elapsed > 0 else df["spent"]
+    df["status"] = np.select(
+        [df["spent"] > df["budget"], df["projected"] > df["budget"]],
+        [STATUS_OVER, STATUS_AHEAD],
+        default=STATUS_ON_TRACK,
+    )
+    return (
+        df.rename_axis("group")
+        .reset_index()
+        .sort_values("used", ascending=False)
+        .reset_index(drop=True)
+    )
+
+
+def unbudgeted_spend(
+    cents: pd.Series, budgets: pd.DataFrame, month: pd.Timestamp, exclude: tuple
+) -> float:
+    """Dollars spent in `month` on groups without a budget (excluding `exclude`)."""
+    if month not in cents.index.get_level_values("full_date"):
+        return 0.0
+    month_cents = cents.xs(month, level="full_date")
+    other = ~month_cents.index.isin(active_budgets(budgets, month).index)
+    other &= ~month_cents.index.isin(exclude)
+    return float(-month_cents[other & (month_cents < 0)].sum() / 100)
@@ -0,0 +1,280 @@
+import re
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import streamlit as st
+from gspread.exceptions import WorksheetNotFound
+from streamlit_gsheets import GSheetsConnection
+
+from utilities.gsheets import load_worksheet, worksheet_version, write_worksheet
+from utilities.importer import TRANSACTION_KEY_COLUMNS, parse_amounts, row_hashes
+
+# Columns of the `rules` worksheet. Blank conditions match anything; a rule with
+# several conditions needs all of them.
+# - priority: lower numbers are tried first (blank: after numbered rules)
+# - group: value written to the transaction's `group`
+# - keywords: comma-separated merchant keywords, matched anywhere in the description
+# - pattern: regular expression searched in the description (either it or a keyword)
+# - min_amount / max_amount: inclusive bounds on the signed amount
+# - institution_name / account_name: exact (case-insensitive) account match
+RULE_COLUMNS = [
+    "priority",
+    "group",
+    "keywords",
+    "pattern",
+    "min_amount",
+    "max_amount",
+    "institution_name",
+    "account_name",
+]
+
+
+def _split_keywords(keywords) -> list[str]:
+    if pd.isna(keywords):
+        return []
+    return [k.strip().lower() for k in str(keywords).split(",") if k.strip()]
+
+
+def _normalized(values: pd.Series) -> np.ndarray:
+    return values.fillna("").astype(str).str.strip().str.lower().to_numpy()
+
+
+class RuleSet:
+    """
+    The `rules` worksheet compiled into arrays, matched against many transactions at once.
+
+    Each distinct description is matched with Arrow's vectorized substring and RE2
+    kernels, and each condition becomes a transactions × rules boolean mask. A
+    transaction gets the group of its first matching rule in priority order.
+    Results are remembered per transaction hash in `matches`, so a transaction is
+    matched at most once per rule set.
+    """
+
+    def __init__(self, rules: pd.DataFrame):
+        rules = rules.reindex(columns=RULE_COLUMNS).dropna(subset=["group"])
+        rules = rules[rules["group"].astype(str).str.strip() != ""]
+        priority = pd.to_numeric(rules["priority"], errors="coerce").fillna(np.inf)
+        rules = rules.iloc[np.argsort(priority.to_numpy(), kind="stable")]
+
+        self.groups = rules["group"].astype(str).str.strip().to_numpy()
+        self.keywords = [_split_keywords(keywords) for keywords in rules["keywords"]]
+        self.patterns: list[Optional[re.Pattern]] = []
+        for group, pattern in zip(self.groups, rules["pattern"]):
+            if pd.isna(pattern) or not str(pattern).strip():
+                self.patterns.append(None)
+                continue
+            try:
+                self.patterns.append(re.compile(str(pattern).strip(), re.IGNORECASE))
+            except re.error as e:
+                raise ValueError(
+                    f"The '{group}' rule has an invalid pattern: {e}."
+                ) from e
+        self.min_amount = (
+            pd.to_numeric(rules["min_amount"], errors="coerce").fillna(-np.inf)
+        ).to_numpy()
+        self.max_amount = (
+            pd.to_numeric(rules["max_amount"], errors="coerce").fillna(np.inf)
+        ).to_numpy()
+        self.accounts = {
+            col: _normalized(rules[col]) for col in ["institution_name", "account_name"]
+        }
+
+        # transaction hash -> group (None when no rule matched)
+        self.matches: dict[int, Optional[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self.groups)
+
+    def match(self, transactions: pd.DataFrame) -> pd.Series:
+        """
+        Group of the first matching rule for each transaction.
+
+        Parameters:
+        - transactions (pd.DataFrame): Rows with TRANSACTION_COLUMNS.
+
+        Returns:
+        - pd.Series: Group per row (None where no rule matches), same index.
+        """
+        n = len(transactions)
+        if n == 0 or len(self) == 0:
+            return pd.Series(None, index=transactions.index, dtype=object)
+
+        codes, descriptions = pd.factorize(
+            transactions["description"].fillna("").astype(str)
+        )
+        # Lower-cased once so keywords use Arrow's plain (non-regex) substring search
+        lowered = pc.utf8_lower(pa.array(descriptions, type=pa.string()))
+        text = np.ones((len(descriptions), len(self)), dtype=bool)
+        for j in range(len(self)):
+            if self.keywords[j] or self.patterns[j] is not None:
+                text[:, j] = self._text_matches(j, lowered)
+        mask = text[codes]
+
+        amount = parse_amounts(transactions["amount"]).to_numpy()[:, None]
+        mask &= (self.min_amount <= amount) & (amount <= self.max_amount)
+
+        for col, wanted in self.accounts.items():
+            codes, values = pd.factorize(_normalized(transactions[col]))
+            mask &= ((wanted == "") | (values[:, None] == wanted))[codes]
+
+        first = mask.argmax(axis=1)
+        matched = mask[np.arange(n), first]
+        return pd.Series(
+            np.where(matched, self.groups[first], None),
+            index=transactions.index,
+            dtype=object,
+        )
+
+    def _text_matches(self, j: int, lowered: pa.Array) -> np.ndarray:
+        """Lower-cased descriptions containing one of rule `j`'s keywords or its pattern."""
+        found = np.zeros(len(lowered), dtype=bool)
+        for keyword in self.keywords[j]:
+            found |= pc.match_substring(lowered, keyword).to_numpy(zero_copy_only=False)
+
+        regex = self.patterns[j]
+        if regex is not None:
+            try:
+                found |= pc.match_substring_regex(
+                    lowered, regex.pattern, ignore_case=True
+                ).to_numpy(zero_copy_only=False)
+            except pa.ArrowInvalid:
+                # Python-only syntax (lookarounds, backreferences) that RE2 rejects
+                found |= [regex.search(d) is not None for d in lowered.to_pylist()]
+        return found
+
+
+def categorize(transactions: pd.DataFrame, rules: RuleSet) -> pd.DataFrame:
+    """
+    Fill blank `group` values from the rules; categorized rows are left alone.
+
+    Only uncategorized rows whose hash has not been matched by this rule set before
+    are run through the matcher.
+
+    Parameters:
+    - transactions (pd.DataFrame): Rows with TRANSACTION_COLUMNS.
+    - rules (RuleSet): Compiled rules, e.g. from `get_rules`.
+
+    Returns:
+    - pd.DataFrame: A copy with `group` filled where a rule matched.
+    """
+    blank = _normalized(transactions["group"]) == ""
+    if not blank.any() or len(rules) == 0:
+        return transactions
+
+    todo = transactions[blank]
+    hashes = row_hashes(todo, TRANSACTION_KEY_COLUMNS)
+    new = ~hashes.isin(rules.matches.keys()).to_numpy()
+    if new.any():
+        groups = rules.match(todo[new])
+        rules.matches.update(zip(hashes[new].tolist(), groups.tolist()))
+
+    groups = hashes.map(rules.matches)
+    categorized = transactions.copy()
+    categorized.loc[blank, "group"] = groups.where(groups.notna(), "").to_numpy()
+    return categorized
+
+
+# -----------------------------
+# Worksheet
+# -----------------------------
+def load_rules(conn: GSheetsConnection) -> pd.DataFrame:
+    """The `rules` worksheet, or an empty frame when the sheet has none yet."""
+    try:
+        return load_worksheet(conn=conn, worksheet="rules")
+    except WorksheetNotFound:
+        return pd.DataFrame(columns=RULE_COLUMNS)
+
+
+@st.cache_resource(max_entries=1, show_spinner=False)
+def _compiled_rules(_conn: GSheetsConnection, version: int) -> RuleSet:
+    return RuleSet(load_rules(conn=_conn))
+
+
+def get_rules(conn: GSheetsConnection) -> RuleSet:
+    """
+    Compiled rules, shared by every session until the `rules` worksheet changes.
+
+    Raises:
+    - ValueError: A rule's pattern is not a valid regular expression.
+    """
+    try:
+        version = worksheet_version(conn=conn, worksheet="rules")
+    except WorksheetNotFound:
+        return RuleSet(pd.DataFrame(columns=RULE_COLUMNS))
+    return _compiled_rules(_conn=conn, version=version)
+
+
+def categorize_worksheet(conn: GSheetsConnection) -> int:
+    """
+    Apply the rules to uncategorized rows of the `transactions` worksheet.
+
+    Returns:
+    - int: Number of transactions that were given a group.
+    """
+    transactions = load_worksheet(conn=conn, worksheet="transactions")
+    categorized = categorize(transactions, get_rules(conn))
+    filled = int(
+        (
+            (_normalized(transactions["group"]) == "")
+            & (_normalized(categorized["group"]) != "")
+        ).sum()
+    )
+    if filled:
+        write_worksheet(
+            conn=conn, worksheet="transactions", df=categorized, base=transactions
+        )
+    return filled
+
+
+@st.dialog("Categorization Rules", width="large")
+def categorization_rules__dialog(conn: GSheetsConnection):
+    """
+    Edit the `rules` worksheet and apply it to uncategorized transactions.
+    """
+    st.caption(
+        "Uncategorized transactions get the group of the first rule (lowest "
+        "priority) whose conditions all match. Blank conditions match anything; "
+        "keywords are comma-separated and, like the pattern (a regular expression), "
+        "are found anywhere in the description."
+    )
+
+    rules_df = load_rules(conn=conn).reindex(columns=RULE_COLUMNS)
+    edited_df = st.data_editor(
+        rules_df,
+        num_rows="dynamic",
+        use_container_width=True,
+        hide_index=True,
+        column_config={
+            "priority": st.column_config.NumberColumn("Priority", step=1),
+            "group": st.column_config.TextColumn("Group", required=True),
+            "keywords": st.column_config.TextColumn("Keywords"),
+            "pattern": st.column_config.TextColumn("Pattern"),
+            "min_amount": st.column_config.NumberColumn("Min Amount", format="$%.2f"),
+            "max_amount": st.column_config.NumberColumn("Max Amount", format="$%.2f"),
+            "institution_name": st.column_config.TextColumn("Institution"),
+            "account_name": st.column_config.TextColumn("Account"),
+        },
+    )
+
+    save_col, apply_col = st.columns(2)
+    with save_col:
+        if st.button("Save Rules", type="primary", use_container_width=True):
+            try:
+                RuleSet(edited_df)
+            except ValueError as e:
+                st.error(str(e))
+                return
+            write_worksheet(conn=conn, worksheet="rules", df=edited_df, base=rules_df)
+            st.success("Rules saved.")
+
+    with apply_col:
+        if st.button("Apply to Uncategorized", use_container_width=True):
+            try:
+                filled = categorize_worksheet(conn=conn)
+            except ValueError as e:
+                st.error(str(e))
+                return
+            st.success(f"Categorized **{filled:,}** transactions.")
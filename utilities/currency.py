@@ -0,0 +1,103 @@
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+from gspread.exceptions import WorksheetNotFound
+from streamlit_gsheets import GSheetsConnection
+
+from utilities.gsheets import load_worksheet, worksheet_version
+
+# Currency of accounts with a blank `currency`, unless `base_currency` is set in
+# the settings worksheet
+DEFAULT_BASE_CURRENCY = "USD"
+
+# Columns of the optional `fx_rates` worksheet: value of one unit of `currency`
+# in the base currency, quoted on `full_date`
+FX_COLUMNS = ["full_date", "currency", "rate"]
+
+
+def normalize_currency(codes: pd.Series, base: str) -> pd.Series:
+    """Upper-case currency codes, with blanks meaning the base currency."""
+    codes = codes.astype("string").str.strip().str.upper()
+    return codes.mask(codes.isna() | (codes == ""), base).astype(str)
+
+
+def base_currency(conn: GSheetsConnection) -> str:
+    """`base_currency` from the settings worksheet, or DEFAULT_BASE_CURRENCY."""
+    settings = load_worksheet(conn=conn, worksheet="settings")
+    value = settings.loc[settings["metric"] == "base_currency", "value"]
+    code = normalize_currency(value, "").iloc[0] if len(value) else ""
+    return code or DEFAULT_BASE_CURRENCY
+
+
+def load_fx_rates(conn: GSheetsConnection) -> pd.DataFrame:
+    """The `fx_rates` worksheet, or an empty frame when the sheet has none yet."""
+    try:
+        return load_worksheet(conn=conn, worksheet="fx_rates")
+    except WorksheetNotFound:
+        return pd.DataFrame(columns=FX_COLUMNS)
+
+
+def currency_version(conn: GSheetsConnection) -> tuple[Optional[int], str]:
+    """
+    Key for caches of converted balances: the `fx_rates` version and the base
+    currency.
+    """
+    try:
+        version = worksheet_version(conn=conn, worksheet="fx_rates")
+    except WorksheetNotFound:
+        version = None
+    return version, base_currency(conn=conn)
+
+
+def fx_matrix(
+    dates: pd.DatetimeIndex, currencies: pd.Series, fx_rates: pd.DataFrame, base: str
+) -> tuple[np.ndarray, list[str]]:
+    """
+    Rate of each column's currency on each date, from an as-of join of every
+    (date, currency) pair against the quotes.
+
+    Each date takes the latest quote on or before it; dates before a currency's
+    first quote take that first quote. The base currency is always 1.
+
+    Parameters:
+    - dates (pd.DatetimeIndex): Ascending dates, e.g. the snapshot dates.
+    - currencies (pd.Series): Currency code per column (blank: base currency).
+    - fx_rates (pd.DataFrame): Rows of the `fx_rates` worksheet.
+    - base (str): Base currency code.
+
+    Returns:
+    - tuple: Rates shaped (dates, columns), and the currencies that have no quote
+      at all (converted at 1).
+    """
+    codes = normalize_currency(currencies, base)
+    foreign = pd.Index(codes.unique()).drop(base, errors="ignore")
+
+    quotes = (
+        pd.DataFrame(
+            {
+                "date": pd.to_datetime(fx_rates["full_date"], errors="coerce"),
+                "currency": normalize_currency(fx_rates["currency"], base),
+                "rate": pd.to_numeric(fx_rates["rate"], errors="coerce"),
+            }
+        )
+        .dropna()
+        .query("currency in @foreign")
+        .sort_values("date")
+    )
+
+    grid = pd.DataFrame(
+        {
+            "date": np.repeat(dates.to_numpy(), len(foreign)),
+            "currency": np.tile(foreign.to_numpy(), len(dates)),
+        }
+    ).astype({"date": quotes["date"].dtype})
+    joined = pd.merge_asof(grid, quotes, on="date", by="currency")
+    first_quote = quotes.groupby("currency")["rate"].first()
+    joined["rate"] = joined["rate"].fillna(joined["currency"].map(first_quote))
+
+    table = joined.pivot(index="date", columns="currency", values="rate")
+    table = table.reindex(index=dates, columns=foreign).assign(**{base: 1.0})
+    missing = sorted(foreign.difference(quotes["currency"]))
+    rates = table.fillna(1.0).to_numpy()[:, table.columns.get_indexer(codes)]
+    return rates, missing
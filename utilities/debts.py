@@ -0,0 +1,239 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+from streamlit_gsheets import GSheetsConnection
+
+from utilities.account_dimension import account_ids, get_account_dimension
+from utilities.currency import currency_version
+from utilities.gsheets import load_worksheet, worksheet_version
+from utilities.snapshots import get_asof_balances, get_fx_rates
+
+# Optional columns of the `accounts` worksheet used for liabilities:
+# - interest_rate: annual percentage rate (APR, decimal, e.g. 0.24), compounded
+#   monthly at APR / 12 like card and loan statements
+# - minimum_payment: required monthly payment, in the account's currency
+DEBT_TERMS = ["interest_rate", "minimum_payment"]
+
+# Strategies, in the order they are simulated
+STRATEGIES = ["Avalanche", "Snowball", "Custom"]
+
+# Simulations stop after this many months even if a debt is still open
+MAX_MONTHS = 600
+
+# Balances below half a cent count as paid off
+PAID_OFF = 0.005
+
+
+def load_debts(
+    accounts: pd.DataFrame, dimension: pd.DataFrame, balances: pd.Series
+) -> pd.DataFrame:
+    """
+    Open liabilities with their payoff terms.
+
+    Parameters:
+    - accounts (pd.DataFrame): Rows of the `accounts` worksheet; the latest row of
+      a reopened account supplies its terms.
+    - dimension (pd.DataFrame): Account dimension from `get_account_dimension`.
+    - balances (pd.Series): Latest balance per account_id, in the base currency.
+
+    Returns:
+    - pd.DataFrame: `account_id`, `name`, `balance` (amount owed, positive),
+      `interest_rate` and `minimum_payment` (0 where blank), one row per
+      liability with a balance.
+    """
+    terms = (
+        accounts.reindex(columns=[*DEBT_TERMS, "effective_start_date"])
+        .assign(
+            account_id=account_ids(accounts),
+            start=pd.to_datetime(accounts["effective_start_date"], errors="coerce"),
+        )
+        .sort_values("start", na_position="first")
+        .drop_duplicates("account_id", keep="last")
+        .set_index("account_id")[DEBT_TERMS]
+        .apply(pd.to_numeric, errors="coerce")
+    )
+
+    debts = dimension[dimension["balance_type"] == "Liability"].assign(
+        name=lambda df: df["institution_name"] + " - " + df["account_name"],
+        balance=lambda df: df["account_id"].map(balances).abs(),
+    )
+    debts = debts.join(terms, on="account_id")
+    debts[DEBT_TERMS] = debts[DEBT_TERMS].fillna(0.0)
+    return debts[debts["balance"] >= PAID_OFF][
+        ["account_id", "name", "balance", *DEBT_TERMS]
+    ].reset_index(drop=True)
+
+
+def payoff_orders(debts: pd.DataFrame, custom: list[int]) -> np.ndarray:
+    """
+    Order in which each strategy sends extra payments to the debts.
+
+    Avalanche pays the highest rate first (smaller balance on ties), snowball
+    the smallest balance first (higher rate on ties), and custom follows
+    `custom`, a priority per debt (lower first).
+
+    Returns:
+    - np.ndarray: Debt indices shaped (strategies, debts).
+    """
+    rate, balance = debts["interest_rate"].to_numpy(), debts["balance"].to_numpy()
+    return np.stack(
+        [
+            np.lexsort((balance, -rate)),
+            np.lexsort((-rate, balance)),
+            np.argsort(np.asarray(custom), kind="stable"),
+        ]
+    )
+
+
+def simulate_payoff(
+    debts: pd.DataFrame, orders: np.ndarray, extra_payment: float
+) -> dict[str, np.ndarray]:
+    """
+    Month-by-month amortization of every debt under every strategy at once.
+
+    Each month interest accrues, every open debt gets its minimum payment, and
+    the rest of the budget (all minimum payments plus `extra_payment`) goes to
+    the open debts in the strategy's order, so the payments of a cleared debt
+    roll over to the next one. The months depend on each other through those
+    rollovers; each month is one set of (strategies × debts) array operations.
+
+    Parameters:
+    - debts (pd.DataFrame): Output of `load_debts`.
+    - orders (np.ndarray): Output of `payoff_orders`.
+    - extra_payment (float): Monthly amount paid on top of the minimums.
+
+    Returns:
+    - dict: `balances` (strategies × months+1 × debts, month 0 today),
+      `interest` and `payments` (strategies × months × debts).
+    """
+    rate = debts["interest_rate"].to_numpy() / 12
+    minimum = debts["minimum_payment"].to_numpy()
+    budget = minimum.sum() + extra_payment
+
+    balance = np.tile(debts["balance"].to_numpy(dtype=float), (len(orders), 1))
+    balances, interest, payments = [balance], [], []
+    for _ in range(MAX_MONTHS):
+        if (balance < PAID_OFF).all():
+            break
+        accrued = balance * rate
+        owed = balance + accrued
+        paid = np.minimum(minimum, owed)
+
+        # Spread what is left of the budget down each strategy's order
+        left = budget - paid.sum(axis=1, keepdims=True)
+        remaining = np.take_along_axis(owed - paid, orders, axis=1)
+        before = np.cumsum(remaining, axis=1) - remaining
+        extra = np.clip(left - before, 0, remaining)
+        np.put_along_axis(paid, orders, np.take_along_axis(paid, orders, 1) + extra, 1)
+
+        balance = np.where(owed - paid < PAID_OFF, 0.0, owed - paid)
+        balances.append(balance)
+        interest.append(accrued)
+        payments.append(paid)
+
+    shape = (len(orders), 0, len(debts))
+    return {
+        "balances": np.stack(balances, axis=1),
+        "interest": np.stack(interest, axis=1) if interest else np.zeros(shape),
+        "payments": np.stack(payments, axis=1) if payments else np.zeros(shape),
+    }
+
+
+def summarize_payoff(debts: pd.DataFrame, simulation: dict) -> pd.DataFrame:
+    """
+    Months to debt-free, total interest and total paid per strategy.
+
+    `months` is NaN for a strategy that does not clear every debt within
+    MAX_MONTHS (payments below the interest).
+    """
+    balances = simulation["balances"]
+    open_months = (balances.sum(axis=2) >= PAID_OFF).sum(axis=1)
+    return pd.DataFrame(
+        {
+            "strategy": STRATEGIES[: len(balances)],
+            "months": np.where(open_months <= MAX_MONTHS, open_months, np.nan),
+            "interest": simulation["interest"].sum(axis=(1, 2)),
+            "paid": simulation["payments"].sum(axis=(1, 2)),
+        }
+    )
+
+
+def debt_payoff_months(simulation: dict) -> np.ndarray:
+    """Month each debt is cleared under each strategy (strategies × debts, NaN if never)."""
+    cleared = simulation["balances"] < PAID_OFF
+    return np.where(cleared.any(axis=1), cleared.argmax(axis=1), np.nan)
+
+
+# -----------------------------
+# Cached simulation
+# -----------------------------
+@st.cache_data(show_spinner=False)
+def _debts(
+    _conn: GSheetsConnection,
+    balances_version: int,
+    accounts_version: int,
+    currency_version: tuple,
+) -> pd.DataFrame:
+    asof = get_asof_balances(conn=_conn)
+    latest = asof.iloc[-1] if len(asof) else pd.Series(dtype=float)
+    debts = load_debts(
+        accounts=load_worksheet(conn=_conn, worksheet="accounts"),
+        dimension=get_account_dimension(conn=_conn),
+        balances=latest,
+    )
+    # Minimum payments are in the account's currency, like its balances
+    fx = get_fx_rates(conn=_conn)
+    if len(fx):
+        debts["minimum_payment"] *= debts["account_id"].map(fx.iloc[-1]).fillna(1.0)
+    return debts
+
+
+def _versions(conn: GSheetsConnection) -> dict:
+    return {
+        "balances_version": worksheet_version(conn=conn, worksheet="balances"),
+        "accounts_version": worksheet_version(conn=conn, worksheet="accounts"),
+        "currency_version": currency_version(conn=conn),
+    }
+
+
+def get_debts(conn: GSheetsConnection) -> pd.DataFrame:
+    """`load_debts` for the current worksheets, rebuilt only when they change."""
+    return _debts(_conn=conn, **_versions(conn))
+
+
+@st.cache_data(show_spinner=False)
+def _payoff(
+    _conn: GSheetsConnection,
+    balances_version: int,
+    accounts_version: int,
+    currency_version: tuple,
+    extra_payment: float,
+    custom: tuple[int, ...],
+) -> tuple[pd.DataFrame, dict]:
+    debts = _debts(_conn, balances_version, accounts_version, currency_version)
+    simulation = simulate_payoff(
+        debts, payoff_orders(debts, list(custom)), extra_payment
+    )
+    return summarize_payoff(debts, simulation), simulation
+
+
+def get_payoff(
+    conn: GSheetsConnection, extra_payment: float, custom: list[int]
+) -> tuple[pd.DataFrame, dict]:
+    """
+    `summarize_payoff` and `simulate_payoff` for the current liabilities.
+
+    Cached per extra payment and custom order, so switching back to a plan
+    already seen does not simulate again.
+
+    Parameters:
+    - conn (GSheetsConnection): Connection to the spreadsheet.
+    - extra_payment (float): Monthly amount paid on top of the minimums.
+    - custom (list[int]): Custom priority per row of `get_debts` (lower first).
+    """
+    return _payoff(
+        _conn=conn,
+        **_versions(conn),
+        extra_payment=float(extra_payment),
+        custom=tuple(int(p) for p in custom),
+    )
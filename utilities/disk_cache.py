@@ -0,0 +1,150 @@
+import json
+import logging
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+import pandas as pd
+import streamlit as st
+
+# Parquet snapshots and their manifest; survives restarts and redeploys on the same disk
+CACHE_DIR = Path(".cache") / "frames"
+MANIFEST_NAME = "manifest.json"
+
+# Default for diskCache.maxMegabytes in .streamlit/config.toml: total size of the
+# snapshots, beyond which the least recently used are evicted
+DEFAULT_MAX_MEGABYTES = 256
+
+logger = logging.getLogger(__name__)
+
+
+class DiskCache:
+    """
+    Size-bounded store of DataFrame snapshots as Parquet files.
+
+    `manifest.json` records, per key, the file name, its size, caller metadata (e.g.
+    the content version and fetch time) and when it was last read, which drives
+    least-recently-used eviction.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._manifest = self._load_manifest()
+
+    # --- Public API ---
+    def get(self, key: str) -> Optional[tuple[pd.DataFrame, dict]]:
+        """
+        Read the snapshot stored under `key`.
+
+        Returns:
+        - tuple[pd.DataFrame, dict] or None: The frame and its metadata, or None when
+          the key is missing or the file is unreadable (the entry is then dropped).
+        """
+        with self._lock:
+            entry = self._manifest.get(key)
+            if entry is None:
+                return None
+            try:
+                df = pd.read_parquet(self.directory / entry["file"])
+            except (OSError, ValueError) as e:
+                logger.warning("Dropping unreadable cache entry %s: %s", key, e)
+                self._remove(key)
+                self._save_manifest()
+                return None
+            entry["last_access"] = time.time()
+            self._save_manifest()
+            return df, dict(entry["meta"])
+
+    def put(self, key: str, df: pd.DataFrame, **meta) -> bool:
+        """
+        Store `df` under `key` with JSON-serializable `meta`, evicting old entries.
+
+        Returns:
+        - bool: False when the frame cannot be written as Parquet (e.g. a column mixes
+          numbers and text); the caller simply keeps it in memory only.
+        """
+        file = re.sub(r"[^A-Za-z0-9_.-]", "_", key) + ".parquet"
+        path = self.directory / file
+        tmp = path.with_suffix(".tmp")
+
+        with self._lock:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            try:
+                df.to_parquet(tmp, index=False)
+            except (ValueError, TypeError, ArithmeticError) as e:
+                logger.info("Not caching %s on disk: %s", key, e)
+                tmp.unlink(missing_ok=True)
+                return False
+            tmp.replace(path)
+
+            self._manifest[key] = {
+                "file": file,
+                "bytes": path.stat().st_size,
+                "meta": meta,
+                "last_access": time.time(),
+            }
+            self._evict(keep=key)
+            self._save_manifest()
+            return True
+
+    def delete(self, key: str):
+        with self._lock:
+            if key in self._manifest:
+                self._remove(key)
+                self._save_manifest()
+
+    def size(self) -> int:
+        with self._lock:
+            return sum(entry["bytes"] for entry in self._manifest.values())
+
+    # --- Internals ---
+    def _evict(self, keep: str):
+        total = sum(entry["bytes"] for entry in self._manifest.values())
+        by_age = sorted(self._manifest, key=lambda k: self._manifest[k]["last_access"])
+        for key in by_age:
+            if total <= self.max_bytes:
+                break
+            if key != keep:
+                total -= self._manifest[key]["bytes"]
+                self._remove(key)
+
+    def _remove(self, key: str):
+        entry = self._manifest.pop(key)
+        (self.directory / entry["file"]).unlink(missing_ok=True)
+
+    def _load_manifest(self) -> dict:
+        try:
+            with open(self.directory / MANIFEST_NAME) as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        # Drop entries whose snapshot file went missing
+        return {
+            key: entry
+            for key, entry in manifest.items()
+            if (self.directory / entry.get("file", "")).is_file()
+        }
+
+    def _save_manifest(self):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp = self.directory / f"{MANIFEST_NAME}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(self._manifest, f)
+        tmp.replace(self.directory / MANIFEST_NAME)
+
+
+@st.cache_resource
+def get_disk_cache() -> DiskCache | None:
+    """One disk cache (and manifest lock) per server process; None when disabled."""
+    from utilities.helper import get_config_value
+
+    max_megabytes = get_config_value("diskCache.maxMegabytes")
+    if max_megabytes is None:
+        max_megabytes = DEFAULT_MAX_MEGABYTES
+    if max_megabytes <= 0:
+        return None
+    return DiskCache(CACHE_DIR, max_bytes=int(max_megabytes * 1024**2))
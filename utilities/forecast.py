@@ -0,0 +1,349 @@
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+from streamlit_gsheets import GSheetsConnection
+
+from utilities.gsheets import effective_window, load_worksheet, worksheet_version
+from utilities.transactions import (
+    INCOME_GROUP,
+    SAVINGS_GROUP,
+    get_month_group_cents,
+    get_transactions,
+    month_group_cents,
+)
+
+# Forecast lengths offered on the Income & Expenses page, in months
+HORIZONS = [12, 24, 36]
+
+# A merchant is recurring when it shows up in most of the recent complete months
+# (including one of the last two) for about the same amount each time
+RECURRING_LOOKBACK_MONTHS = 6
+RECURRING_MIN_MONTHS = 5
+RECURRING_TOLERANCE = 0.1
+
+# The rest of each group's spending: a trailing average plus, once there are two
+# full years of history, a calendar-month adjustment from up to three years
+LEVEL_MONTHS = 12
+SEASONAL_MIN_MONTHS = 24
+SEASONAL_MONTHS = 36
+
+RECURRING_COLUMNS = ["description", "group", "amount_cents", "months_seen"]
+
+SOURCE_INCOME = "Income"
+SOURCE_RECURRING = "Recurring"
+SOURCE_SEASONAL = "Seasonal"
+
+
+@dataclass
+class CashFlowForecast:
+    """
+    Monthly cash flow projected from the ledger and the `income` worksheet.
+
+    - monthly: `full_date` (month start), `group`, `source` and signed `amount` in
+      dollars, one row per forecast month, group and source.
+    - recurring: the detected recurring items with their monthly `amount`.
+    - take_home_rate: share of gross income that reached the ledger as `Income`
+      over the last year; None when it could not be measured (gross is used).
+    """
+
+    monthly: pd.DataFrame
+    recurring: pd.DataFrame
+    take_home_rate: Optional[float]
+
+    def totals(self) -> pd.DataFrame:
+        """Income, expenses, net and cumulative net cash flow per forecast month."""
+        income = self.monthly["source"] == SOURCE_INCOME
+        df = (
+            self.monthly.assign(
+                income=self.monthly["amount"].where(income, 0.0),
+                expenses=self.monthly["amount"].where(~income, 0.0),
+            )
+            .groupby("full_date")[["income", "expenses"]]
+            .sum()
+        )
+        df["net"] = df["income"] + df["expenses"]
+        df["cumulative_net"] = df["net"].cumsum()
+        return df.reset_index()
+
+
+# -----------------------------
+# Building blocks
+# -----------------------------
+def month_offsets(months: pd.Series, start: pd.Timestamp) -> np.ndarray:
+    """Whole months from `start` to each month start (negative before it)."""
+    return (
+        (months.dt.year - start.year) * 12 + months.dt.month - start.month
+    ).to_numpy()
+
+
+def merchant_keys(descriptions: pd.Series) -> np.ndarray:
+    """
+    Description with digits and reference marks removed, so "NETFLIX.COM 0412" and
+    "NETFLIX.COM 0513" are one merchant. Each distinct description is cleaned once.
+    """
+    codes, uniques = pd.factorize(descriptions.fillna("").astype(str))
+    keys = (
+        pd.Series(uniques, dtype=object)
+        .str.lower()
+        .str.replace(r"[\d#*]+", " ", regex=True)
+        .str.split()
+        .str.join(" ")
+        .to_numpy()
+    )
+    return keys[codes]
+
+
+def detect_recurring(
+    transactions: pd.DataFrame, as_of: pd.Timestamp
+) -> tuple[pd.DataFrame, np.ndarray]:
+    """
+    Find merchants charged for a steady amount nearly every month.
+
+    Parameters:
+    - transactions (pd.DataFrame): Output of `get_transactions`.
+    - as_of (pd.Timestamp): Start of the current (incomplete) month.
+
+    Returns:
+    - tuple: The recurring items (`description`, `group`, `amount_cents`,
+      `months_seen`), and a boolean mask of the transactions that belong to them.
+      Income and savings transfers are never recurring items.
+    """
+    window_start = as_of - pd.DateOffset(months=RECURRING_LOOKBACK_MONTHS)
+    months = transactions["full_date"].dt.to_period("M").dt.to_timestamp()
+    offsets = month_offsets(months, window_start)
+    in_window = (
+        (offsets >= 0)
+        & (offsets < RECURRING_LOOKBACK_MONTHS)
+        & transactions["group"].notna().to_numpy()
+        & ~transactions["group"].isin([INCOME_GROUP, SAVINGS_GROUP]).to_numpy()
+    )
+    keys = merchant_keys(transactions["description"])
+    codes, merchants = pd.factorize(keys[in_window])
+    if len(merchants) == 0:
+        return pd.DataFrame(columns=RECURRING_COLUMNS), np.zeros(len(keys), bool)
+
+    # Merchants × months: summed cents, and whether the merchant was charged
+    cells = codes * RECURRING_LOOKBACK_MONTHS + offsets[in_window]
+    size = len(merchants) * RECURRING_LOOKBACK_MONTHS
+    shape = (len(merchants), RECURRING_LOOKBACK_MONTHS)
+    cents = np.bincount(
+        cells,
+        weights=transactions["amount_cents"].to_numpy()[in_window],
+        minlength=size,
+    ).reshape(shape)
+    seen = (np.bincount(cells, minlength=size) > 0).reshape(shape)
+
+    charged = np.where(seen, cents, np.nan)
+    median = np.nanmedian(charged, axis=1)
+    deviation = np.nanmax(np.abs(charged - median[:, None]), axis=1)
+    recurring = (
+        (seen.sum(axis=1) >= RECURRING_MIN_MONTHS)
+        & seen[:, -2:].any(axis=1)
+        & (median != 0)
+        & (deviation <= RECURRING_TOLERANCE * np.abs(median))
+    )
+
+    # Latest description and group of each recurring merchant
+    latest = (
+        transactions[in_window]
+        .assign(_merchant=codes)
+        .sort_values("full_date", kind="stable")
+        .groupby("_merchant")[["description", "group"]]
+        .last()
+    )
+    items = pd.DataFrame(
+        {
+            "description": latest["description"].astype(str).to_numpy()[recurring],
+            "group": latest["group"].astype(str).to_numpy()[recurring],
+            "amount_cents": np.rint(median[recurring]).astype("int64"),
+            "months_seen": seen.sum(axis=1)[recurring],
+        }
+    ).sort_values("amount_cents", ignore_index=True)
+
+    # Every transaction of a recurring merchant, including ones before the window,
+    # so the remaining spending can be averaged without counting them twice
+    members = (
+        pd.Index(keys).isin(merchants[recurring])
+        & ~transactions["group"].isin([INCOME_GROUP, SAVINGS_GROUP]).to_numpy()
+    )
+    return items, members
+
+
+def seasonal_averages(history: pd.DataFrame, months: pd.DatetimeIndex) -> np.ndarray:
+    """
+    Forecast each column of `history` for `months`.
+
+    The level is the mean of the last LEVEL_MONTHS. With at least two full years of
+    history, each calendar month is shifted by how far it ran above or below the
+    mean in the last (up to three) full years.
+
+    Parameters:
+    - history (pd.DataFrame): Complete months × groups, indexed by month start.
+    - months (pd.DatetimeIndex): Month starts to forecast.
+
+    Returns:
+    - np.ndarray: Forecast months × groups.
+    """
+    values = history.to_numpy(dtype=float)
+    forecast = np.zeros((len(months), values.shape[1]))
+    if len(values) == 0:
+        return forecast
+    forecast += values[-LEVEL_MONTHS:].mean(axis=0)
+
+    years = min(len(values), SEASONAL_MONTHS) // 12
+    if years * 12 >= SEASONAL_MIN_MONTHS:
+        window = values[-years * 12 :]
+        calendar = history.index[-years * 12 :].month.to_numpy() - 1
+        # Months in the window are consecutive, so each calendar month has `years` rows
+        by_month = np.zeros((12, values.shape[1]))
+        np.add.at(by_month, calendar, window)
+        offsets = by_month / years - window.mean(axis=0)
+        forecast += offsets[months.month.to_numpy() - 1]
+    return forecast
+
+
+def monthly_gross_income(income: pd.DataFrame, months: pd.DatetimeIndex) -> np.ndarray:
+    """Gross income (annual `income` / 12) of the rows active at each month start."""
+    if income.empty:
+        return np.zeros(len(months))
+    start, end = effective_window(income)
+    m = months.to_numpy()[:, None]
+    active = (start.fillna(pd.Timestamp.min).to_numpy() <= m) & (m < end.to_numpy())
+    annual = pd.to_numeric(income["income"], errors="coerce").fillna(0).to_numpy()
+    return active @ annual / 12
+
+
+def forecast_cash_flow(
+    transactions: pd.DataFrame,
+    cents: pd.Series,
+    income: pd.DataFrame,
+    as_of: pd.Timestamp,
+    horizon: int,
+) -> CashFlowForecast:
+    """
+    Project monthly cash flow for the `horizon` months starting at `as_of`.
+
+    - Income: gross income active in each month (from the `income` worksheet),
+      scaled by the take-home rate measured over the last LEVEL_MONTHS.
+    - Recurring: each detected recurring item at its median monthly amount.
+    - Seasonal: each group's remaining spending (see `seasonal_averages`).
+
+    Savings transfers are left out, as in the monthly totals.
+
+    Parameters:
+    - transactions (pd.DataFrame): Output of `get_transactions`.
+    - cents (pd.Series): Month × group cents from `get_month_group_cents`.
+    - income (pd.DataFrame): The `income` worksheet.
+    - as_of (pd.Timestamp): Start of the current month, the first forecast month.
+    - horizon (int): Number of months to forecast.
+
+    Returns:
+    - CashFlowForecast
+    """
+    future = pd.date_range(as_of, periods=horizon, freq="MS")
+    recurring, members = detect_recurring(transactions, as_of)
+
+    # Complete months × groups of spending that is neither recurring nor income
+    residual = cents.sub(month_group_cents(transactions[members]), fill_value=0)
+    dates = residual.index.get_level_values("full_date")
+    groups = residual.index.get_level_values("group")
+    residual = residual[(dates < as_of) & ~groups.isin([INCOME_GROUP, SAVINGS_GROUP])]
+    history = residual.unstack("group", fill_value=0)
+    if not history.empty:
+        first = max(history.index.min(), as_of - pd.DateOffset(months=SEASONAL_MONTHS))
+        history = history.reindex(
+            pd.date_range(first, as_of, freq="MS", inclusive="left"), fill_value=0
+        )
+    seasonal = seasonal_averages(history, future) / 100
+
+    # Take-home rate: ledger income over gross income in the same months
+    past = pd.date_range(
+        as_of - pd.DateOffset(months=LEVEL_MONTHS), as_of, freq="MS", inclusive="left"
+    )
+    gross_past = monthly_gross_income(income, past).sum()
+    dates = cents.index.get_level_values("full_date")
+    received = (
+        cents[
+            (cents.index.get_level_values("group") == INCOME_GROUP)
+            & (dates >= past[0])
+            & (dates < as_of)
+        ].sum()
+        / 100
+    )
+    take_home_rate = (
+        float(received / gross_past) if gross_past > 0 and received > 0 else None
+    )
+    gross = monthly_gross_income(income, future)
+
+    recurring_by_group = recurring.groupby("group")["amount_cents"].sum() / 100
+    frames = [
+        pd.DataFrame(
+            {
+                "full_date": future,
+                "group": INCOME_GROUP,
+                "source": SOURCE_INCOME,
+                "amount": gross * (take_home_rate or 1.0),
+            }
+        ),
+        pd.DataFrame(
+            {
+                "full_date": np.repeat(future, len(recurring_by_group)),
+                "group": np.tile(recurring_by_group.index, horizon),
+                "source": SOURCE_RECURRING,
+                "amount": np.tile(recurring_by_group.to_numpy(), horizon),
+            }
+        ),
+        pd.DataFrame(
+            {
+                "full_date": np.repeat(future, history.shape[1]),
+                "group": np.tile(history.columns, horizon),
+                "source": SOURCE_SEASONAL,
+                "amount": seasonal.ravel(),
+            }
+        ),
+    ]
+    monthly = pd.concat(frames, ignore_index=True)
+    return CashFlowForecast(
+        monthly=monthly[monthly["amount"] != 0].reset_index(drop=True),
+        recurring=recurring.assign(amount=recurring["amount_cents"] / 100).drop(
+            columns="amount_cents"
+        ),
+        take_home_rate=take_home_rate,
+    )
+
+
+# -----------------------------
+# Cached forecast
+# -----------------------------
+@st.cache_data(show_spinner=False, max_entries=len(HORIZONS))
+def _cash_flow_forecast(
+    _conn: GSheetsConnection,
+    transactions_version: int,
+    income_version: int,
+    as_of: pd.Timestamp,
+    horizon: int,
+) -> CashFlowForecast:
+    return forecast_cash_flow(
+        transactions=get_transactions(conn=_conn),
+        cents=get_month_group_cents(conn=_conn),
+        income=load_worksheet(conn=_conn, worksheet="income"),
+        as_of=as_of,
+        horizon=horizon,
+    )
+
+
+def cash_flow_forecast(conn: GSheetsConnection, horizon: int) -> CashFlowForecast:
+    """
+    Cash-flow forecast from this month on, rebuilt only when the `transactions` or
+    `income` worksheet changes (or a new month starts).
+    """
+    return _cash_flow_forecast(
+        _conn=conn,
+        transactions_version=worksheet_version(conn=conn, worksheet="transactions"),
+        income_version=worksheet_version(conn=conn, worksheet="income"),
+        as_of=pd.Timestamp.today().normalize().replace(day=1),
+        horizon=horizon,
+    )
@@ -0,0 +1,241 @@
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+from gspread.exceptions import WorksheetNotFound
+from streamlit_gsheets import GSheetsConnection
+
+from utilities.account_dimension import get_account_dimension
+from utilities.attribution import get_period_flows
+from utilities.currency import currency_version
+from utilities.gsheets import load_worksheet, worksheet_version
+from utilities.snapshots import get_asof_balances
+
+# Columns of the `goals` worksheet:
+# - goal: name shown on the dashboard
+# - target_amount: balance the funding accounts should reach
+# - target_date: when it should be reached (MM/DD/YYYY)
+# - funding_accounts: comma-separated account names ("Brokerage" or
+#   "Fidelity - Brokerage"), account types or categories; blank: all accounts
+# - expected_return: annual return of the funding accounts (blank: Settings)
+GOAL_COLUMNS = [
+    "goal",
+    "target_amount",
+    "target_date",
+    "funding_accounts",
+    "expected_return",
+]
+
+# Months of recorded deposits the current contribution pace is averaged over
+PACE_MONTHS = 12
+
+STATUS_REACHED = "Reached"
+STATUS_ON_TRACK = "On track"
+STATUS_BEHIND = "Behind"
+
+
+def load_goals(conn: GSheetsConnection) -> pd.DataFrame:
+    """The `goals` worksheet, or an empty frame when the sheet has none yet."""
+    try:
+        return load_worksheet(conn=conn, worksheet="goals")
+    except WorksheetNotFound:
+        return pd.DataFrame(columns=GOAL_COLUMNS)
+
+
+def funding_matrix(goals: pd.DataFrame, dimension: pd.DataFrame) -> np.ndarray:
+    """
+    Goals × accounts membership: which accounts fund each goal.
+
+    A `funding_accounts` entry selects every account whose name, "institution -
+    name", account type or category equals it (case-insensitive). The entries of
+    all goals are joined to the account labels in one merge.
+
+    Parameters:
+    - goals (pd.DataFrame): Rows of the `goals` worksheet.
+    - dimension (pd.DataFrame): Account dimension, one row per account column.
+
+    Returns:
+    - np.ndarray: Boolean, shaped (goals, accounts).
+    """
+    names = dimension["account_name"].fillna("").astype(str).str.strip()
+    institutions = dimension["institution_name"].fillna("").astype(str).str.strip()
+    labels = pd.DataFrame(
+        {
+            "label": pd.concat(
+                [
+                    names,
+                    institutions + " - " + names,
+                    dimension["account_type"].fillna("").astype(str),
+                    dimension["category"].fillna("").astype(str),
+                ],
+                ignore_index=True,
+            )
+            .str.strip()
+            .str.lower(),
+            "account": np.tile(np.arange(len(dimension)), 4),
+        }
+    )
+
+    entries = (
+        goals["funding_accounts"]
+        .reset_index(drop=True)
+        .fillna("")
+        .astype(str)
+        .str.lower()
+        .str.split(",")
+        .explode()
+        .str.strip()
+    )
+    entries = pd.DataFrame({"goal": entries.index, "label": entries.to_numpy()})
+    entries = entries[entries["label"] != ""]
+    pairs = entries.merge(labels, on="label")
+
+    matrix = np.zeros((len(goals), len(dimension)), dtype=bool)
+    matrix[pairs["goal"].to_numpy(), pairs["account"].to_numpy()] = True
+    # Goals without funding accounts track net worth
+    matrix[~np.isin(np.arange(len(goals)), entries["goal"])] = True
+    return matrix
+
+
+def project_goals(
+    goals: pd.DataFrame,
+    balances: np.ndarray,
+    monthly_flows: np.ndarray,
+    funding: np.ndarray,
+    today: pd.Timestamp,
+    default_return: float,
+) -> pd.DataFrame:
+    """
+    Progress, projection and required monthly contribution of every goal at once.
+
+    Each goal's funding accounts grow at its monthly rate; deposits continue at
+    the recent pace. The required contribution is the level monthly payment
+    that closes the gap between the grown balance and the target by the date.
+
+    Parameters:
+    - goals (pd.DataFrame): Rows of the `goals` worksheet.
+    - balances (np.ndarray): Latest balance per account.
+    - monthly_flows (np.ndarray): Average monthly net deposits per account.
+    - funding (np.ndarray): Output of `funding_matrix`.
+    - today (pd.Timestamp): Date progress is measured at.
+    - default_return (float): Annual return for goals without `expected_return`.
+
+    Returns:
+    - pd.DataFrame: GOAL_COLUMNS plus `target` (`target_amount` as a number, NaN
+      where blank or invalid), `annual_return`, `current`, `progress`,
+      `months_left`, `pace`, `projected`, `required_monthly` and `status`.
+    """
+    target = pd.to_numeric(goals["target_amount"], errors="coerce").to_numpy()
+    target_date = pd.to_datetime(goals["target_date"], errors="coerce")
+    annual = (
+        pd.to_numeric(goals["expected_return"], errors="coerce")
+        .fillna(default_return)
+        .to_numpy()
+    )
+
+    current = funding @ balances
+    pace = funding @ monthly_flows
+    months = np.maximum(
+        ((target_date - today).dt.days / 30.4375).fillna(0).to_numpy(), 0
+    )
+    rate = (1 + annual) ** (1 / 12) - 1
+
+    # Growth of today's balance, and of 1 dollar deposited every month, by the date
+    growth = (1 + rate) ** months
+    with np.errstate(divide="ignore", invalid="ignore"):
+        annuity = np.where(rate != 0, (growth - 1) / rate, months)
+    projected = current * growth + pace * annuity
+    gap = target - current * growth
+    with np.errstate(divide="ignore", invalid="ignore"):
+        required = np.where(annuity > 0, gap / annuity, gap)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        progress = np.where(target > 0, current / target, np.nan)
+
+    return goals.reindex(columns=GOAL_COLUMNS).assign(
+        target=target,
+        annual_return=annual,
+        current=current,
+        progress=progress,
+        months_left=months,
+        pace=pace,
+        projected=projected,
+        required_monthly=np.maximum(required, 0),
+        status=np.select(
+            [current >= target, projected >= target],
+            [STATUS_REACHED, STATUS_ON_TRACK],
+            default=STATUS_BEHIND,
+        ),
+    )
+
+
+def goal_paths(projection: pd.DataFrame, months: int) -> np.ndarray:
+    """
+    Projected balance of every goal's funding accounts for the next `months`
+    months, as a goals × months matrix (column 0 is today).
+    """
+    annual = projection["annual_return"].to_numpy()[:, None]
+    rate = (1 + annual) ** (1 / 12) - 1
+    k = np.arange(months + 1)[None, :]
+    growth = (1 + rate) ** k
+    with np.errstate(divide="ignore", invalid="ignore"):
+        annuity = np.where(rate != 0, (growth - 1) / rate, k)
+    return (
+        projection["current"].to_numpy()[:, None] * growth
+        + projection["pace"].to_numpy()[:, None] * annuity
+    )
+
+
+# -----------------------------
+# Cached projection
+# -----------------------------
+@st.cache_data(show_spinner=False)
+def _goal_projection(
+    _conn: GSheetsConnection,
+    goals_version: Optional[int],
+    balances_version: int,
+    accounts_version: int,
+    transactions_version: int,
+    currency_version: tuple,
+    default_return: float,
+    today: pd.Timestamp,
+) -> pd.DataFrame:
+    goals = load_goals(conn=_conn)
+    goals = goals.reindex(columns=GOAL_COLUMNS).dropna(subset=["goal"])
+    asof = get_asof_balances(conn=_conn)
+    dim = get_account_dimension(conn=_conn).set_index("account_id")
+    dim = dim.reindex(asof.columns)
+
+    flows = get_period_flows(conn=_conn)
+    recent = flows[flows.index > today - pd.DateOffset(months=PACE_MONTHS)]
+
+    return project_goals(
+        goals=goals,
+        balances=asof.iloc[-1].to_numpy() if len(asof) else np.zeros(asof.shape[1]),
+        monthly_flows=recent.sum().to_numpy() / PACE_MONTHS,
+        funding=funding_matrix(goals, dim),
+        today=today,
+        default_return=default_return,
+    )
+
+
+def get_goal_projection(conn: GSheetsConnection, default_return: float) -> pd.DataFrame:
+    """
+    `project_goals` for the `goals` worksheet, rebuilt only when a worksheet it
+    reads changes (or the day changes).
+    """
+    try:
+        goals_version = worksheet_version(conn=conn, worksheet="goals")
+    except WorksheetNotFound:
+        goals_version = None
+    return _goal_projection(
+        _conn=conn,
+        goals_version=goals_version,
+        **{
+            f"{ws}_version": worksheet_version(conn=conn, worksheet=ws)
+            for ws in ["balances", "accounts", "transactions"]
+        },
+        currency_version=currency_version(conn=conn),
+        default_return=default_return,
+        today=pd.Timestamp.today().normalize(),
+    )
@@ -2,25 +2,98 @@ import streamlit as st
 import pandas as pd
 from streamlit_gsheets import GSheetsConnection
 from datetime import date, datetime
+from functools import lru_cache
+from pathlib import Path
+import duckdb
 import pandas as pd
 import streamlit as st
-from typing import Any
+from sql_metadata import Parser
+from typing import Any, Optional
+
+from utilities.metrics import SQL_QUERY_SECONDS, WORKSHEET_CACHE, WORKSHEET_LOAD_SECONDS
+from utilities.row_diff import diff_rows
+from utilities.sheets_client import frame_version, get_sheets_client
+from utilities.write_queue import get_write_queue
 
 
 def load_worksheet(conn: GSheetsConnection, worksheet: str) -> pd.DataFrame:
-    return conn.read(worksheet=worksheet)
+    """Read a worksheet, preferring edits still queued for the background writer."""
+    with WORKSHEET_LOAD_SECONDS.time(worksheet=worksheet):
+        pending = get_write_queue(conn).optimistic(worksheet)
+        if pending is not None:
+            WORKSHEET_CACHE.inc(worksheet=worksheet, tier="write_queue")
+            return pending
+        return get_sheets_client(conn).read(worksheet)
+
+
+def worksheet_version(conn: GSheetsConnection, worksheet: str) -> int:
+    """
+    Content version of the frame `load_worksheet` returns, for keying derived caches.
+    """
+    pending = get_write_queue(conn).optimistic(worksheet)
+    if pending is not None:
+        return frame_version(pending)
+    return get_sheets_client(conn).version(worksheet)
+
+
+def write_worksheet(
+    conn: GSheetsConnection,
+    worksheet: str,
+    df: pd.DataFrame,
+    base: Optional[pd.DataFrame] = None,
+):
+    """
+    Queue an update of a worksheet to `df`; it is flushed in the background.
 
+    Pass `base` (the frame the edit started from, with its original index) so only
+    the inserted, updated and deleted rows are sent.
+    """
+    if base is None:
+        base = load_worksheet(conn=conn, worksheet=worksheet)
+    get_write_queue(conn).enqueue(worksheet=worksheet, df=df, base=base)
 
-def write_worksheet(conn: GSheetsConnection, worksheet: str, df: pd.DataFrame):
-    conn.update(worksheet=worksheet, data=df)
 
+def append_worksheet(conn: GSheetsConnection, worksheet: str, df: pd.DataFrame):
+    """
+    Append rows to the bottom of a worksheet.
 
-def refresh_connection() -> GSheetsConnection:
+    Rows are aligned to the worksheet's existing header; columns the sheet does not
+    have are dropped. The write queue sends pure appends as a single append request
+    instead of rewriting the sheet.
+    """
+    current = load_worksheet(conn=conn, worksheet=worksheet)
+    rows = df.reindex(columns=current.columns)
+    write_worksheet(
+        conn=conn,
+        worksheet=worksheet,
+        df=pd.concat([current, rows], ignore_index=True),
+    )
+
+
+def refresh_connection(conn: GSheetsConnection):
     if st.button("Refresh Data", type="secondary", use_container_width=True):
+        get_sheets_client(conn).invalidate()
         st.cache_data.clear()
 
 
-def load_settings_to_session_state(conn: GSheetsConnection):
+# Settings worksheet metrics and their types
+SETTINGS_TYPES = {
+    "inflation_rate": float,
+    "target_savings_rate": float,
+    "target_return_on_investment": float,
+    "target_retirement_age": int,
+    "replacement_income_rate": float,
+}
+
+
+def read_settings(conn: GSheetsConnection) -> dict:
+    """
+    Parse the `settings` worksheet into typed values.
+
+    Returns:
+    - dict: SETTINGS_TYPES keys plus `birthdate` (pd.Timestamp); None when a value is
+      missing or cannot be parsed.
+    """
     df = load_worksheet(conn=conn, worksheet="settings")
     df["value"] = df["value"].astype(str).str.strip()
 
@@ -31,24 +104,15 @@ def load_settings_to_session_state(conn: GSheetsConnection):
         except (IndexError, ValueError, TypeError):
             return None
 
-    settings = {
-        "inflation_rate": float,
-        "target_savings_rate": float,
-        "target_return_on_investment": float,
-        "target_retirement_age": int,
-        "replacement_income_rate": float,
-    }
+    settings = {key: get_scalar(key, cast) for key, cast in SETTINGS_TYPES.items()}
+    settings["birthdate"] = get_scalar("birthdate", pd.to_datetime)
+    return settings
 
-    for key, cast in settings.items():
-        if key not in st.session_state:
-            st.session_state[key] = get_scalar(key, cast)
 
-    if "birthdate" not in st.session_state:
-        try:
-            birth_val = df.loc[df["metric"] == "birthdate", "value"].iloc[0]
-            st.session_state["birthdate"] = pd.to_datetime(birth_val)
-        except (IndexError, ValueError, TypeError):
-            st.session_state["birthdate"] = None
+def load_settings_to_session_state(conn: GSheetsConnection):
+    for key, value in read_settings(conn=conn).items():
+        if key not in st.session_state:
+            st.session_state[key] = value
 
 
 @st.dialog("Setting")
@@ -102,43 +166,74 @@ def settings_assumptions(conn: GSheetsConnection):
                 df.loc[df["metric"] == metric, "value"] = str(new_value)
 
             # Re-write the full DataFrame including unchanged birthdate
-            conn.update(worksheet="settings", data=df)
+            write_worksheet(conn=conn, worksheet="settings", df=df)
             st.success("Settings updated successfully!")
-            st.cache_data.clear()
+
+
+@lru_cache(maxsize=None)
+def _query_tables(sql: str) -> tuple[str, ...]:
+    return tuple(Parser(sql).tables)
 
 
 def read_sql(conn: GSheetsConnection, ddl: str) -> pd.DataFrame:
-    """Executes a SQL query using a GSheetsConnection"""
+    """
+    Executes a SQL query (or a path to a .sql file) against the worksheets.
+
+    Worksheets referenced by the query are loaded through `load_worksheet`, so they
+    share the quota-aware cache and include queued edits; the SQL itself runs in a
+    local DuckDB database, the same engine `GSheetsConnection.query` uses. The
+    derived tables `account_dim` and `balance_facts` can be queried like worksheets.
+    """
 
     if ddl.endswith(".sql"):
         with open(ddl, "r") as f:
             sql = f.read()
-
-        return conn.query(sql)
+        query = Path(ddl).stem
     else:
-        return conn.query(sql)
+        sql = ddl
+        query = "inline"
+
+    # Imported here: the derived tables are themselves built from `load_worksheet`
+    from utilities.account_dimension import DERIVED_TABLES
+
+    with SQL_QUERY_SECONDS.time(query=query):
+        db = duckdb.connect()
+        for table in _query_tables(sql):
+            if table in DERIVED_TABLES:
+                db.register(table, DERIVED_TABLES[table](conn=conn))
+            else:
+                db.register(table, load_worksheet(conn=conn, worksheet=table))
+        return db.sql(sql).df()
+
+
+# Stand-in for a blank effective_end_date (the largest date pandas can represent)
+OPEN_END_DATE = pd.Timestamp("2262-04-11")
+
+
+def effective_window(df: pd.DataFrame) -> tuple[pd.Series, pd.Series]:
+    """
+    Parse `effective_start_date` / `effective_end_date` into an active window.
+
+    A row is active on dates `start <= d < end`; a blank end date never expires.
+    """
+    start = pd.to_datetime(df["effective_start_date"], errors="coerce")
+    end = pd.to_datetime(df["effective_end_date"], errors="coerce").fillna(
+        OPEN_END_DATE
+    )
+    return start, end
 
 
 def get_active_accounts(conn: GSheetsConnection) -> pd.DataFrame:
     """Fetches active accounts from the Google Sheet."""
-    df = conn.read(worksheet="accounts")
-    df = df[
-        (
-            pd.to_datetime(df["effective_start_date"], errors="coerce")
-            <= pd.to_datetime(date.today())
-        )
-        & (
-            pd.to_datetime(df["effective_end_date"], errors="coerce").fillna(
-                pd.to_datetime("2262-04-11")
-            )
-            > pd.to_datetime(date.today())
-        )
-    ]
+    df = load_worksheet(conn=conn, worksheet="accounts")
+    start, end = effective_window(df)
+    today = pd.to_datetime(date.today())
+    df = df[(start <= today) & (end > today)]
     return df
 
 
 def get_balance_records(conn: GSheetsConnection) -> pd.DataFrame:
-    df = conn.read(worksheet="balances")
+    df = load_worksheet(conn=conn, worksheet="balances")
     return df
 
 
@@ -225,7 +320,49 @@ def add_balance_records(conn: GSheetsConnection):
                     columns=["effective_start_date", "effective_end_date"],
                     errors="ignore",
                 )
-                st.session_state["records_to_upload"] = cleaned_df
+
+                # Unusual balances need a second Save with the same values.
+                # Imported here: anomalies are themselves built on this module
+                from utilities.anomalies import check_new_balances
+
+                flagged = check_new_balances(conn=conn, records=cleaned_df)
+                entered = tuple(cleaned_df["balance"])
+                if (
+                    flagged.empty
+                    or st.session_state.get("confirmed_balance_anomalies") == entered
+                ):
+                    st.session_state["records_to_upload"] = cleaned_df
+                else:
+                    st.session_state["confirmed_balance_anomalies"] = entered
+                    st.warning(
+                        "These balances look unusual for their accounts. Check "
+                        "them, then click **Save** again to keep them."
+                    )
+                    st.dataframe(
+                        flagged,
+                        column_order=[
+                            "institution_name",
+                            "account_name",
+                            "previous",
+                            "balance",
+                            "reason",
+                        ],
+                        column_config={
+                            "institution_name": st.column_config.TextColumn(
+                                "Institution"
+                            ),
+                            "account_name": st.column_config.TextColumn("Account"),
+                            "previous": st.column_config.NumberColumn(
+                                "Previous", format="dollar"
+                            ),
+                            "balance": st.column_config.NumberColumn(
+                                "Balance", format="dollar"
+                            ),
+                            "reason": st.column_config.TextColumn("Reason"),
+                        },
+                        hide_index=True,
+                        use_container_width=True,
+                    )
 
     # Proceed if data was successfully validated and submitted
     if st.session_state["records_to_upload"] is not None:
@@ -237,7 +374,7 @@ def add_balance_records(conn: GSheetsConnection):
         )
         updated_records = updated_records[current_balance_records.columns]
 
-        conn.update(worksheet="balances", data=updated_records)
+        write_worksheet(conn=conn, worksheet="balances", df=updated_records)
 
         st.success("Records saved successfully!")
 
@@ -262,16 +399,6 @@ def delete_balance_records(conn: GSheetsConnection):
     )
 
 
-def add_transaction_records(conn: GSheetsConnection):
-    # Create a button to open the URL
-    st.link_button(
-        label="Add Transactions",
-        url=st.secrets["connections"]["gsheets"]["spreadsheet"],
-        type="primary",
-        use_container_width=True,
-    )
-
-
 def edit_transaction_records(conn: GSheetsConnection):
     # Create a button to open the URL
     st.link_button(
@@ -302,7 +429,9 @@ def update_accounts(conn: GSheetsConnection):
     def accounts_editor():
 
         # Load data from the 'accounts' worksheet
-        accounts_df = conn.read(worksheet="accounts")
+        accounts_df = load_worksheet(conn=conn, worksheet="accounts")
+        # Keep the original index: it is each row's position on the sheet and keys
+        # the row-level diff written on save
         accounts_df = accounts_df.sort_values(
             by=[
                 "category",
@@ -310,7 +439,7 @@ def update_accounts(conn: GSheetsConnection):
                 "institution_name",
                 "account_type",
             ]
-        ).reset_index(drop=True)
+        )
 
         # Ensure DataFrame is not empty
         if accounts_df.empty:
@@ -331,15 +460,31 @@ def update_accounts(conn: GSheetsConnection):
                 "category": st.column_config.TextColumn("Category"),
                 "account_type": st.column_config.TextColumn("Type"),
                 "account_name": st.column_config.TextColumn("Name"),
+                "currency": st.column_config.TextColumn(
+                    "Currency", width="small", help="Blank: the base currency."
+                ),
+                "interest_rate": st.column_config.NumberColumn(
+                    "Rate", format="%.4f", help="Liabilities: annual rate, e.g. 0.24."
+                ),
+                "minimum_payment": st.column_config.NumberColumn(
+                    "Minimum Payment", format="dollar", help="Liabilities: per month."
+                ),
                 "effective_start_date": st.column_config.TextColumn("Opened Date"),
                 "effective_end_date": st.column_config.TextColumn("Closed Date"),
             },
         )
 
-        # Save button: updates the worksheet
+        # Save button: sends only the changed rows
         if st.button("Save"):
-            conn.update(worksheet="accounts", data=edited_df)
-            st.success("Accounts updated successfully.")
+            diff = diff_rows(accounts_df, edited_df)
+            write_worksheet(
+                conn=conn, worksheet="accounts", df=edited_df, base=accounts_df
+            )
+            st.success(
+                f"Accounts updated successfully ({diff.summary()})."
+                if diff is not None
+                else "Accounts updated successfully."
+            )
 
     # Call the dialog
     accounts_editor()
@@ -355,7 +500,7 @@ def update_income(conn: GSheetsConnection):
     def income_editor():
 
         # Load data from the 'income' worksheet
-        income_df = conn.read(worksheet="income").reset_index(drop=True)
+        income_df = load_worksheet(conn=conn, worksheet="income")
 
         # If sheet is empty, initialize with example structure
         if income_df.empty:
@@ -381,10 +526,15 @@ def update_income(conn: GSheetsConnection):
             },
         )
 
-        # Save button
+        # Save button: sends only the changed rows
         if st.button("Save"):
-            conn.update(worksheet="income", data=edited_df)
-            st.success("Income data updated successfully.")
+            diff = diff_rows(income_df, edited_df)
+            write_worksheet(conn=conn, worksheet="income", df=edited_df, base=income_df)
+            st.success(
+                f"Income data updated successfully ({diff.summary()})."
+                if diff is not None
+                else "Income data updated successfully."
+            )
 
     # Open the dialog
     income_editor()
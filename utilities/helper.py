@@ -2,8 +2,13 @@ import streamlit as st
 from streamlit_gsheets import GSheetsConnection
 from datetime import datetime
 import pandas as pd
+from functools import lru_cache
 from pathlib import Path
-import toml
+import tomllib
+
+from utilities.gsheets import read_sql
+from utilities.snapshots import missing_fx_currencies
+from utilities.transactions import get_transactions
 
 
 @st.cache_data
@@ -11,12 +16,17 @@ def convert_for_download(df):
     return df.to_csv().encode("utf-8")
 
 
+def format_dollars(amount: float) -> str:
+    """Whole dollars with the sign in front, e.g. -$1,234."""
+    return f"{'-' if amount < 0 else ''}${abs(amount):,.0f}"
+
+
 def check_balance_staleness(conn: GSheetsConnection):
     """Return banner indicating staleness of balance data."""
 
     # Query latest balance date from the balances worksheet
-    result = conn.query(
-        "SELECT MAX(STRPTIME(full_date, '%m/%d/%Y')) AS max_date FROM balances;"
+    result = read_sql(
+        conn, "SELECT MAX(STRPTIME(full_date, '%m/%d/%Y')) AS max_date FROM balances;"
     )
 
     max_full_date = result.iloc[0, 0]
@@ -45,17 +55,25 @@ def check_balance_staleness(conn: GSheetsConnection):
         )
 
 
+def check_fx_rates(conn: GSheetsConnection):
+    """Return banner listing account currencies without exchange rates."""
+    missing = missing_fx_currencies(conn=conn)
+    if missing:
+        st.warning(
+            f"⚠️ No exchange rates for **{', '.join(missing)}**; those balances are "
+            "counted 1:1. Add them to the `fx_rates` worksheet."
+        )
+
+
 def check_transactions_staleness(conn: GSheetsConnection):
     """Return banner indicating staleness of transaction data."""
 
-    # Query latest balance date from the records worksheet
-    result = conn.query(
-        "SELECT MAX(STRPTIME(full_date, '%m/%d/%Y')) AS max_date FROM transactions;"
-    )
+    # Latest transaction date from the typed transactions table
+    transactions = get_transactions(conn=conn)
 
-    max_full_date = result.iloc[0, 0]
+    max_full_date = transactions["full_date"].max()
 
-    if max_full_date is None:
+    if pd.isna(max_full_date):
         st.error("No transaction records found. Please enter transaction data.")
         return
 
@@ -79,6 +97,17 @@ def check_transactions_staleness(conn: GSheetsConnection):
         )
 
 
+@lru_cache(maxsize=None)
+def _load_config(config_path: str) -> dict:
+    """Parse a TOML config file once per process; theme lookups happen on every render."""
+    config_file = Path(config_path)
+    if not config_file.exists():
+        raise FileNotFoundError(f"Config file not found at: {config_path}")
+
+    with open(config_file, "rb") as f:
+        return tomllib.load(f)
+
+
 def get_config_value(dot_path: str, config_path: str = ".streamlit/config.toml"):
     """
     Loads a TOML config file and retrieves a nested value based on a dot-separated path.
@@ -90,12 +119,7 @@ def get_config_value(dot_path: str, config_path: str = ".streamlit/config.toml")
     Returns
     - The retrieved value, or None if any key in the chain does not exist.
     """
-    # Load the TOML config file
-    config_file = Path(config_path)
-    if not config_file.exists():
-        raise FileNotFoundError(f"Config file not found at: {config_path}")
-
-    config = toml.load(config_file)
+    config = _load_config(config_path)
 
     # Traverse the config using chained .get()
     keys = dot_path.split(".")
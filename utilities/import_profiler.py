@@ -0,0 +1,104 @@
+"""
+Measure the cold import cost of each page script.
+
+Usage:
+    python -m utilities.import_profiler [page.py ...] [--top N]
+
+Every module-level import of a page is replayed in a fresh interpreter with
+``python -X importtime`` so nothing is shared with a warm process. The report lists
+the total import time per page and the slowest top-level packages.
+"""
+
+import argparse
+import ast
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+DEFAULT_PAGES = [
+    "streamlit_app.py",
+    "pages/home/home.py",
+    "pages/dashboard/dashboard.py",
+    "pages/income_and_expenses/income_and_expenses.py",
+]
+
+
+def page_imports(page_path: str) -> list[str]:
+    """
+    Collect the import statements a page executes at module level.
+
+    Parameters:
+    - page_path (str): Path to the page script.
+
+    Returns:
+    - list[str]: Source of each top-level import statement, in order.
+    """
+    source = Path(page_path).read_text()
+    tree = ast.parse(source)
+    return [
+        ast.get_source_segment(source, node)
+        for node in tree.body
+        if isinstance(node, (ast.Import, ast.ImportFrom))
+    ]
+
+
+def profile_imports(
+    statements: list[str], exclude: frozenset = frozenset()
+) -> dict[str, int]:
+    """
+    Run import statements in a fresh interpreter and parse `-X importtime` output.
+
+    Parameters:
+    - statements (list[str]): Import statements to execute.
+    - exclude (frozenset): Top-level packages to leave out of the report.
+
+    Returns:
+    - dict[str, int]: Cumulative microseconds per top-level package, plus "__total__".
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "\n".join(statements)],
+        capture_output=True,
+        text=True,
+        cwd=Path(__file__).resolve().parent.parent,
+    )
+
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.splitlines()[-1])
+
+    timings = defaultdict(int)
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        # Nested imports are indented; only top-level entries add to the total
+        package = name.strip().split(".")[0]
+        if package in exclude:
+            continue
+        if name.startswith(" ") and not name.startswith("  "):
+            timings[package] += int(cumulative)
+            timings["__total__"] += int(cumulative)
+    return dict(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("pages", nargs="*", default=DEFAULT_PAGES)
+    parser.add_argument("--top", type=int, default=5)
+    args = parser.parse_args()
+
+    # Modules the interpreter loads before any page code runs
+    startup = frozenset(profile_imports(["pass"]))
+
+    for page in args.pages:
+        timings = profile_imports(page_imports(page), exclude=startup)
+        total = timings.pop("__total__", 0)
+        print(f"{page}: {total / 1000:,.0f} ms")
+        for package, micros in sorted(timings.items(), key=lambda kv: -kv[1])[
+            : args.top
+        ]:
+            print(f"    {package:<24} {micros / 1000:>8,.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,503 @@
+import io
+import re
+from collections import Counter
+from typing import IO, Iterator, Optional
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+from streamlit_gsheets import GSheetsConnection
+
+from utilities.gsheets import append_worksheet, load_worksheet
+
+# Number of statement rows normalized and deduplicated at a time
+CHUNK_SIZE = 5_000
+
+# Bytes read per block when streaming OFX/QFX files
+OFX_BLOCK_SIZE = 64 * 1024
+
+TRANSACTION_COLUMNS = [
+    "full_date",
+    "institution_name",
+    "account_name",
+    "description",
+    "group",
+    "amount",
+]
+
+BALANCE_COLUMNS = ["full_date", "institution_name", "account_name", "balance"]
+
+# Columns that identify a transaction when deduplicating against the sheet
+TRANSACTION_KEY_COLUMNS = [
+    "full_date",
+    "institution_name",
+    "account_name",
+    "description",
+    "amount",
+]
+
+BALANCE_KEY_COLUMNS = ["full_date", "institution_name", "account_name"]
+
+# Header spellings used by common bank CSV exports (matched case-insensitively)
+CSV_COLUMN_ALIASES = {
+    "full_date": ["full_date", "date", "transaction date", "posted date", "post date"],
+    "description": ["description", "payee", "merchant", "name", "memo", "details"],
+    "amount": ["amount", "transaction amount"],
+    "debit": ["debit", "withdrawal", "withdrawals"],
+    "credit": ["credit", "deposit", "deposits"],
+    "group": ["group", "category"],
+    "balance": ["balance", "ending balance"],
+    "institution_name": ["institution_name", "institution", "bank"],
+    "account_name": ["account_name", "account"],
+}
+
+OFX_TRANSACTION_TAGS = {"DTPOSTED", "TRNAMT", "NAME", "MEMO"}
+OFX_TOKEN = re.compile(r"^(/?)([A-Za-z0-9.]+)>([^\r\n]*)", re.DOTALL)
+
+
+# -----------------------------
+# Readers
+# -----------------------------
+def read_csv_chunks(file: IO, chunksize: int = CHUNK_SIZE) -> Iterator[pd.DataFrame]:
+    """
+    Stream a bank CSV export as raw string DataFrames of at most `chunksize` rows.
+
+    Parameters:
+    - file (IO): Path or file-like object holding the CSV export.
+    - chunksize (int): Rows per yielded chunk.
+
+    Returns:
+    - Iterator[pd.DataFrame]: Chunks with lower-cased, stripped column names.
+    """
+    reader = pd.read_csv(file, chunksize=chunksize, dtype=str, skipinitialspace=True)
+    for chunk in reader:
+        chunk.columns = chunk.columns.str.strip().str.lower()
+        yield chunk
+
+
+def _ofx_tokens(file: IO) -> Iterator[tuple[bool, str, str]]:
+    """Yield (is_closing, tag, text) tokens from an OFX/QFX file, one block at a time."""
+    if isinstance(file, io.TextIOBase):
+        stream = file
+    else:
+        stream = io.TextIOWrapper(file, encoding="utf-8", errors="replace")
+
+    remainder = ""
+    while True:
+        block = stream.read(OFX_BLOCK_SIZE)
+        if not block:
+            break
+
+        pieces = (remainder + block).split("<")
+        remainder = pieces.pop()
+        for piece in pieces:
+            match = OFX_TOKEN.match(piece)
+            if match:
+                yield match.group(1) == "/", match.group(2).upper(), match.group(3)
+
+    match = OFX_TOKEN.match(remainder)
+    if match:
+        yield match.group(1) == "/", match.group(2).upper(), match.group(3)
+
+
+def read_ofx_chunks(file: IO, chunksize: int = CHUNK_SIZE) -> Iterator[pd.DataFrame]:
+    """
+    Stream the <STMTTRN> records of an OFX/QFX file as raw DataFrames.
+
+    The parser is a tokenizer over fixed-size blocks, so memory stays bounded even
+    for single-line SGML exports.
+
+    Parameters:
+    - file (IO): Path or file-like object holding the OFX/QFX export.
+    - chunksize (int): Transactions per yielded chunk.
+
+    Returns:
+    - Iterator[pd.DataFrame]: Chunks with `full_date`, `amount` and `description` columns.
+    """
+    if isinstance(file, str):
+        with open(file, "rb") as f:
+            yield from read_ofx_chunks(f, chunksize=chunksize)
+        return
+
+    rows, current = [], None
+    for is_closing, tag, text in _ofx_tokens(file):
+        if tag == "STMTTRN":
+            if is_closing and current is not None:
+                rows.append(current)
+                current = None
+            elif not is_closing:
+                current = {}
+        elif current is not None and not is_closing and tag in OFX_TRANSACTION_TAGS:
+            current[tag] = text.strip()
+
+        if len(rows) >= chunksize:
+            yield _ofx_rows_to_frame(rows)
+            rows = []
+
+    if rows:
+        yield _ofx_rows_to_frame(rows)
+
+
+def _ofx_rows_to_frame(rows: list[dict]) -> pd.DataFrame:
+    df = pd.DataFrame(rows, columns=sorted(OFX_TRANSACTION_TAGS))
+    description = df["NAME"].fillna(df["MEMO"])
+    return pd.DataFrame(
+        {
+            "full_date": pd.to_datetime(
+                df["DTPOSTED"].str[:8], format="%Y%m%d", errors="coerce"
+            ),
+            "amount": df["TRNAMT"],
+            "description": description,
+        }
+    )
+
+
+def read_statement_chunks(
+    file: IO, chunksize: int = CHUNK_SIZE
+) -> Iterator[pd.DataFrame]:
+    """Dispatch to the OFX or CSV reader based on the uploaded file name."""
+    name = getattr(file, "name", str(file)).lower()
+    if name.endswith((".ofx", ".qfx")):
+        return read_ofx_chunks(file, chunksize=chunksize)
+    return read_csv_chunks(file, chunksize=chunksize)
+
+
+# -----------------------------
+# Normalization
+# -----------------------------
+def _pick_column(df: pd.DataFrame, target: str) -> Optional[pd.Series]:
+    for alias in CSV_COLUMN_ALIASES[target]:
+        if alias in df.columns:
+            return df[alias]
+    return None
+
+
+def parse_amounts(values: pd.Series) -> pd.Series:
+    """
+    Convert bank-formatted amounts (e.g. "$1,234.50", "(12.00)") to floats.
+
+    Parameters:
+    - values (pd.Series): Raw amount strings.
+
+    Returns:
+    - pd.Series: Float amounts; unparseable values become NaN.
+    """
+    if pd.api.types.is_numeric_dtype(values):
+        return values.astype(float)
+
+    cleaned = (
+        values.astype(str)
+        .str.replace(r"[$,\s]", "", regex=True)
+        .str.replace(r"^\((.*)\)$", r"-\1", regex=True)
+    )
+    return pd.to_numeric(cleaned, errors="coerce")
+
+
+def normalize_transactions(
+    raw: pd.DataFrame, institution_name: str, account_name: str
+) -> pd.DataFrame:
+    """
+    Map a raw statement chunk onto the `transactions` worksheet schema.
+
+    Parameters:
+    - raw (pd.DataFrame): Chunk produced by one of the statement readers.
+    - institution_name (str): Institution used when the file does not name one.
+    - account_name (str): Account used when the file does not name one.
+
+    Returns:
+    - pd.DataFrame: Rows with TRANSACTION_COLUMNS; rows without a date or amount are dropped.
+    """
+    amount = _pick_column(raw, "amount")
+    if amount is not None:
+        amount = parse_amounts(amount)
+    else:
+        credit, debit = _pick_column(raw, "credit"), _pick_column(raw, "debit")
+        if credit is None and debit is None:
+            raise ValueError("Statement has no amount, debit or credit column.")
+        credit = parse_amounts(credit).fillna(0) if credit is not None else 0
+        debit = parse_amounts(debit).abs().fillna(0) if debit is not None else 0
+        amount = credit - debit
+
+    dates = _pick_column(raw, "full_date")
+    if dates is None:
+        raise ValueError("Statement has no date column.")
+
+    description = _pick_column(raw, "description")
+    group = _pick_column(raw, "group")
+    institution = _pick_column(raw, "institution_name")
+    account = _pick_column(raw, "account_name")
+
+    df = pd.DataFrame(
+        {
+            "full_date": pd.to_datetime(dates, errors="coerce"),
+            "institution_name": (
+                institution.fillna(institution_name)
+                if institution is not None
+                else institution_name
+            ),
+            "account_name": (
+                account.fillna(account_name) if account is not None else account_name
+            ),
+            "description": (
+                description.fillna("").str.strip() if description is not None else ""
+            ),
+            "group": group.fillna("").str.strip() if group is not None else "",
+            "amount": amount.round(2),
+        },
+        index=raw.index,
+    )
+    df = df.dropna(subset=["full_date", "amount"])
+    df["full_date"] = df["full_date"].dt.strftime("%m/%d/%Y")
+    return df[TRANSACTION_COLUMNS].reset_index(drop=True)
+
+
+def normalize_balances(raw: pd.DataFrame, accounts: pd.DataFrame) -> pd.DataFrame:
+    """
+    Map a raw balance CSV chunk onto the `balances` worksheet schema.
+
+    Category and account type are looked up from the `accounts` worksheet so the
+    imported rows match those written by the Add Balances form.
+
+    Parameters:
+    - raw (pd.DataFrame): Chunk with date, institution, account and balance columns.
+    - accounts (pd.DataFrame): The `accounts` worksheet.
+
+    Returns:
+    - pd.DataFrame: Rows for accounts that exist in `accounts`; others are dropped.
+    """
+    columns = {target: _pick_column(raw, target) for target in BALANCE_COLUMNS}
+    missing = [target for target, col in columns.items() if col is None]
+    if missing:
+        raise ValueError(f"Balance file is missing columns: {', '.join(missing)}.")
+
+    df = pd.DataFrame(
+        {
+            "full_date": pd.to_datetime(columns["full_date"], errors="coerce"),
+            "institution_name": columns["institution_name"].str.strip(),
+            "account_name": columns["account_name"].str.strip(),
+            "balance": parse_amounts(columns["balance"]).round(2),
+        }
+    ).dropna()
+    df["full_date"] = df["full_date"].dt.strftime("%m/%d/%Y")
+
+    account_attributes = accounts.drop(
+        columns=["effective_start_date", "effective_end_date"], errors="ignore"
+    ).drop_duplicates(subset=["institution_name", "account_name"])
+    return df.merge(
+        account_attributes, on=["institution_name", "account_name"], how="inner"
+    )
+
+
+# -----------------------------
+# Deduplication
+# -----------------------------
+def row_hashes(df: pd.DataFrame, key_columns: list[str]) -> pd.Series:
+    """
+    Hash the identifying columns of each row into a uint64.
+
+    Dates are normalized to MM/DD/YYYY and amounts to cents so rows read back from
+    the sheet hash the same as freshly normalized rows.
+    """
+    keys = pd.DataFrame(index=df.index)
+    for col in key_columns:
+        values = df[col]
+        if col == "full_date":
+            # Few distinct dates: parse and format each once
+            codes, uniques = pd.factorize(values)
+            formatted = pd.to_datetime(pd.Series(uniques), errors="coerce").dt.strftime(
+                "%m/%d/%Y"
+            )
+            values = pd.Series(
+                np.append(formatted.to_numpy(), np.nan)[codes], index=df.index
+            )
+        elif col in ("amount", "balance"):
+            values = (parse_amounts(values) * 100).round().astype("Int64")
+        else:
+            values = values.fillna("").astype(str).str.strip().str.lower()
+        keys[col] = values.astype(str)
+    return pd.util.hash_pandas_object(keys, index=False)
+
+
+class HashIndex:
+    """
+    Multiset of row hashes known to the sheet, used to drop already-imported rows.
+
+    Counts are kept per hash so legitimate repeats (two identical coffees on the same
+    day) survive, while re-uploading an overlapping statement adds nothing.
+    """
+
+    def __init__(self, hashes: pd.Series):
+        self.counts = Counter(hashes.tolist())
+        self._file_counts: Counter = Counter()
+
+    def start_file(self):
+        """Commit the previous file's occurrences and reset per-file counting."""
+        for h, n in self._file_counts.items():
+            self.counts[h] = max(self.counts[h], n)
+        self._file_counts = Counter()
+
+    def filter_new(self, hashes: pd.Series) -> pd.Series:
+        """Return a boolean mask of rows not yet present in the index."""
+        occurrence = hashes.groupby(hashes).cumcount() + 1
+        occurrence += hashes.map(self._file_counts).fillna(0).astype(int)
+        known = hashes.map(self.counts).fillna(0).astype(int)
+
+        self._file_counts.update(hashes.value_counts().to_dict())
+        return occurrence > known
+
+
+# -----------------------------
+# Pipeline
+# -----------------------------
+def import_records(
+    conn: GSheetsConnection,
+    files: list[IO],
+    record_type: str = "transactions",
+    institution_name: str = "",
+    account_name: str = "",
+    chunksize: int = CHUNK_SIZE,
+) -> dict:
+    """
+    Stream statement files into the `transactions` or `balances` worksheet.
+
+    Each file is read in chunks, normalized, and checked against a hash index of the
+    existing rows. New transactions without a group are categorized by the rules on
+    the `rules` worksheet. Chunking bounds the parsing, normalizing and hashing work
+    to one chunk at a time; the new rows themselves are kept until the end and
+    appended in one write. Peak memory is therefore the existing worksheet plus
+    every new row, held about twice while `append_worksheet` joins them.
+
+    Parameters:
+    - conn (GSheetsConnection): Google Sheets connection.
+    - files (list[IO]): CSV/OFX/QFX uploads.
+    - record_type (str): "transactions" or "balances".
+    - institution_name (str): Default institution for transaction files.
+    - account_name (str): Default account for transaction files.
+    - chunksize (int): Rows processed per chunk.
+
+    Returns:
+    - dict: Counts of rows read, skipped as duplicates, dropped as invalid, added,
+      and categorized by rules.
+    """
+    # Imported here: the categorizer builds on this module's hashing
+    from utilities.categorizer import categorize, get_rules
+
+    if record_type == "transactions":
+        key_columns = TRANSACTION_KEY_COLUMNS
+        accounts = None
+        rules = get_rules(conn)
+    else:
+        key_columns = BALANCE_KEY_COLUMNS
+        accounts = load_worksheet(conn=conn, worksheet="accounts")
+
+    existing = load_worksheet(conn=conn, worksheet=record_type)
+    existing = existing.dropna(how="all")
+    present = [col for col in key_columns if col in existing.columns]
+    index = HashIndex(
+        row_hashes(existing, key_columns)
+        if len(present) == len(key_columns)
+        else pd.Series(dtype="uint64")
+    )
+
+    summary = {"read": 0, "invalid": 0, "duplicates": 0, "added": 0, "categorized": 0}
+    new_chunks = []
+    for file in files:
+        index.start_file()
+        for raw in read_statement_chunks(file, chunksize=chunksize):
+            summary["read"] += len(raw)
+            if record_type == "transactions":
+                chunk = normalize_transactions(raw, institution_name, account_name)
+            else:
+                chunk = normalize_balances(raw, accounts)
+            summary["invalid"] += len(raw) - len(chunk)
+
+            is_new = index.filter_new(row_hashes(chunk, key_columns))
+            summary["duplicates"] += int((~is_new).sum())
+            chunk = chunk[is_new.to_numpy()]
+            if record_type == "transactions":
+                blank = chunk["group"] == ""
+                chunk = categorize(chunk, rules)
+                summary["categorized"] += int((blank & (chunk["group"] != "")).sum())
+            new_chunks.append(chunk)
+    index.start_file()
+
+    # One append for the whole upload: `append_worksheet` concatenates onto a full
+    # copy of the worksheet, so appending per chunk would copy it once per chunk
+    new_rows = pd.concat(new_chunks, ignore_index=True) if new_chunks else None
+    if new_rows is not None and not new_rows.empty:
+        append_worksheet(conn=conn, worksheet=record_type, df=new_rows)
+        summary["added"] = len(new_rows)
+
+    return summary
+
+
+@st.dialog("Import Records", width="large")
+def import_records__dialog(conn: GSheetsConnection, record_type: str = "transactions"):
+    """
+    Upload bank exports and append their new rows to the selected worksheet.
+    """
+    record_type = st.segmented_control(
+        "**Import**",
+        options=["transactions", "balances"],
+        format_func=str.title,
+        default=record_type,
+        key="import_record_type",
+    )
+    # Clicking the selected option again clears the selection
+    if record_type is None:
+        st.warning("Choose Transactions or Balances to import.")
+        return
+
+    if record_type == "transactions":
+        st.caption(
+            "CSV exports need a date column and either an amount or debit/credit "
+            "columns. OFX/QFX statements are read directly."
+        )
+        accounts = load_worksheet(conn=conn, worksheet="accounts")
+        account_options = (
+            accounts[["institution_name", "account_name"]]
+            .dropna()
+            .drop_duplicates()
+            .itertuples(index=False, name=None)
+        )
+        account = st.selectbox(
+            "Account",
+            options=list(account_options),
+            format_func=lambda a: f"{a[0]} · {a[1]}",
+        )
+        file_types = ["csv", "ofx", "qfx"]
+    else:
+        st.caption(
+            "CSV with `full_date`, `institution_name`, `account_name` and `balance` "
+            "columns. Accounts must already exist on the Accounts sheet."
+        )
+        account = ("", "")
+        file_types = ["csv"]
+
+    files = st.file_uploader(
+        "Statement files", type=file_types, accept_multiple_files=True
+    )
+
+    if st.button("Import", type="primary", disabled=not files or account is None):
+        with st.spinner("Importing..."):
+            try:
+                summary = import_records(
+                    conn=conn,
+                    files=files,
+                    record_type=record_type,
+                    institution_name=account[0],
+                    account_name=account[1],
+                )
+            except ValueError as e:
+                st.error(str(e))
+                return
+
+        st.success(
+            f"Added **{summary['added']:,}** of {summary['read']:,} rows "
+            f"({summary['duplicates']:,} duplicates, {summary['invalid']:,} invalid)."
+            + (
+                f" {summary['categorized']:,} categorized by rules."
+                if summary["categorized"]
+                else ""
+            )
+        )
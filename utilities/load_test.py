@@ -0,0 +1,337 @@
+"""
+Drive concurrent sessions through the app against a local stand-in backend.
+
+Usage:
+    python -m utilities.load_test [--sessions N] [--iterations N] [--latency S]
+                                  [--data DIR]
+
+Each session is a Streamlit AppTest of `streamlit_app.py` running in its own
+thread: it logs in, opens the dashboard, switches to the spreadsheet view and
+back, then opens Income & Expenses. All sessions share one process, so they share
+the worksheet cache, derived caches and background threads exactly as sessions of
+a deployed server do. The report lists rerun latency percentiles per step, peak
+RSS, and how often the backend was called per worksheet.
+"""
+
+import argparse
+import resource
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from gspread.exceptions import WorksheetNotFound
+from streamlit.connections import BaseConnection
+
+APP_ROOT = Path(__file__).resolve().parent.parent
+APP_SCRIPT = str(APP_ROOT / "streamlit_app.py")
+DASHBOARD_PAGE = "pages/dashboard/dashboard.py"
+INCOME_PAGE = "pages/income_and_expenses/income_and_expenses.py"
+
+USERNAME, PASSWORD = "load-test", "load-test"
+SPREADSHEET_URL = "https://docs.google.com/spreadsheets/d/load-test"
+
+# AppTest's per-run timeout; generous, since runs queue behind each other
+RUN_TIMEOUT_SECONDS = 120
+
+
+# -----------------------------
+# Stand-in backend
+# -----------------------------
+class LocalSheetsConnection(BaseConnection[dict]):
+    """
+    In-memory replacement for GSheetsConnection.
+
+    Serves `read` / `update` from a dict of frames after `latency` seconds, and
+    counts calls per worksheet. It has no gspread client, so writes take the
+    full-rewrite path.
+    """
+
+    # Set by `install_backend` before any session connects
+    worksheets: dict[str, pd.DataFrame] = {}
+    latency: float = 0.0
+    calls: Counter = Counter()
+    _calls_lock = threading.Lock()
+
+    def _connect(self, **kwargs) -> dict:
+        return {name: df.copy() for name, df in self.worksheets.items()}
+
+    def _count(self, operation: str, worksheet: str):
+        with self._calls_lock:
+            self.calls[(operation, worksheet)] += 1
+        time.sleep(self.latency)
+
+    def read(self, worksheet: str, ttl=None, **kwargs) -> pd.DataFrame:
+        self._count("read", worksheet)
+        if worksheet not in self._instance:
+            # What gspread raises, so optional worksheets behave as in production
+            raise WorksheetNotFound(worksheet)
+        return self._instance[worksheet].copy()
+
+    def update(self, worksheet: str, data: pd.DataFrame, **kwargs):
+        self._count("update", worksheet)
+        self._instance[worksheet] = data.copy()
+
+
+def synthetic_worksheets(
+    n_accounts: int = 12, months: int = 60, n_transactions: int = 5000, seed: int = 0
+) -> dict[str, pd.DataFrame]:
+    """
+    Worksheets shaped like a household's sheet: monthly balances for each account,
+    two incomes, the settings rows and a transaction ledger.
+    """
+    rng = np.random.default_rng(seed)
+    kinds = [
+        ("Investments", "Asset", "Roth 401K"),
+        ("Investments", "Asset", "Brokerage"),
+        ("Banking", "Asset", "Checking"),
+        ("Banking", "Asset", "Savings"),
+        ("Home", "Asset", "Home"),
+        ("Debt", "Liability", "Credit Card"),
+    ]
+    accounts = pd.DataFrame(
+        [
+            {
+                "institution_name": f"Institution {i % 4}",
+                "account_name": f"Account {i}",
+                "category": kinds[i % len(kinds)][0],
+                "balance_type": kinds[i % len(kinds)][1],
+                "account_type": kinds[i % len(kinds)][2],
+                "effective_start_date": "01/01/2018",
+                "effective_end_date": None,
+            }
+            for i in range(n_accounts)
+        ]
+    )
+
+    dates = pd.date_range(end=pd.Timestamp.today(), periods=months, freq="MS")
+    growth = rng.normal(1.005, 0.02, size=(months, n_accounts)).cumprod(axis=0)
+    balances = pd.DataFrame(
+        {
+            "full_date": np.repeat(dates.strftime("%m/%d/%Y"), n_accounts),
+            **{
+                col: np.tile(accounts[col], months)
+                for col in ["institution_name", "account_name", "category"]
+            },
+            "account_type": np.tile(accounts["account_type"], months),
+            "balance": (growth * rng.uniform(1e3, 2e5, n_accounts)).round(2).ravel(),
+        }
+    )
+
+    income = pd.DataFrame(
+        {
+            "individual": ["Partner A", "Partner B"],
+            "company": ["Company A", "Company B"],
+            "income": [95000, 70000],
+            "effective_start_date": ["01/01/2018", "01/01/2018"],
+            "effective_end_date": ["12/31/9999", "12/31/9999"],
+        }
+    )
+    settings = pd.DataFrame(
+        {
+            "metric": [
+                "inflation_rate",
+                "target_savings_rate",
+                "target_return_on_investment",
+                "target_retirement_age",
+                "replacement_income_rate",
+                "birthdate",
+            ],
+            "value": ["0.03", "0.15", "0.07", "60", "0.8", "01/01/1990"],
+        }
+    )
+
+    groups = ["Groceries", "Dining", "Housing", "Transport", "Income", "Savings"]
+    days = pd.to_datetime(
+        rng.choice(dates.to_numpy(), n_transactions)
+    ) + pd.to_timedelta(rng.integers(0, 28, n_transactions), unit="D")
+    transactions = pd.DataFrame(
+        {
+            "full_date": days.strftime("%m/%d/%Y"),
+            "institution_name": "Institution 2",
+            "account_name": "Account 2",
+            "description": [
+                f"Merchant {i}" for i in rng.integers(0, 300, n_transactions)
+            ],
+            "group": rng.choice(groups, n_transactions),
+            "amount": rng.normal(-60, 150, n_transactions).round(2),
+        }
+    )
+    return {
+        "accounts": accounts,
+        "balances": balances,
+        "income": income,
+        "settings": settings,
+        "transactions": transactions,
+    }
+
+
+def load_worksheets(directory: Path) -> dict[str, pd.DataFrame]:
+    """Worksheets exported as `<worksheet>.csv` files, e.g. a copy of the real sheet."""
+    return {path.stem: pd.read_csv(path) for path in sorted(directory.glob("*.csv"))}
+
+
+def install_backend(worksheets: dict[str, pd.DataFrame], latency: float):
+    """
+    Point every `st.connection(..., type=GSheetsConnection)` at the stand-in.
+
+    Must run before the app's modules are first imported: they look the class up
+    from `streamlit_gsheets` when imported (and page scripts on every rerun).
+    """
+    import streamlit_gsheets
+
+    LocalSheetsConnection.worksheets = worksheets
+    LocalSheetsConnection.latency = latency
+    streamlit_gsheets.GSheetsConnection = LocalSheetsConnection
+
+
+# -----------------------------
+# Sessions
+# -----------------------------
+def share_runtime():
+    """
+    Pin one mock Runtime for every session.
+
+    AppTest assumes one test at a time: it installs a mock Runtime before each run
+    and removes it afterwards, which breaks runs in flight in other sessions. A
+    server has a single runtime shared by all sessions, so the harness does too.
+    """
+    from unittest.mock import MagicMock
+
+    from streamlit.components.v2.component_manager import BidiComponentManager
+    from streamlit.runtime import Runtime
+    from streamlit.runtime.caching.storage.dummy_cache_storage import (
+        MemoryCacheStorageManager,
+    )
+    from streamlit.runtime.dataframe_source_manager import DataframeSourceManager
+    from streamlit.runtime.media_file_manager import MediaFileManager
+    from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+
+    runtime = MagicMock(spec=Runtime)
+    runtime.media_file_mgr = MediaFileManager(MemoryMediaFileStorage("/mock/media"))
+    runtime.dataframe_source_mgr = DataframeSourceManager()
+    runtime.cache_storage_manager = MemoryCacheStorageManager()
+    runtime.bidi_component_registry = BidiComponentManager()
+    runtime.bidi_component_registry.discover_and_register_components(
+        start_file_watching=False
+    )
+
+    Runtime.instance = classmethod(lambda cls: runtime)
+    Runtime.exists = classmethod(lambda cls: True)
+
+
+def run_session(iterations: int, timings: dict[str, list[float]], errors: list):
+    """One user: log in once, then walk the pages `iterations` times."""
+    try:
+        _walk_pages(iterations, timings, errors)
+    except Exception as e:  # e.g. a widget missing after a failed rerun
+        errors.append(f"session aborted: {e!r}")
+
+
+def _walk_pages(iterations: int, timings: dict[str, list[float]], errors: list):
+    from streamlit.testing.v1 import AppTest
+
+    def step(name: str, rerun):
+        started = time.perf_counter()
+        at = rerun()
+        elapsed = time.perf_counter() - started
+        timings[name].append(elapsed)
+        if at.exception:
+            errors.append(f"{name}: {at.exception[0].message.splitlines()[0]}")
+        return at
+
+    at = AppTest.from_file(APP_SCRIPT, default_timeout=RUN_TIMEOUT_SECONDS)
+    at.secrets["user"] = {"APP_USERNAME": USERNAME, "APP_PASSWORD": PASSWORD}
+    at.secrets["connections"] = {"gsheets": {"spreadsheet": SPREADSHEET_URL}}
+
+    at = step("home", at.run)
+    at = step("open login", at.button(key="signin-title").click().run)
+    # AppTest cannot rerun a dialog on its own, so the "Log In" click inside it is
+    # applied the way `login_user` does; the next run registers the product pages
+    at.session_state["logged_in"] = True
+    at = step("log in", at.run)
+
+    for _ in range(iterations):
+        at = step("dashboard", at.switch_page(DASHBOARD_PAGE).run)
+        at = step(
+            "spreadsheet view", at.button_group(key="nav").set_value("Spreadsheet").run
+        )
+        at = step(
+            "dashboard view", at.button_group(key="nav").set_value("Dashboard").run
+        )
+        at = step("income & expenses", at.switch_page(INCOME_PAGE).run)
+
+
+def percentile_table(timings: dict[str, list[float]]) -> pd.DataFrame:
+    """p50 / p95 / p99 / max rerun latency (ms) per step, in step order."""
+    rows = {
+        name: np.percentile(values, [50, 95, 99, 100]) * 1000
+        for name, values in timings.items()
+    }
+    table = pd.DataFrame.from_dict(
+        rows, orient="index", columns=["p50_ms", "p95_ms", "p99_ms", "max_ms"]
+    )
+    table.insert(0, "reruns", [len(values) for values in timings.values()])
+    return table.round(0)
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--sessions", type=int, default=10)
+    parser.add_argument("--iterations", type=int, default=3)
+    parser.add_argument(
+        "--latency", type=float, default=0.3, help="Seconds per backend call."
+    )
+    parser.add_argument(
+        "--data", type=Path, help="Directory of <worksheet>.csv files to serve."
+    )
+    args = parser.parse_args()
+
+    worksheets = load_worksheets(args.data) if args.data else synthetic_worksheets()
+    install_backend(worksheets, latency=args.latency)
+    share_runtime()
+
+    timings: dict[str, list[float]] = defaultdict(list)
+    errors: list[str] = []
+    sessions = [
+        threading.Thread(
+            target=run_session,
+            args=(args.iterations, timings, errors),
+            name=f"load-test-session-{i}",
+        )
+        for i in range(args.sessions)
+    ]
+
+    started = time.perf_counter()
+    for session in sessions:
+        session.start()
+    for session in sessions:
+        session.join()
+    wall = time.perf_counter() - started
+
+    print(
+        f"{args.sessions} sessions × {args.iterations} iterations in {wall:,.1f} s, "
+        f"peak RSS {peak_rss_mb():,.0f} MB"
+    )
+    print()
+    print(percentile_table(timings).to_string())
+    print()
+    print("Backend calls:")
+    for (operation, worksheet), count in sorted(LocalSheetsConnection.calls.items()):
+        print(f"    {operation:<8} {worksheet:<16} {count:>6}")
+    if errors:
+        print()
+        print(f"{len(errors)} reruns raised; first: {errors[0]}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
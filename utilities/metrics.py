@@ -0,0 +1,266 @@
+import bisect
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import streamlit as st
+
+# Defaults for the [metrics] section of .streamlit/config.toml
+DEFAULT_TEXTFILE = ".metrics/networth_tracker.prom"
+DEFAULT_EXPORT_INTERVAL_SECONDS = 15
+
+# Histogram buckets (seconds) shared by request, tile and rerun latencies
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+logger = logging.getLogger(__name__)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...], **extra) -> str:
+    pairs = [*zip(names, values), *extra.items()]
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+class Counter:
+    """Monotonic count per label set, e.g. requests or bytes."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labels: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self._values: dict[tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(str(labels[name]) for name in self.labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> list[str]:
+        with self._lock:
+            values = dict(self._values)
+        return [
+            f"{self.name}{_format_labels(self.labels, key)} {value}"
+            for key, value in sorted(values.items())
+        ]
+
+
+class Histogram:
+    """Observations per label set, counted into cumulative `le` buckets."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self.buckets = buckets
+        # label values -> (count per bucket, plus one for +Inf; sum)
+        self._values: dict[tuple[str, ...], tuple[list[int], float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(str(labels[name]) for name in self.labels)
+        with self._lock:
+            counts, total = self._values.get(key, ([0] * (len(self.buckets) + 1), 0.0))
+            counts[bisect.bisect_left(self.buckets, value)] += 1
+            self._values[key] = (counts, total + value)
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the wall time of the wrapped block, even if it raises."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def render(self) -> list[str]:
+        with self._lock:
+            values = {key: (list(c), s) for key, (c, s) in self._values.items()}
+
+        lines = []
+        for key, (counts, total) in sorted(values.items()):
+            cumulative = 0
+            for bound, count in zip([*self.buckets, "+Inf"], counts):
+                cumulative += count
+                labels = _format_labels(self.labels, key, le=bound)
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labels, key)
+            lines.append(f"{self.name}_sum{labels} {total}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class Registry:
+    """The metrics of this process, rendered in the Prometheus text format."""
+
+    def __init__(self):
+        self._metrics: list[Counter | Histogram] = []
+
+    def counter(self, *args, **kwargs) -> Counter:
+        metric = Counter(*args, **kwargs)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, *args, **kwargs) -> Histogram:
+        metric = Histogram(*args, **kwargs)
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# -----------------------------
+# Metrics
+# -----------------------------
+# Module level, like the worksheets cache: one set per server process, shared by
+# every session and the background threads
+REGISTRY = Registry()
+
+SHEET_REQUESTS = REGISTRY.counter(
+    "networth_sheet_requests_total",
+    "Google Sheets API reads and writes by outcome.",
+    ("operation", "worksheet", "status"),
+)
+SHEET_REQUEST_SECONDS = REGISTRY.histogram(
+    "networth_sheet_request_seconds",
+    "Latency of successful Google Sheets API reads and writes.",
+    ("operation", "worksheet"),
+)
+SHEET_BYTES = REGISTRY.counter(
+    "networth_sheet_bytes_total",
+    "Bytes read from and written to Google Sheets (frame size for reads and full "
+    "rewrites, request payload for row diffs).",
+    ("operation", "worksheet"),
+)
+WORKSHEET_CACHE = REGISTRY.counter(
+    "networth_worksheet_cache_total",
+    "Worksheet loads by the tier that served them (write_queue, memory, disk) or "
+    "miss when the API was called.",
+    ("worksheet", "tier"),
+)
+WORKSHEET_LOAD_SECONDS = REGISTRY.histogram(
+    "networth_worksheet_load_seconds",
+    "Time to load a worksheet through the data layer, cache hits included.",
+    ("worksheet",),
+)
+SQL_QUERY_SECONDS = REGISTRY.histogram(
+    "networth_sql_query_seconds",
+    "Time to run a read_sql query, loading its tables included.",
+    ("query",),
+)
+TILE_SECONDS = REGISTRY.histogram(
+    "networth_tile_render_seconds",
+    "Time to compute and render a page tile.",
+    ("page", "tile"),
+)
+RERUN_SECONDS = REGISTRY.histogram(
+    "networth_rerun_seconds",
+    "Wall time of a full page script rerun.",
+    ("page",),
+)
+
+
+def tile_timer(page: str, tile: str):
+    """Time a tile in a page script: `with tile_timer("dashboard", "networth"):`."""
+    return TILE_SECONDS.time(page=page, tile=tile)
+
+
+# -----------------------------
+# Export
+# -----------------------------
+def write_textfile(path: Path):
+    """Write the metrics atomically, for node_exporter's textfile collector."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(REGISTRY.render())
+    tmp.replace(path)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path != "/metrics":
+            self.send_error(404)
+            return
+        body = REGISTRY.render().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class MetricsExporter:
+    """
+    Background export of REGISTRY: rewrites `textfile` every `interval` seconds
+    and, when `port` is set, serves `/metrics` on localhost for a scraper.
+    """
+
+    def __init__(self, textfile: Path | None, port: int | None, interval: float):
+        self.textfile = textfile
+        self.interval = interval
+        self.server = None
+
+        if port:
+            self.server = ThreadingHTTPServer(("127.0.0.1", port), _MetricsHandler)
+            threading.Thread(
+                target=self.server.serve_forever, name="metrics-http", daemon=True
+            ).start()
+        if textfile is not None:
+            threading.Thread(
+                target=self._run, name="metrics-textfile", daemon=True
+            ).start()
+
+    def _run(self):
+        while True:
+            try:
+                write_textfile(self.textfile)
+            except OSError as e:  # retried next interval
+                logger.warning("Writing metrics to %s failed: %s", self.textfile, e)
+            time.sleep(self.interval)
+
+
+@st.cache_resource
+def start_metrics_exporter() -> MetricsExporter | None:
+    """Start the exporter once per server process; None when both outputs are off."""
+    from utilities.helper import get_config_value
+
+    textfile = get_config_value("metrics.textfile")
+    port = get_config_value("metrics.port")
+    interval = get_config_value("metrics.exportIntervalSeconds")
+    textfile = DEFAULT_TEXTFILE if textfile is None else textfile
+    interval = DEFAULT_EXPORT_INTERVAL_SECONDS if interval is None else interval
+
+    if not textfile and not port:
+        return None
+    return MetricsExporter(
+        textfile=Path(textfile) if textfile else None,
+        port=int(port) if port else None,
+        interval=float(interval),
+    )
@@ -0,0 +1,166 @@
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+import streamlit as st
+
+# Captured reruns are written here as folded stacks ("a;b;c <samples>" per line),
+# the format flamegraph.pl and speedscope read
+PROFILE_DIR = Path(".profiles")
+
+# Pages (by url path) that can be profiled
+PROFILED_PAGES = {"dashboard", "income_and_expenses"}
+
+SAMPLE_INTERVAL_SECONDS = 0.005
+
+_REQUEST_KEY = "profile_next_rerun"
+
+# Samplers of concurrent sessions share the interpreter's switch interval: the
+# first to start lowers it and the last to stop restores the saved value
+_switch_lock = threading.Lock()
+_active_samplers = 0
+_saved_switch_interval = 0.0
+
+
+class StackSampler:
+    """
+    Sampling profiler for one thread, driven from a background thread.
+
+    Every SAMPLE_INTERVAL_SECONDS the target thread's Python stack is read with
+    `sys._current_frames` and counted; nothing is injected into the profiled code,
+    so overhead stays low even for tight pandas `.apply` loops.
+    """
+
+    def __init__(self, thread_id: int, root_frame=None):
+        self.thread_id = thread_id
+        self.root_frame = root_frame
+        self.stacks: Counter = Counter()
+        self.started = self.stopped = 0.0
+        self._done = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="rerun-profiler", daemon=True
+        )
+
+    def start(self):
+        # The sampler needs the GIL to read stacks; hand it over more often than the
+        # default 5 ms so CPU-bound pages are still sampled at the set interval
+        global _active_samplers, _saved_switch_interval
+        with _switch_lock:
+            if _active_samplers == 0:
+                _saved_switch_interval = sys.getswitchinterval()
+                sys.setswitchinterval(SAMPLE_INTERVAL_SECONDS / 5)
+            _active_samplers += 1
+        self.started = time.perf_counter()
+        self._thread.start()
+
+    def stop(self):
+        self._done.set()
+        self._thread.join()
+        self.stopped = time.perf_counter()
+        global _active_samplers
+        with _switch_lock:
+            _active_samplers -= 1
+            if _active_samplers == 0:
+                sys.setswitchinterval(_saved_switch_interval)
+
+    def _run(self):
+        while not self._done.wait(SAMPLE_INTERVAL_SECONDS):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.stacks[self._stack(frame)] += 1
+
+    def _stack(self, frame) -> tuple[str, ...]:
+        names = []
+        while frame is not None:
+            names.append(frame_label(frame))
+            if frame is self.root_frame:
+                break
+            frame = frame.f_back
+        return tuple(reversed(names))
+
+
+def frame_label(frame) -> str:
+    """`function (path:line)` for a frame, with paths shortened to the package."""
+    code = frame.f_code
+    path = Path(code.co_filename)
+    for marker in ("site-packages", "lib"):
+        if marker in path.parts:
+            path = Path(*path.parts[path.parts.index(marker) + 1 :])
+            break
+    else:
+        try:
+            path = path.relative_to(Path.cwd())
+        except ValueError:
+            pass
+    # Semicolons separate frames in the folded format
+    return f"{code.co_name} ({path}:{code.co_firstlineno})".replace(";", ",")
+
+
+def request_profile():
+    """Button callback: profile the rerun this click triggers."""
+    st.session_state[_REQUEST_KEY] = True
+
+
+@contextmanager
+def profile_rerun(page: str):
+    """
+    Sample the wrapped rerun if a profile was requested for a profiled page.
+
+    Parameters:
+    - page (str): Url path of the page being run.
+    """
+    if page not in PROFILED_PAGES or not st.session_state.pop(_REQUEST_KEY, False):
+        yield
+        return
+
+    # Stacks are trimmed at the caller (the app script) to skip Streamlit's runner
+    sampler = StackSampler(threading.get_ident(), root_frame=sys._getframe(2))
+    sampler.start()
+    try:
+        yield
+    finally:
+        # Also runs when the page ends with st.rerun / st.stop
+        sampler.stop()
+        path = write_profile(page, sampler)
+        st.toast(f"Profile saved to `{path}`", icon="⏱️")
+
+
+def write_profile(page: str, sampler: StackSampler) -> Path:
+    """Write a sampler's stacks to PROFILE_DIR in folded format."""
+    PROFILE_DIR.mkdir(exist_ok=True)
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    path = PROFILE_DIR / f"{page}-{stamp}.folded"
+    with open(path, "w") as f:
+        f.write(f"# seconds {sampler.stopped - sampler.started:.3f}\n")
+        for stack, count in sampler.stacks.most_common():
+            f.write(f"{';'.join(stack)} {count}\n")
+    return path
+
+
+def list_profiles() -> list[Path]:
+    """Saved profiles, newest first."""
+    if not PROFILE_DIR.exists():
+        return []
+    return sorted(PROFILE_DIR.glob("*.folded"), reverse=True)
+
+
+def load_profile(path: Path) -> tuple[Counter, float]:
+    """
+    Read a folded-stack profile.
+
+    Returns:
+    - tuple[Counter, float]: Samples per stack, and the wall time of the rerun.
+    """
+    stacks, seconds = Counter(), 0.0
+    with open(path) as f:
+        for line in f:
+            if line.startswith("# seconds"):
+                seconds = float(line.split()[-1])
+                continue
+            stack, _, count = line.rstrip("\n").rpartition(" ")
+            stacks[tuple(stack.split(";"))] += int(count)
+    return stacks, seconds
@@ -0,0 +1,260 @@
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+from streamlit_gsheets import GSheetsConnection
+
+from utilities.account_dimension import get_account_dimension
+from utilities.attribution import get_period_flows
+from utilities.currency import currency_version
+from utilities.gsheets import worksheet_version
+from utilities.snapshots import get_asof_balances
+
+DAYS_PER_YEAR = 365.25
+
+# Lookback windows offered on the dashboard, in years (None: since the first snapshot)
+RETURN_WINDOWS = {"1 Year": 1, "3 Years": 3, "5 Years": 5, "All Time": None}
+
+# Safeguarded Newton iteration for the IRR, bracketed in annual rates
+IRR_BRACKET = (-0.99, 10.0)
+IRR_TOLERANCE = 1e-10
+IRR_MAX_ITERATIONS = 100
+
+RETURN_COLUMNS = [
+    "level",
+    "name",
+    "category",
+    "start_balance",
+    "end_balance",
+    "contributions",
+    "gain",
+    "years",
+    "twr",
+    "twr_annualized",
+    "irr",
+]
+
+
+def time_weighted_returns(balances: np.ndarray, flows: np.ndarray) -> np.ndarray:
+    """
+    Cumulative time-weighted return of each column.
+
+    Each snapshot period's return is the Modified Dietz return with the period's
+    flows assumed at mid-period, (end - start - flows) / (start + flows / 2). The
+    period returns are chained, so deposits and withdrawals do not move the result.
+
+    Parameters:
+    - balances (np.ndarray): Snapshots × accounts.
+    - flows (np.ndarray): Snapshots × accounts, from `period_flows` (row 0 ignored).
+
+    Returns:
+    - np.ndarray: Cumulative return per column (0 where nothing was invested).
+    """
+    start, end, net = balances[:-1], balances[1:], flows[1:]
+    base = start + net / 2
+    period = np.divide(end - start - net, base, out=np.zeros_like(base), where=base > 0)
+    return np.prod(1 + np.maximum(period, -1), axis=0) - 1
+
+
+def _npv(rates: np.ndarray, cash: np.ndarray, years: np.ndarray):
+    """Net present value of each column and its derivative with respect to the rate."""
+    discount = cash * (1 + rates) ** -years
+    slope = -years * discount / (1 + rates)
+    return discount.sum(axis=0), slope.sum(axis=0)
+
+
+def money_weighted_returns(cash: np.ndarray, years: np.ndarray) -> np.ndarray:
+    """
+    Annual internal rate of return of every column of cash flows at once.
+
+    Each iteration takes a Newton step for all columns together; a column whose
+    step leaves its bracket (or whose derivative vanishes) bisects instead, and
+    the bracket shrinks around the sign change, so every column converges.
+
+    Parameters:
+    - cash (np.ndarray): Snapshots × series, investor's view (deposits negative,
+      the final balance positive).
+    - years (np.ndarray): Snapshots × series, years since each series started.
+
+    Returns:
+    - np.ndarray: IRR per series; NaN where the flows have no sign change in the
+      bracket.
+    """
+    n = cash.shape[1]
+    lo, hi = np.full(n, IRR_BRACKET[0]), np.full(n, IRR_BRACKET[1])
+    f_lo, _ = _npv(lo, cash, years)
+    f_hi, _ = _npv(hi, cash, years)
+    solvable = np.sign(f_lo) != np.sign(f_hi)
+
+    rates = np.where(solvable, 0.05, np.nan)
+    active = solvable.copy()
+    for _ in range(IRR_MAX_ITERATIONS):
+        if not active.any():
+            break
+        f, slope = _npv(rates[active], cash[:, active], years[:, active])
+
+        # Keep the root bracketed: replace the bound whose NPV has the same sign
+        same_as_lo = np.sign(f) == np.sign(f_lo[active])
+        lo[active] = np.where(same_as_lo, rates[active], lo[active])
+        f_lo[active] = np.where(same_as_lo, f, f_lo[active])
+        hi[active] = np.where(same_as_lo, hi[active], rates[active])
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            newton = rates[active] - f / slope
+        inside = np.isfinite(newton) & (newton > lo[active]) & (newton < hi[active])
+        step = np.where(inside, newton, (lo[active] + hi[active]) / 2)
+
+        converged = np.abs(step - rates[active]) < IRR_TOLERANCE
+        rates[active] = step
+        active[np.flatnonzero(active)[converged]] = False
+    return rates
+
+
+def _cash_flows(
+    balances: np.ndarray, flows: np.ndarray, dates: np.ndarray
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Investor-view cash flows and their times for each column's active span.
+
+    A column starts at its first snapshot with a balance or flow, which counts as
+    a deposit of that balance; later flows are deposits (or withdrawals), and the
+    last balance is what the investor would get back.
+
+    Returns:
+    - tuple: cash (snapshots × columns), years since each column's start (same
+      shape, 0 before it), and the length of each column's span in years.
+    """
+    rows = np.arange(len(balances))[:, None]
+    columns = np.arange(balances.shape[1])
+    first = ((balances != 0) | (flows != 0)).argmax(axis=0)
+
+    cash = np.where(rows > first, -flows, 0.0)
+    cash[first, columns] -= balances[first, columns]
+    cash[-1] += balances[-1]
+
+    elapsed = (dates - dates[0]) / np.timedelta64(1, "D") / DAYS_PER_YEAR
+    years = np.maximum(elapsed[:, None] - elapsed[first], 0)
+    return cash, years, years[-1]
+
+
+def realized_returns(
+    asof: pd.DataFrame,
+    flows: pd.DataFrame,
+    dimension: pd.DataFrame,
+    years: Optional[int] = None,
+) -> pd.DataFrame:
+    """
+    Time-weighted and money-weighted returns per asset account and per category.
+
+    Liability accounts are left out. Category returns treat the category's
+    accounts as one portfolio.
+
+    Parameters:
+    - asof (pd.DataFrame): Date × account_id matrix from `get_asof_balances`.
+    - flows (pd.DataFrame): Output of `period_flows` for the same matrix.
+    - dimension (pd.DataFrame): Account dimension from `get_account_dimension`.
+    - years (int): Lookback in years, from the last snapshot on or before its
+      start; None for all history.
+
+    Returns:
+    - pd.DataFrame: RETURN_COLUMNS, one row per account (`level` "Account") and
+      per category (`level` "Category"). `twr` is cumulative over the span; `irr`
+      and `twr_annualized` are annual rates.
+    """
+    dim = dimension.set_index("account_id").reindex(asof.columns)
+    assets = (dim["balance_type"] != "Liability").to_numpy()
+    asof, flows, dim = asof.loc[:, assets], flows.loc[:, assets], dim[assets]
+
+    if years is not None and len(asof):
+        since = asof.index[-1] - pd.DateOffset(years=years)
+        start = max(asof.index.searchsorted(since, side="right") - 1, 0)
+        asof, flows = asof.iloc[start:], flows.iloc[start:]
+    if len(asof) < 2:
+        return pd.DataFrame(columns=RETURN_COLUMNS)
+
+    # Accounts, then the same columns summed per category, in one matrix
+    category = dim["category"].fillna("Other")
+    category_balances = asof.T.groupby(category).sum().T
+    category_flows = flows.T.groupby(category).sum().T
+    categories = list(category_balances.columns)
+    balances = np.hstack([asof.to_numpy(), category_balances.to_numpy()])
+    net_flows = np.hstack([flows.to_numpy(), category_flows.to_numpy()])
+    # Flows up to the first snapshot belong to the balance it already shows
+    net_flows[0] = 0
+
+    cash, elapsed, span = _cash_flows(balances, net_flows, asof.index.to_numpy())
+    twr = time_weighted_returns(balances, net_flows)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        twr_annualized = np.where(span > 0, (1 + twr) ** (1 / span) - 1, np.nan)
+    first = ((balances != 0) | (net_flows != 0)).argmax(axis=0)
+
+    df = pd.DataFrame(
+        {
+            "level": ["Account"] * asof.shape[1] + ["Category"] * len(categories),
+            "name": [
+                *(dim["institution_name"] + " - " + dim["account_name"]),
+                *categories,
+            ],
+            "category": [*category, *categories],
+            "start_balance": balances[first, np.arange(balances.shape[1])],
+            "end_balance": balances[-1],
+            "contributions": net_flows.sum(axis=0),
+            "years": span,
+            "twr": twr,
+            "twr_annualized": twr_annualized,
+            "irr": money_weighted_returns(cash, elapsed),
+        }
+    )
+    df["gain"] = df["end_balance"] - df["start_balance"] - df["contributions"]
+    invested = (balances != 0).any(axis=0)
+    return df[invested][RETURN_COLUMNS].reset_index(drop=True)
+
+
+# -----------------------------
+# Cached returns
+# -----------------------------
+@st.cache_data(show_spinner=False)
+def _realized_returns(
+    _conn: GSheetsConnection,
+    balances_version: int,
+    accounts_version: int,
+    transactions_version: int,
+    currency_version: tuple,
+    years: Optional[int],
+) -> pd.DataFrame:
+    return realized_returns(
+        asof=get_asof_balances(conn=_conn),
+        flows=get_period_flows(conn=_conn),
+        dimension=get_account_dimension(conn=_conn),
+        years=years,
+    )
+
+
+def get_realized_returns(
+    conn: GSheetsConnection, years: Optional[int] = None
+) -> pd.DataFrame:
+    """
+    `realized_returns` for the current worksheets, rebuilt only when `balances`,
+    `accounts`, `transactions` or the FX rates change.
+    """
+    return _realized_returns(
+        _conn=conn,
+        **{
+            f"{ws}_version": worksheet_version(conn=conn, worksheet=ws)
+            for ws in ["balances", "accounts", "transactions"]
+        },
+        currency_version=currency_version(conn=conn),
+        years=years,
+    )
+
+
+def realized_return(
+    conn: GSheetsConnection, category: str = "Investments"
+) -> Optional[float]:
+    """Money-weighted annual return of `category` over all history, if it has one."""
+    returns = get_realized_returns(conn=conn)
+    row = returns[(returns["level"] == "Category") & (returns["name"] == category)]
+    if row.empty or pd.isna(row["irr"].iloc[0]):
+        return None
+    return float(row["irr"].iloc[0])
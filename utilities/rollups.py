@@ -0,0 +1,126 @@
+import threading
+
+import pandas as pd
+import streamlit as st
+from streamlit_gsheets import GSheetsConnection
+
+# Selector label -> pandas period frequency (None = raw snapshots)
+GRANULARITIES = {
+    "Daily": None,
+    "Weekly": "W",
+    "Monthly": "M",
+    "Quarterly": "Q",
+    "Yearly": "Y",
+}
+
+STATISTICS = ["last", "mean", "min", "max"]
+
+
+def bucket_aggregates(daily: pd.DataFrame, freq: str) -> dict:
+    """
+    Aggregate a date-indexed frame into calendar buckets.
+
+    Parameters:
+    - daily (pd.DataFrame): One row per snapshot date, one column per series.
+    - freq (str): Pandas period frequency ("W", "M", "Q", "Y").
+
+    Returns:
+    - dict: Aggregate name -> frame (or Series for count / last_date) indexed by period.
+    """
+    buckets = daily.index.to_period(freq)
+    grouped = daily.groupby(buckets)
+    dates = pd.Series(daily.index, index=buckets).groupby(level=0)
+    return {
+        "sum": grouped.sum(),
+        "count": grouped.size(),
+        "min": grouped.min(),
+        "max": grouped.max(),
+        "last": grouped.last(),
+        "last_date": dates.max(),
+    }
+
+
+class RollupStore:
+    """
+    Last / mean / min / max per bucket, precomputed at every granularity.
+
+    The buckets are rebuilt once per version of the source worksheets, so
+    switching granularity or statistic on a rerun is a lookup.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        self.daily = pd.DataFrame()
+        self._rollups: dict[str, dict] = {}
+
+    def sync(self, daily: pd.DataFrame, version: tuple):
+        """
+        Rebuild every rollup when `version` differs from the last sync.
+
+        Parameters:
+        - daily (pd.DataFrame): Snapshot values indexed by ascending, unique date.
+        - version (tuple): Content versions of the worksheets `daily` was built from.
+        """
+        with self._lock:
+            if version == self._version:
+                return
+            self._rollups = {
+                label: bucket_aggregates(daily, freq)
+                for label, freq in GRANULARITIES.items()
+                if freq is not None
+            }
+            self.daily = daily
+            self._version = version
+
+    def series(
+        self, granularity: str = "Daily", statistic: str = "last"
+    ) -> pd.DataFrame:
+        """
+        Return one statistic per bucket.
+
+        Parameters:
+        - granularity (str): Key of GRANULARITIES.
+        - statistic (str): One of STATISTICS.
+
+        Returns:
+        - pd.DataFrame: Indexed by the last snapshot date in each bucket, so the
+          chart ends on the latest balance even while a bucket is still open.
+        """
+        with self._lock:
+            if GRANULARITIES[granularity] is None:
+                return self.daily
+            rollup = self._rollups[granularity]
+
+        if statistic == "mean":
+            values = rollup["sum"].div(rollup["count"], axis=0)
+        else:
+            values = rollup[statistic]
+        return values.set_axis(pd.DatetimeIndex(rollup["last_date"].to_numpy()))
+
+
+@st.cache_resource
+def get_rollup_store(_conn: GSheetsConnection, name: str) -> RollupStore:
+    """One rollup store per named series per server process."""
+    return RollupStore()
+
+
+def get_rollups(
+    conn: GSheetsConnection, name: str, daily: pd.DataFrame, version: tuple
+) -> RollupStore:
+    """
+    Return the rollup store for `name`, synced with `daily`.
+
+    Parameters:
+    - conn (GSheetsConnection): Connection the series was read from.
+    - name (str): Series name, e.g. "networth" or "category".
+    - daily (pd.DataFrame): Snapshot values indexed by date.
+    - version (tuple): Content versions `daily` was built from, e.g.
+      `asof_version(conn)`.
+
+    Returns:
+    - RollupStore: Store whose rollups reflect `daily`.
+    """
+    store = get_rollup_store(conn, name)
+    store.sync(daily.sort_index(), version=version)
+    return store
@@ -0,0 +1,176 @@
+from dataclasses import dataclass
+from typing import Optional
+
+import pandas as pd
+
+# Worksheet data starts below the header row (0-based grid index 1)
+HEADER_ROWS = 1
+
+
+@dataclass
+class RowDiff:
+    """
+    Keyed difference between the rows loaded from a worksheet and an edited copy.
+
+    Index labels are the 0-based data row positions of the loaded worksheet, so
+    label `i` lives on grid row `i + HEADER_ROWS`.
+    """
+
+    updated: pd.DataFrame
+    inserted: pd.DataFrame
+    deleted: pd.Index
+
+    @property
+    def is_empty(self) -> bool:
+        return self.updated.empty and self.inserted.empty and self.deleted.empty
+
+    def summary(self) -> str:
+        return (
+            f"{len(self.updated)} changed, {len(self.inserted)} added, "
+            f"{len(self.deleted)} removed"
+        )
+
+
+def changed_rows(a: pd.DataFrame, b: pd.DataFrame) -> pd.Series:
+    """
+    Boolean mask of rows that differ between two aligned frames.
+
+    NaN == NaN and 1 == 1.0 count as equal, so dtype changes from the editor
+    (e.g. integers upcast to float after a blank row is added) are not edits.
+    """
+    same = (a == b) | (a.isna() & b.isna())
+    return ~same.all(axis=1)
+
+
+def matches_sheet(base: pd.DataFrame, current: pd.DataFrame) -> bool:
+    """
+    Check that `base` is still a label-for-position copy of the worksheet.
+
+    Row positions are only valid keys if nobody changed the sheet since `base`
+    was loaded, so `current` must be a fresh read of the sheet, not a cached
+    copy; on a mismatch the caller falls back to a full rewrite.
+    """
+    if len(base) != len(current) or set(base.columns) != set(current.columns):
+        return False
+    base = base.sort_index()
+    if not base.index.equals(pd.RangeIndex(len(current))):
+        return False
+    current = current.reset_index(drop=True)[list(base.columns)]
+    return not changed_rows(base, current).any()
+
+
+def diff_rows(base: pd.DataFrame, edited: pd.DataFrame) -> Optional[RowDiff]:
+    """
+    Compute inserted, updated and deleted rows keyed on the index.
+
+    Parameters:
+    - base (pd.DataFrame): Worksheet as loaded, indexed by data row position.
+    - edited (pd.DataFrame): Edited copy; `st.data_editor` keeps the labels of
+      existing rows and gives added rows new labels.
+
+    Returns:
+    - RowDiff or None: None when a row diff cannot describe the edit (columns
+      changed or labels are not unique), in which case the sheet is rewritten.
+    """
+    if set(base.columns) != set(edited.columns):
+        return None
+    if not (base.index.is_unique and edited.index.is_unique):
+        return None
+    if not pd.api.types.is_integer_dtype(base.index):
+        return None
+
+    edited = edited[list(base.columns)]
+    common = base.index.intersection(edited.index)
+    is_changed = changed_rows(base.loc[common], edited.loc[common])
+
+    return RowDiff(
+        updated=edited.loc[common[is_changed.to_numpy()]].sort_index(),
+        inserted=edited.loc[edited.index.difference(base.index, sort=False)],
+        deleted=base.index.difference(edited.index),
+    )
+
+
+def _tsv(df: pd.DataFrame) -> str:
+    """Tab-separated rows for a pasteData request; blanks for missing values."""
+    cleaned = df.astype(object).where(df.notna(), "")
+    return "\n".join(
+        "\t".join(str(v).replace("\t", " ").replace("\n", " ") for v in row)
+        for row in cleaned.itertuples(index=False)
+    )
+
+
+def row_diff_requests(
+    sheet_id: int, diff: RowDiff, n_rows: int, grid_rows: int
+) -> list[dict]:
+    """
+    Build one spreadsheets.batchUpdate body that applies a RowDiff.
+
+    Values are sent with pasteData so the sheet parses them as if typed in (the same
+    USER_ENTERED behaviour as a full update). Requests run in order: updated rows
+    are pasted in place, inserted rows below the last data row (growing the grid if
+    needed), then deleted rows are removed bottom-up so earlier positions hold.
+
+    Parameters:
+    - sheet_id (int): Worksheet (tab) id.
+    - diff (RowDiff): Rows to change.
+    - n_rows (int): Data rows in the loaded worksheet.
+    - grid_rows (int): Current row count of the worksheet grid.
+
+    Returns:
+    - list[dict]: Requests for `Spreadsheet.batch_update({"requests": ...})`.
+    """
+    requests = []
+
+    def paste(row_index: int, rows: pd.DataFrame):
+        requests.append(
+            {
+                "pasteData": {
+                    "coordinate": {
+                        "sheetId": sheet_id,
+                        "rowIndex": row_index,
+                        "columnIndex": 0,
+                    },
+                    "data": _tsv(rows),
+                    "type": "PASTE_NORMAL",
+                    "delimiter": "\t",
+                }
+            }
+        )
+
+    # Consecutive labels are pasted as one block
+    labels = diff.updated.index.to_series()
+    blocks = (labels.diff() != 1).cumsum()
+    for _, block in diff.updated.groupby(blocks.to_numpy()):
+        paste(int(block.index[0]) + HEADER_ROWS, block)
+
+    if not diff.inserted.empty:
+        first_row = n_rows + HEADER_ROWS
+        shortfall = first_row + len(diff.inserted) - grid_rows
+        if shortfall > 0:
+            requests.append(
+                {
+                    "appendDimension": {
+                        "sheetId": sheet_id,
+                        "dimension": "ROWS",
+                        "length": int(shortfall),
+                    }
+                }
+            )
+        paste(first_row, diff.inserted)
+
+    for label in sorted(diff.deleted, reverse=True):
+        start = int(label) + HEADER_ROWS
+        requests.append(
+            {
+                "deleteDimension": {
+                    "range": {
+                        "sheetId": sheet_id,
+                        "dimension": "ROWS",
+                        "startIndex": start,
+                        "endIndex": start + 1,
+                    }
+                }
+            }
+        )
+
+    return requests
@@ -0,0 +1,151 @@
+import logging
+import random
+import threading
+import time
+from typing import TYPE_CHECKING
+
+import streamlit as st
+
+if TYPE_CHECKING:
+    from streamlit_gsheets import GSheetsConnection
+
+# Defaults for the [warmCache] section of .streamlit/config.toml
+DEFAULT_INTERVAL_SECONDS = 600
+DEFAULT_JITTER_SECONDS = 60
+
+WORKSHEETS = ["settings", "accounts", "income", "balances", "transactions"]
+
+logger = logging.getLogger(__name__)
+
+
+def warm_aggregates(conn: "GSheetsConnection"):
+    """
+    Build the cached dashboard and income aggregates for the current worksheets.
+
+    Uses the same cached builders (and arguments) as the page tiles, so the next
+    page load finds them already computed.
+    """
+    # Imported here (as in run_once): streamlit_app.py imports this module, and the
+    # data layer should stay off the cold-start path of pages that do not need it
+    from utilities.account_dimension import get_account_dimension
+    from utilities.aggregates import (
+        fi_targets,
+        monthly_transactions,
+        networth_series,
+        retirement_margin_projection,
+    )
+    from utilities.attribution import get_attribution
+    from utilities.gsheets import read_settings
+    from utilities.returns import get_realized_returns
+    from utilities.risk import get_balance_risk
+    from utilities.rollups import get_rollups
+    from utilities.snapshots import asof_version
+    from utilities.wide_balances import get_wide_balances
+
+    settings = read_settings(conn=conn)
+    get_account_dimension(conn=conn)
+
+    networth_df = networth_series(conn=conn)
+    get_rollups(
+        conn=conn,
+        name="networth",
+        daily=networth_df.set_index("full_date"),
+        version=asof_version(conn=conn),
+    )
+    get_balance_risk(conn=conn)
+    get_wide_balances(conn=conn)
+    monthly_transactions(conn=conn)
+    get_attribution(conn=conn)
+    get_realized_returns(conn=conn)
+
+    if settings["replacement_income_rate"] is not None:
+        fi_targets(
+            conn=conn, replacement_income_rate=settings["replacement_income_rate"]
+        )
+    if all(value is not None for value in settings.values()):
+        retirement_margin_projection(conn=conn, **settings)
+
+
+class WarmCacheScheduler:
+    """
+    Process-wide background thread that keeps worksheets and aggregates warm.
+
+    Every `interval` seconds (± `jitter`, so several app processes do not hit the
+    Sheets API in lockstep) each worksheet is refetched ahead of its TTL and the
+    aggregates are rebuilt for any worksheet that changed.
+    """
+
+    def __init__(self, conn: "GSheetsConnection", interval: float, jitter: float):
+        self._conn = conn
+        self.interval = interval
+        self.jitter = jitter
+        self._lock = threading.Lock()
+        self._status = {"runs": 0, "last_run": None, "duration": None, "error": None}
+
+        self._thread = threading.Thread(
+            target=self._run, name="warm-cache-scheduler", daemon=True
+        )
+        self._thread.start()
+
+    def status(self) -> dict:
+        """Snapshot of the last warm-up: run count, start time, duration, error."""
+        with self._lock:
+            return dict(self._status)
+
+    def next_delay(self) -> float:
+        return max(0.0, self.interval + random.uniform(-self.jitter, self.jitter))
+
+    def run_once(self):
+        """Refresh every worksheet, then rebuild the aggregates."""
+        from utilities.sheets_client import get_sheets_client
+
+        started = time.time()
+        error = None
+        try:
+            client = get_sheets_client(self._conn)
+            for worksheet in WORKSHEETS:
+                client.refresh(worksheet)
+            warm_aggregates(self._conn)
+        except Exception as e:  # keep the thread alive; retried next interval
+            logger.warning("Warm-cache run failed: %s", e)
+            error = str(e)
+
+        with self._lock:
+            self._status.update(
+                runs=self._status["runs"] + 1,
+                last_run=started,
+                duration=time.time() - started,
+                error=error,
+            )
+
+    def _run(self):
+        # Warm immediately after boot, then on the interval
+        while True:
+            self.run_once()
+            time.sleep(self.next_delay())
+
+
+@st.cache_resource
+def get_warm_cache_scheduler(
+    _conn: "GSheetsConnection",
+) -> WarmCacheScheduler | None:
+    """Start the scheduler once per server process; None when disabled."""
+    from utilities.helper import get_config_value
+
+    interval = get_config_value("warmCache.intervalSeconds")
+    jitter = get_config_value("warmCache.jitterSeconds")
+    interval = DEFAULT_INTERVAL_SECONDS if interval is None else float(interval)
+    jitter = DEFAULT_JITTER_SECONDS if jitter is None else float(jitter)
+
+    if interval <= 0:
+        return None
+    return WarmCacheScheduler(_conn, interval=interval, jitter=min(jitter, interval))
+
+
+def start_warm_cache():
+    """Ensure the warm-cache scheduler is running for the app's connection."""
+    # Imported here, like the data layer in warm_aggregates
+    from streamlit_gsheets import GSheetsConnection
+
+    conn = st.connection("gsheets", type=GSheetsConnection)
+    return get_warm_cache_scheduler(conn)
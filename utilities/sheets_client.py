@@ -0,0 +1,427 @@
+import hashlib
+import json
+import logging
+import random
+import threading
+import time
+from typing import Callable, Optional
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+from gspread.exceptions import WorksheetNotFound
+from streamlit_gsheets import GSheetsConnection
+
+from utilities.disk_cache import DiskCache, get_disk_cache
+from utilities.metrics import (
+    SHEET_BYTES,
+    SHEET_REQUEST_SECONDS,
+    SHEET_REQUESTS,
+    WORKSHEET_CACHE,
+)
+from utilities.row_diff import RowDiff, row_diff_requests
+
+# Google Sheets API defaults: 60 read and 60 write requests per minute per user
+READS_PER_MINUTE = 60
+WRITES_PER_MINUTE = 60
+
+# A worksheet read costs a metadata lookup plus the values request
+READ_COST = 2
+
+# How long a fetched worksheet is served without asking the API again
+READ_TTL_SECONDS = 3600
+
+# Backoff after a quota error (full jitter, capped)
+MAX_ATTEMPTS = 5
+BASE_BACKOFF_SECONDS = 1.0
+MAX_BACKOFF_SECONDS = 32.0
+
+# Longest a caller waits for a token before falling back to the cached copy
+TOKEN_WAIT_SECONDS = 10.0
+
+logger = logging.getLogger(__name__)
+
+
+class QuotaExceededError(Exception):
+    """Raised when the Sheets API stays throttled and no cached copy exists."""
+
+
+def is_quota_error(error: Exception) -> bool:
+    """Detect HTTP 429 / RESOURCE_EXHAUSTED responses from gspread or requests."""
+    response = getattr(error, "response", None)
+    if getattr(response, "status_code", None) == 429:
+        return True
+    message = str(error)
+    return "429" in message or "RESOURCE_EXHAUSTED" in message
+
+
+def backoff_delay(attempt: int) -> float:
+    """Full-jitter exponential backoff for the given 1-based attempt."""
+    cap = min(MAX_BACKOFF_SECONDS, BASE_BACKOFF_SECONDS * 2 ** (attempt - 1))
+    return random.uniform(0, cap)
+
+
+def frame_bytes(df: pd.DataFrame) -> int:
+    """In-memory size of a frame, the stand-in for bytes transferred."""
+    return int(df.memory_usage(index=False, deep=True).sum())
+
+
+def frame_version(df: pd.DataFrame) -> int:
+    """
+    Content hash of a worksheet frame.
+
+    Derived caches key on this value, so they are invalidated only when the
+    worksheet they depend on actually changes.
+    """
+    rows = pd.util.hash_pandas_object(df, index=False).to_numpy(dtype="<u8")
+    # hash_array and blake2b are seeded with fixed keys (unlike hash() on str), so
+    # versions are stable across processes and can be stored with the on-disk
+    # snapshots. Digesting the row hashes in order makes reordered rows a new version
+    header = np.array(["\x1f".join(map(str, df.columns))], dtype=object)
+    digest = hashlib.blake2b(pd.util.hash_array(header).tobytes(), digest_size=8)
+    digest.update(rows.tobytes())
+    return int.from_bytes(digest.digest(), "little")
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket holding at most `capacity` tokens, refilled continuously.
+    """
+
+    def __init__(self, capacity: int, per_seconds: float = 60.0):
+        self.capacity = capacity
+        self.rate = capacity / per_seconds
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+    def available(self) -> float:
+        with self._lock:
+            self._refill()
+            return self._tokens
+
+    def acquire(self, tokens: int = 1, timeout: float = TOKEN_WAIT_SECONDS) -> bool:
+        """Take `tokens`, waiting up to `timeout` seconds. Returns False on timeout."""
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return True
+                wait = (tokens - self._tokens) / self.rate
+            if time.monotonic() + wait > deadline:
+                return False
+            time.sleep(wait)
+
+
+class _Flight:
+    """A request in progress that concurrent callers can wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Optional[pd.DataFrame] = None
+        self.error: Optional[Exception] = None
+
+
+class SheetsClient:
+    """
+    Quota-aware access to the worksheets behind a GSheetsConnection.
+
+    - Reads and writes draw from separate token buckets sized to the API quota.
+    - Identical concurrent reads share one request (single-flight).
+    - 429 responses trigger jittered exponential backoff; while throttled, reads
+      are served from the last good copy of the worksheet.
+    - With a disk cache, every fetched worksheet is also snapshotted to disk. After
+      a restart the snapshot is served at once and revalidated in the background.
+    """
+
+    def __init__(self, conn: GSheetsConnection, disk: Optional[DiskCache] = None):
+        self._conn = conn
+        self._disk = disk
+        self._lock = threading.Lock()
+        self.read_bucket = TokenBucket(READS_PER_MINUTE)
+        self.write_bucket = TokenBucket(WRITES_PER_MINUTE)
+
+        # worksheet -> (fetched_at, frame, version); kept past the TTL as last good copy
+        self._cache: dict[str, tuple[float, pd.DataFrame, int]] = {}
+        # worksheet -> when it was found missing; optional worksheets (rules,
+        # budgets) are not looked up again until the TTL runs out or a refresh
+        self._missing: dict[str, float] = {}
+        self._flights: dict[str, _Flight] = {}
+        self._throttled_until = 0.0
+
+    # --- Reads ---
+    def read(self, worksheet: str) -> pd.DataFrame:
+        """
+        Return a copy of `worksheet`, fetching it only when the cached copy expired.
+
+        Parameters:
+        - worksheet (str): Worksheet name.
+
+        Returns:
+        - pd.DataFrame: Worksheet contents (possibly a stale copy while throttled).
+
+        Raises:
+        - WorksheetNotFound: The spreadsheet has no such worksheet.
+        """
+        missing_at = self._missing.get(worksheet)
+        if missing_at is not None and time.time() - missing_at < READ_TTL_SECONDS:
+            raise WorksheetNotFound(worksheet)
+        cached, tier = self._cache.get(worksheet), "memory"
+        if cached is None and self._from_disk(worksheet):
+            cached, tier = self._cache[worksheet], "disk"
+        if cached is not None and time.time() - cached[0] < READ_TTL_SECONDS:
+            WORKSHEET_CACHE.inc(worksheet=worksheet, tier=tier)
+            return cached[1].copy()
+        WORKSHEET_CACHE.inc(worksheet=worksheet, tier="miss")
+        return self._single_flight(worksheet, self._fetch).copy()
+
+    def version(self, worksheet: str) -> int:
+        """Content version of `worksheet`, reading it if it is not cached yet."""
+        if worksheet not in self._cache:
+            self.read(worksheet)
+        return self._cache[worksheet][2]
+
+    def refresh(self, worksheet: str) -> pd.DataFrame:
+        """Fetch `worksheet` now, ahead of its TTL; keeps the cached copy if throttled."""
+        self.invalidate(worksheet)
+        return self.read(worksheet)
+
+    def read_fresh(self, worksheet: str) -> Optional[pd.DataFrame]:
+        """
+        Fetch `worksheet` from the API now, ahead of its TTL.
+
+        Returns:
+        - pd.DataFrame or None: The live worksheet, or None when the read was
+          throttled and only the cached copy was available.
+        """
+        started = time.time()
+        df = self.refresh(worksheet)
+        cached = self._cache.get(worksheet)
+        return df if cached is not None and cached[0] >= started else None
+
+    def invalidate(self, worksheet: Optional[str] = None):
+        """Expire one worksheet (or all) so the next read refetches it."""
+        with self._lock:
+            if worksheet is None:
+                self._missing.clear()
+            keys = [worksheet] if worksheet else list(self._cache)
+            for key in keys:
+                self._missing.pop(key, None)
+                if key in self._cache:
+                    _, df, version = self._cache[key]
+                    self._cache[key] = (0.0, df, version)
+
+    # --- Disk tier ---
+    def _from_disk(self, worksheet: str) -> bool:
+        """
+        Seed the in-memory cache from the disk snapshot and revalidate it in the
+        background. Returns False when there is no snapshot.
+        """
+        if self._disk is None:
+            return False
+        with self._lock:
+            if worksheet in self._cache:
+                return True
+            snapshot = self._disk.get(f"worksheet.{worksheet}")
+            if snapshot is None:
+                return False
+            df, meta = snapshot
+            # Served as fresh until the background fetch replaces it; if that cannot
+            # fetch, the snapshot expires so the next read retries
+            seeded_at = time.time()
+            self._cache[worksheet] = (seeded_at, df, meta["version"])
+
+        threading.Thread(
+            target=self._revalidate,
+            args=(worksheet, seeded_at),
+            name=f"revalidate-{worksheet}",
+            daemon=True,
+        ).start()
+        return True
+
+    def _revalidate(self, worksheet: str, seeded_at: float):
+        try:
+            # Off the rerun path, so wait for a read token rather than settling for
+            # the snapshot when the bucket is momentarily empty
+            self._single_flight(worksheet, lambda key: self._fetch(key, wait=True))
+        except Exception as e:  # the snapshot keeps being served as last good copy
+            logger.warning("Revalidating '%s' failed: %s", worksheet, e)
+        with self._lock:
+            cached = self._cache.get(worksheet)
+            if cached is not None and cached[0] == seeded_at:
+                self._cache[worksheet] = (0.0, cached[1], cached[2])
+
+    def _to_disk(self, worksheet: str, df: pd.DataFrame, version: int):
+        if self._disk is not None:
+            self._disk.put(
+                f"worksheet.{worksheet}", df, version=version, fetched_at=time.time()
+            )
+
+    def _single_flight(
+        self, key: str, fetch: Callable[[str], pd.DataFrame]
+    ) -> pd.DataFrame:
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+
+        if leader:
+            try:
+                flight.result = fetch(key)
+            except Exception as e:
+                flight.error = e
+            finally:
+                with self._lock:
+                    del self._flights[key]
+                flight.done.set()
+        else:
+            flight.done.wait()
+
+        if flight.error is not None:
+            raise flight.error
+        return flight.result
+
+    def _last_good(self, worksheet: str) -> Optional[pd.DataFrame]:
+        cached = self._cache.get(worksheet)
+        return cached[1] if cached is not None else None
+
+    def _fetch(self, worksheet: str, wait: bool = False) -> pd.DataFrame:
+        """
+        Read `worksheet` from the API. With a cached copy, that copy is returned
+        instead while throttled or when no read token is free (right away, or
+        after TOKEN_WAIT_SECONDS if `wait`).
+        """
+        for attempt in range(1, MAX_ATTEMPTS + 1):
+            stale = self._last_good(worksheet)
+            throttled = time.time() < self._throttled_until
+            timeout = TOKEN_WAIT_SECONDS if wait else 0
+            if stale is not None and (
+                throttled or not self.read_bucket.acquire(READ_COST, timeout=timeout)
+            ):
+                return stale
+            if stale is None and not self.read_bucket.acquire(READ_COST):
+                time.sleep(backoff_delay(attempt))
+                continue
+
+            started = time.perf_counter()
+            try:
+                df = self._conn.read(worksheet=worksheet, ttl=0)
+            except Exception as e:
+                if isinstance(e, WorksheetNotFound):
+                    with self._lock:
+                        self._missing[worksheet] = time.time()
+                quota = is_quota_error(e)
+                SHEET_REQUESTS.inc(
+                    operation="read",
+                    worksheet=worksheet,
+                    status="throttled" if quota else "error",
+                )
+                if not quota:
+                    raise
+                delay = backoff_delay(attempt)
+                self._throttled_until = max(self._throttled_until, time.time() + delay)
+                if stale is not None:
+                    return stale
+                time.sleep(delay)
+                continue
+
+            SHEET_REQUEST_SECONDS.observe(
+                time.perf_counter() - started, operation="read", worksheet=worksheet
+            )
+            SHEET_REQUESTS.inc(operation="read", worksheet=worksheet, status="ok")
+            SHEET_BYTES.inc(frame_bytes(df), operation="read", worksheet=worksheet)
+
+            version = frame_version(df)
+            with self._lock:
+                self._cache[worksheet] = (time.time(), df, version)
+            self._to_disk(worksheet, df, version)
+            return df
+
+        raise QuotaExceededError(f"Sheets API quota exhausted reading '{worksheet}'.")
+
+    # --- Writes ---
+    def _call_write(
+        self,
+        worksheet: str,
+        write: Callable[[], object],
+        operation: str,
+        payload_bytes: int,
+    ):
+        labels = {"operation": operation, "worksheet": worksheet}
+        for attempt in range(1, MAX_ATTEMPTS + 1):
+            if not self.write_bucket.acquire():
+                continue
+            started = time.perf_counter()
+            try:
+                write()
+                break
+            except Exception as e:
+                quota = is_quota_error(e)
+                SHEET_REQUESTS.inc(**labels, status="throttled" if quota else "error")
+                if not quota or attempt == MAX_ATTEMPTS:
+                    raise
+                time.sleep(backoff_delay(attempt))
+        else:
+            raise QuotaExceededError(
+                f"Sheets API quota exhausted writing '{worksheet}'."
+            )
+        SHEET_REQUEST_SECONDS.observe(time.perf_counter() - started, **labels)
+        SHEET_REQUESTS.inc(**labels, status="ok")
+        SHEET_BYTES.inc(payload_bytes, **labels)
+        self.invalidate(worksheet)
+
+    def write(self, worksheet: str, df: pd.DataFrame):
+        """
+        Replace the contents of `worksheet` with `df`, adding the worksheet when the
+        spreadsheet has none yet (optional tabs such as rules, budgets and goals
+        are read as empty frames until their first save).
+        """
+
+        def update():
+            try:
+                self._conn.update(worksheet=worksheet, data=df)
+            except WorksheetNotFound:
+                self._conn.create(worksheet=worksheet, data=df)
+
+        self._call_write(
+            worksheet, update, operation="write", payload_bytes=frame_bytes(df)
+        )
+
+    def apply_row_diff(self, worksheet: str, diff: RowDiff, n_rows: int) -> bool:
+        """
+        Apply inserted, updated and deleted rows in a single batchUpdate request.
+
+        Returns:
+        - bool: False when the connection cannot edit ranges (e.g. public sheets).
+        """
+        try:
+            sheet = self._conn.client._select_worksheet(worksheet=worksheet)
+        except AttributeError:
+            return False
+
+        requests = row_diff_requests(
+            sheet_id=sheet.id, diff=diff, n_rows=n_rows, grid_rows=sheet.row_count
+        )
+        self._call_write(
+            worksheet,
+            lambda: sheet.spreadsheet.batch_update({"requests": requests}),
+            operation="row_diff",
+            payload_bytes=len(json.dumps(requests, default=str)),
+        )
+        return True
+
+
+@st.cache_resource
+def get_sheets_client(_conn: GSheetsConnection) -> SheetsClient:
+    """One client (and quota budget) per server process."""
+    return SheetsClient(_conn, disk=get_disk_cache())
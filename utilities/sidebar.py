@@ -1,7 +1,19 @@
 import streamlit as st
-from streamlit_extras.stylable_container import stylable_container
-from utilities.gsheets import *
+from streamlit_gsheets import GSheetsConnection
+from utilities.gsheets import (
+    add_balance_records,
+    edit_balance_records,
+    delete_balance_records,
+    edit_transaction_records,
+    delete_transaction_records,
+    update_accounts,
+    update_income,
+)
 from utilities.auth import logout_button
+from utilities.categorizer import categorization_rules__dialog
+from utilities.importer import import_records__dialog
+from utilities.profiler import request_profile
+from utilities.write_queue import render_write_status
 
 conn = st.connection("gsheets", type=GSheetsConnection)
 
@@ -38,7 +50,13 @@ def show_app_sidebar():
         # Transactions
         st.markdown("##### Transaction")
 
-        add_transaction_records(conn=conn)
+        if st.button(
+            type="primary",
+            use_container_width=True,
+            label="Add Transactions",
+            key="add_transaction_button_control",
+        ):
+            import_records__dialog(conn=conn)
 
         transaction_columns = st.columns(2)
         with transaction_columns[0]:
@@ -47,6 +65,14 @@ def show_app_sidebar():
         with transaction_columns[1]:
             delete_transaction_records(conn=conn)
 
+        if st.button(
+            type="secondary",
+            use_container_width=True,
+            label="Categorization Rules",
+            key="categorization_rules_button_control",
+        ):
+            categorization_rules__dialog(conn=conn)
+
         # Accounts / Income
         st.markdown("##### Management")
 
@@ -69,8 +95,20 @@ def show_app_sidebar():
             ):
                 update_income(conn=conn)
 
-        # Logout
+        # Background Saves
         st.write("---")
+        render_write_status(conn=conn)
+
+        # Profiling (captured by streamlit_app.py and shown on the Profiler page)
+        st.button(
+            label="Profile Next Rerun",
+            use_container_width=True,
+            on_click=request_profile,
+            key="profile_rerun_button_control",
+            help="Sample this page's next rerun and save it for the Profiler page.",
+        )
+
+        # Logout
         logout_button(key="sidebar_logout")
 
         return view_type
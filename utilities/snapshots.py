@@ -0,0 +1,185 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+from streamlit_gsheets import GSheetsConnection
+
+from utilities.account_dimension import account_ids, get_account_dimension
+from utilities.currency import currency_version, fx_matrix, load_fx_rates
+from utilities.gsheets import effective_window, load_worksheet, worksheet_version
+
+
+def account_windows(accounts: pd.DataFrame, observed: pd.DataFrame) -> pd.DataFrame:
+    """
+    Active window of every account in `observed`.
+
+    Parameters:
+    - accounts (pd.DataFrame): Rows of the `accounts` worksheet.
+    - observed (pd.DataFrame): Date × account_id balances, NaN where not reported.
+
+    Returns:
+    - pd.DataFrame: `start` and `end` per account_id. A reopened account spans its
+      earliest start to its latest end. Accounts missing from the sheet (or without a
+      start date) are active from their first reported balance; missing accounts stay
+      active only until their last reported balance.
+    """
+    start, end = effective_window(accounts)
+    windows = (
+        pd.DataFrame({"account_id": account_ids(accounts), "start": start, "end": end})
+        .groupby("account_id")
+        .agg(start=("start", "min"), end=("end", "max"))
+        .reindex(observed.columns)
+    )
+
+    reported = observed.notna()
+    first_seen = reported.idxmax()
+    last_seen = reported[::-1].idxmax() + pd.Timedelta(days=1)
+
+    return windows.assign(
+        start=windows["start"].fillna(first_seen),
+        end=windows["end"].fillna(last_seen),
+    )
+
+
+def observed_balances(balances: pd.DataFrame) -> pd.DataFrame:
+    """
+    Date × account_id matrix of the balances as reported, NaN where an account
+    has no row on a date.
+    """
+    facts = pd.DataFrame(
+        {
+            "dt": pd.to_datetime(balances["full_date"], errors="coerce"),
+            "account_id": account_ids(balances),
+            "balance": pd.to_numeric(balances["balance"], errors="coerce"),
+        }
+    ).dropna(subset=["dt", "balance"])
+
+    return facts.pivot_table(
+        index="dt", columns="account_id", values="balance", aggfunc="sum"
+    ).sort_index()
+
+
+def asof_matrix(balances: pd.DataFrame, accounts: pd.DataFrame) -> pd.DataFrame:
+    """
+    Dense date × account balance matrix with last-known balances carried forward.
+
+    An account that was not updated on a snapshot date keeps its previous balance
+    while it is active, instead of counting as 0.
+
+    Parameters:
+    - balances (pd.DataFrame): Rows of the `balances` worksheet.
+    - accounts (pd.DataFrame): Rows of the `accounts` worksheet.
+
+    Returns:
+    - pd.DataFrame: One row per snapshot date (ascending), one column per account_id;
+      0 outside an account's active window.
+    """
+    observed = observed_balances(balances)
+    windows = account_windows(accounts, observed)
+
+    dates = observed.index.to_numpy()[:, np.newaxis]
+    active = (dates >= windows["start"].to_numpy()) & (
+        dates < windows["end"].to_numpy()
+    )
+    return observed.ffill().where(active, 0).fillna(0).rename_axis("full_date")
+
+
+@st.cache_data(show_spinner=False)
+def _native_balances(
+    _conn: GSheetsConnection, balances_version: int, accounts_version: int
+) -> pd.DataFrame:
+    return asof_matrix(
+        balances=load_worksheet(conn=_conn, worksheet="balances"),
+        accounts=load_worksheet(conn=_conn, worksheet="accounts"),
+    )
+
+
+@st.cache_data(show_spinner=False)
+def _fx_rates(
+    _conn: GSheetsConnection,
+    balances_version: int,
+    accounts_version: int,
+    currency_version: tuple,
+) -> tuple[pd.DataFrame, list[str]]:
+    native = _native_balances(_conn, balances_version, accounts_version)
+    dim = get_account_dimension(conn=_conn).set_index("account_id")
+    rates, missing = fx_matrix(
+        native.index,
+        dim["currency"].reindex(native.columns),
+        load_fx_rates(conn=_conn),
+        base=currency_version[1],
+    )
+    return pd.DataFrame(rates, index=native.index, columns=native.columns), missing
+
+
+@st.cache_data(show_spinner=False)
+def _asof_balances(
+    _conn: GSheetsConnection,
+    balances_version: int,
+    accounts_version: int,
+    currency_version: tuple,
+) -> pd.DataFrame:
+    native = _native_balances(_conn, balances_version, accounts_version)
+    rates, _ = _fx_rates(_conn, balances_version, accounts_version, currency_version)
+    return native * rates
+
+
+def _versions(conn: GSheetsConnection) -> dict:
+    return {
+        "balances_version": worksheet_version(conn=conn, worksheet="balances"),
+        "accounts_version": worksheet_version(conn=conn, worksheet="accounts"),
+        "currency_version": currency_version(conn=conn),
+    }
+
+
+def asof_version(conn: GSheetsConnection) -> tuple:
+    """
+    Key for caches built from `get_asof_balances`: the `balances` and `accounts`
+    versions and `currency_version(conn)`.
+    """
+    return tuple(_versions(conn).values())
+
+
+def get_asof_balances(conn: GSheetsConnection) -> pd.DataFrame:
+    """
+    As-of balance matrix in the base currency, rebuilt only when `balances`,
+    `accounts` or `fx_rates` (or the base currency) changes.
+
+    Tiles slice rows (dates) and group columns through the account dimension, e.g.
+    `group_accounts(matrix, conn, "category")`, rather than pivoting the sheet.
+    Caches built from it should be keyed on `asof_version(conn)`.
+    """
+    return _asof_balances(_conn=conn, **_versions(conn))
+
+
+def get_fx_rates(conn: GSheetsConnection) -> pd.DataFrame:
+    """
+    Rate applied to each account on each snapshot date, shaped like
+    `get_asof_balances` (1 for accounts in the base currency).
+    """
+    return _fx_rates(_conn=conn, **_versions(conn))[0]
+
+
+def missing_fx_currencies(conn: GSheetsConnection) -> list[str]:
+    """Account currencies without any `fx_rates` quote; they are counted at 1."""
+    return _fx_rates(_conn=conn, **_versions(conn))[1]
+
+
+def group_accounts(
+    matrix: pd.DataFrame, conn: GSheetsConnection, by: str | list[str]
+) -> pd.DataFrame:
+    """
+    Sum account columns of an as-of matrix by account dimension attribute(s).
+
+    Parameters:
+    - matrix (pd.DataFrame): Slice of `get_asof_balances`.
+    - conn (GSheetsConnection): Connection used to load the account dimension.
+    - by (str | list[str]): Column(s) of the account dimension, e.g. "category" or
+      ["institution_name", "account_name"].
+
+    Returns:
+    - pd.DataFrame: Same rows as `matrix`, one column per group.
+    """
+    dim = get_account_dimension(conn=conn).set_index("account_id")
+    keys = dim.reindex(matrix.columns)[by]
+    groups = [keys[col] for col in by] if isinstance(by, list) else keys
+    return matrix.T.groupby(groups).sum().T
@@ -0,0 +1,186 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+from streamlit_gsheets import GSheetsConnection
+
+from utilities.disk_cache import get_disk_cache
+from utilities.gsheets import load_worksheet, worksheet_version
+from utilities.importer import TRANSACTION_COLUMNS, parse_amounts
+
+# Disk cache key of the typed copy of the `transactions` worksheet
+CACHE_KEY = "transactions.typed"
+
+CATEGORICAL_COLUMNS = ["institution_name", "account_name", "group"]
+
+# Transfers into savings are not spending; excluded from spending summaries
+SAVINGS_GROUP = "Savings"
+
+# Paychecks and other inflows; forecast from the `income` worksheet, not as spending
+INCOME_GROUP = "Income"
+
+
+def to_cents(amounts: pd.Series) -> pd.Series:
+    """
+    Convert dollar amounts to exact int64 cents.
+
+    Parameters:
+    - amounts (pd.Series): Numbers or bank-formatted strings (e.g. "$1,234.50").
+
+    Returns:
+    - pd.Series: Cents, rounded half to even; unparseable values are <NA>.
+    """
+    dollars = parse_amounts(amounts)
+    return pd.Series(np.rint(dollars * 100), index=amounts.index).astype("Int64")
+
+
+def parse_dates(values: pd.Series) -> pd.Series:
+    """
+    Parse the sheet's MM/DD/YYYY dates, falling back to inference for others.
+
+    A ledger has far fewer distinct dates than rows, so each distinct string is
+    parsed once and the result is broadcast back by factorized code.
+    """
+    codes, uniques = pd.factorize(values)
+    uniques = pd.Series(uniques)
+    parsed = pd.to_datetime(uniques, format="%m/%d/%Y", errors="coerce")
+    retry = parsed.isna()
+    if retry.any():
+        parsed[retry] = pd.to_datetime(uniques[retry], errors="coerce")
+
+    dates = parsed.to_numpy()[codes]
+    dates[codes == -1] = np.datetime64("NaT")
+    return pd.Series(dates, index=values.index, dtype="datetime64[ns]")
+
+
+def type_transactions(raw: pd.DataFrame) -> pd.DataFrame:
+    """
+    Convert raw worksheet rows to compact, typed columns.
+
+    - `full_date`: datetime64
+    - `institution_name`, `account_name`, `group`: category
+    - `description`: string (Arrow-backed)
+    - `amount_cents`: int64
+
+    Rows without a parseable date or amount are dropped, as on import.
+
+    Parameters:
+    - raw (pd.DataFrame): Rows of the `transactions` worksheet.
+
+    Returns:
+    - pd.DataFrame: Typed transactions in sheet order.
+    """
+    raw = raw.reindex(columns=TRANSACTION_COLUMNS)
+    df = pd.DataFrame(
+        {
+            "full_date": parse_dates(raw["full_date"]),
+            **{
+                col: raw[col].astype("string[pyarrow]").str.strip().astype("category")
+                for col in CATEGORICAL_COLUMNS
+            },
+            "description": raw["description"].astype("string[pyarrow]"),
+            "amount_cents": to_cents(raw["amount"]),
+        }
+    )
+    df = df.dropna(subset=["full_date", "amount_cents"])
+    return df.astype({"amount_cents": "int64"}).reset_index(drop=True)
+
+
+def _restore_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    # Parquet restores plain Python strings; keep the Arrow-backed storage
+    return df.astype(
+        {
+            "description": "string[pyarrow]",
+            **{
+                col: pd.CategoricalDtype(
+                    df[col].cat.categories.astype("string[pyarrow]")
+                )
+                for col in CATEGORICAL_COLUMNS
+            },
+        }
+    )
+
+
+@st.cache_resource(max_entries=1, show_spinner=False)
+def _typed_transactions(_conn: GSheetsConnection, version: int) -> pd.DataFrame:
+    disk = get_disk_cache()
+    cached = disk.get(CACHE_KEY) if disk is not None else None
+    if cached is not None and cached[1].get("version") == version:
+        return _restore_dtypes(cached[0])
+
+    df = type_transactions(load_worksheet(conn=_conn, worksheet="transactions"))
+    if disk is not None:
+        disk.put(CACHE_KEY, df, version=version)
+    return df
+
+
+def get_transactions(conn: GSheetsConnection) -> pd.DataFrame:
+    """
+    Typed transactions, shared by every session until the worksheet changes.
+
+    The frame is built once per worksheet version and kept in memory and on disk
+    (parquet keeps the categorical and integer dtypes). It is shared, not copied, so
+    callers must not modify it in place.
+    """
+    return _typed_transactions(
+        _conn=conn, version=worksheet_version(conn=conn, worksheet="transactions")
+    )
+
+
+def month_group_cents(transactions: pd.DataFrame) -> pd.Series:
+    """
+    Sum transactions per calendar month and group, in cents.
+
+    Parameters:
+    - transactions (pd.DataFrame): Rows shaped like the output of `get_transactions`.
+
+    Returns:
+    - pd.Series: int64 cents indexed by (`full_date` month start, `group` as str).
+      Uncategorized rows are left out.
+    """
+    cents = transactions.groupby(
+        [transactions["full_date"].dt.to_period("M").dt.to_timestamp(), "group"],
+        observed=True,
+    )["amount_cents"].sum()
+    # Plain string groups, so sums from ledgers with different categories align
+    cents.index = pd.MultiIndex.from_arrays(
+        [
+            cents.index.get_level_values(0),
+            cents.index.get_level_values(1).astype(str),
+        ],
+        names=["full_date", "group"],
+    )
+    return cents.astype("int64")
+
+
+def monthly_group_totals(
+    cents: pd.Series, exclude: tuple[str, ...] = (SAVINGS_GROUP,)
+) -> pd.DataFrame:
+    """
+    Month × group totals as a long frame in dollars.
+
+    Parameters:
+    - cents (pd.Series): Output of `month_group_cents`.
+    - exclude (tuple[str]): Groups to leave out.
+
+    Returns:
+    - pd.DataFrame: `full_date` (month start), `group`, `total_amount` in dollars.
+      Sums are taken on integer cents, so they are exact.
+    """
+    cents = cents[~cents.index.get_level_values("group").isin(exclude)]
+    totals = cents.rename("amount_cents").reset_index()
+    return totals.assign(total_amount=totals.pop("amount_cents") / 100)
+
+
+@st.cache_data(show_spinner=False)
+def _month_group_cents(_conn: GSheetsConnection, version: int) -> pd.Series:
+    return month_group_cents(_typed_transactions(_conn, version)).sort_index()
+
+
+def get_month_group_cents(conn: GSheetsConnection) -> pd.Series:
+    """
+    Month × group cents for the current ledger (see `month_group_cents`), grouped
+    once per `transactions` version.
+    """
+    return _month_group_cents(
+        _conn=conn, version=worksheet_version(conn=conn, worksheet="transactions")
+    )
@@ -0,0 +1,105 @@
+import threading
+from typing import Callable, Optional
+
+import pandas as pd
+import streamlit as st
+from streamlit_gsheets import GSheetsConnection
+
+from utilities.snapshots import asof_version, get_asof_balances, group_accounts
+
+ACCOUNT_COLUMNS = ["institution_name", "account_name"]
+TOTAL_COLUMN = ("Total", "Networth")
+
+
+class WideBalanceStore:
+    """
+    Date × (institution, account) balance matrix behind the spreadsheet view.
+
+    The matrix is the as-of balance matrix (balances carried forward within each
+    account's active window) grouped into account columns. The store regroups it
+    and adds the Total column once per `asof_version`, so reruns only slice pages.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        self.wide = pd.DataFrame()
+
+    def sync(self, version: tuple, build: Callable[[], pd.DataFrame]) -> pd.DataFrame:
+        """
+        Rebuild the wide frame when the source worksheets changed.
+
+        Parameters:
+        - version (tuple): Content versions of the source worksheets.
+        - build (Callable): Returns the date × (institution, account) balances; only
+          called when `version` differs from the last sync.
+
+        Returns:
+        - pd.DataFrame: The wide frame, with the Total column first.
+        """
+        with self._lock:
+            if version != self._version:
+                self.wide = self._with_total(build())
+                self._version = version
+            return self.wide
+
+    @staticmethod
+    def _with_total(accounts: pd.DataFrame) -> pd.DataFrame:
+        wide = accounts.copy()
+        wide.insert(0, TOTAL_COLUMN, accounts.to_numpy().sum(axis=1))
+        return wide.sort_index()
+
+    def window(
+        self,
+        start_date: Optional[pd.Timestamp] = None,
+        end_date: Optional[pd.Timestamp] = None,
+        accounts: Optional[list[tuple]] = None,
+        page: int = 1,
+        page_size: int = 50,
+    ) -> tuple[pd.DataFrame, int]:
+        """
+        Slice one page of the wide frame, newest dates first.
+
+        Parameters:
+        - start_date, end_date (pd.Timestamp): Inclusive date range (None = open).
+        - accounts (list[tuple]): (institution, account) columns to include; the Total
+          column is always included. None selects every account.
+        - page (int): 1-based page number.
+        - page_size (int): Rows per page.
+
+        Returns:
+        - tuple[pd.DataFrame, int]: The page and the number of rows in the date range.
+        """
+        with self._lock:
+            wide = self.wide
+
+        rows = wide.loc[start_date:end_date]
+        columns = [TOTAL_COLUMN] + (
+            list(accounts)
+            if accounts is not None
+            else [c for c in wide.columns if c != TOTAL_COLUMN]
+        )
+
+        # Newest first: take positions from the end of the ascending index
+        total_rows = len(rows)
+        stop = max(total_rows - (page - 1) * page_size, 0)
+        start = max(stop - page_size, 0)
+        return rows.iloc[start:stop][columns].iloc[::-1], total_rows
+
+
+@st.cache_resource
+def get_wide_balance_store(_conn: GSheetsConnection) -> WideBalanceStore:
+    """One wide-balance store per server process."""
+    return WideBalanceStore()
+
+
+def get_wide_balances(conn: GSheetsConnection) -> WideBalanceStore:
+    """Return the wide-balance store, synced with the current as-of balances."""
+    store = get_wide_balance_store(conn)
+    store.sync(
+        asof_version(conn=conn),
+        lambda: group_accounts(
+            get_asof_balances(conn=conn), conn=conn, by=ACCOUNT_COLUMNS
+        ),
+    )
+    return store
@@ -0,0 +1,214 @@
+import random
+import threading
+import time
+from typing import Optional
+
+import pandas as pd
+import streamlit as st
+from streamlit_gsheets import GSheetsConnection
+
+from utilities.row_diff import diff_rows, matches_sheet
+from utilities.sheets_client import get_sheets_client
+
+# Retry policy for background flushes
+MAX_RETRIES = 6
+BASE_DELAY_SECONDS = 1.0
+MAX_DELAY_SECONDS = 60.0
+
+# How often the sidebar save status refreshes while writes are in flight
+STATUS_POLL_SECONDS = 2
+
+
+class WriteBehindQueue:
+    """
+    Process-wide queue that flushes worksheet updates to Google Sheets in the background.
+
+    Each worksheet holds at most one pending write: repeated edits replace the queued
+    frame (coalescing) while keeping the frame the sheet had before the first edit,
+    so a flush sends only the rows that differ between the two. Reads go through
+    `optimistic` so the UI sees its own writes before they land.
+    """
+
+    def __init__(self, conn: GSheetsConnection):
+        self._client = get_sheets_client(conn)
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+
+        # worksheet -> (frame on the sheet, frame to write)
+        self._pending: dict[str, tuple[pd.DataFrame, pd.DataFrame]] = {}
+        self._inflight: dict[str, tuple[pd.DataFrame, pd.DataFrame]] = {}
+        self._status: dict[str, dict] = {}
+
+        self._worker = threading.Thread(
+            target=self._run, name="sheets-write-behind", daemon=True
+        )
+        self._worker.start()
+
+    # --- Public API ---
+    def enqueue(self, worksheet: str, df: pd.DataFrame, base: pd.DataFrame):
+        """
+        Queue `df` as the new contents of `worksheet` and return immediately.
+
+        Parameters:
+        - worksheet (str): Worksheet name.
+        - df (pd.DataFrame): Full desired contents of the worksheet.
+        - base (pd.DataFrame): Contents the sheet had when the edit started.
+        """
+        with self._lock:
+            if worksheet in self._pending:
+                base = self._pending[worksheet][0]
+                coalesced = self._status[worksheet].get("coalesced", 0) + 1
+            else:
+                # An in-flight write may still fail, so the sheet is only known
+                # to hold its base; a successful flush rebases this entry
+                base = self._inflight.get(worksheet, (base, None))[0]
+                coalesced = 0
+            self._pending[worksheet] = (base.copy(), df.copy())
+            self._status[worksheet] = {
+                "state": "pending",
+                "attempts": 0,
+                "coalesced": coalesced,
+                "error": None,
+            }
+        self._wake.set()
+
+    def optimistic(self, worksheet: str) -> Optional[pd.DataFrame]:
+        """Return the queued or in-flight frame for `worksheet`, if any."""
+        with self._lock:
+            if worksheet in self._pending:
+                return self._pending[worksheet][1].copy()
+            if worksheet in self._inflight:
+                return self._inflight[worksheet][1].copy()
+        return None
+
+    def status(self) -> dict[str, dict]:
+        """Snapshot of flush state per worksheet that is not yet saved."""
+        with self._lock:
+            return {ws: dict(s) for ws, s in self._status.items()}
+
+    def retry_failed(self):
+        """Re-arm worksheets whose flush gave up after MAX_RETRIES."""
+        with self._lock:
+            for status in self._status.values():
+                if status["state"] == "failed":
+                    status.update(state="pending", attempts=0, error=None)
+        self._wake.set()
+
+    # --- Worker ---
+    def _next_ready(self) -> Optional[tuple[str, pd.DataFrame, pd.DataFrame]]:
+        with self._lock:
+            for worksheet, (base, df) in self._pending.items():
+                if self._status[worksheet]["state"] != "failed":
+                    del self._pending[worksheet]
+                    self._inflight[worksheet] = (base, df)
+                    self._status[worksheet]["state"] = "flushing"
+                    return worksheet, base, df
+        return None
+
+    def _run(self):
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+            while (item := self._next_ready()) is not None:
+                self._flush_with_retry(*item)
+
+    def _flush_with_retry(self, worksheet: str, base: pd.DataFrame, df: pd.DataFrame):
+        for attempt in range(1, MAX_RETRIES + 1):
+            try:
+                self._flush(worksheet, base, df)
+                break
+            except Exception as e:  # gspread raises several unrelated types
+                with self._lock:
+                    superseded = worksheet in self._pending
+                    self._status[worksheet].update(
+                        state="retrying", attempts=attempt, error=str(e)
+                    )
+                if superseded:
+                    # A newer edit is queued; it carries the same base, so retry that
+                    with self._lock:
+                        self._inflight.pop(worksheet, None)
+                    return
+                delay = min(MAX_DELAY_SECONDS, BASE_DELAY_SECONDS * 2 ** (attempt - 1))
+                time.sleep(delay * random.uniform(0.5, 1.0))
+        else:
+            # Keep the frame queued so the edit is not lost; the sidebar offers a retry
+            with self._lock:
+                self._inflight.pop(worksheet, None)
+                if worksheet in self._pending:
+                    self._status[worksheet]["state"] = "pending"
+                else:
+                    self._pending[worksheet] = (base, df)
+                    self._status[worksheet]["state"] = "failed"
+            return
+
+        # The client has already expired its cached copy of the worksheet
+        with self._lock:
+            self._inflight.pop(worksheet, None)
+            if worksheet in self._pending:
+                self._pending[worksheet] = (df, self._pending[worksheet][1])
+            else:
+                del self._status[worksheet]
+
+    def _flush(self, worksheet: str, base: pd.DataFrame, df: pd.DataFrame):
+        # Only send changed rows when `base` still mirrors the live sheet row for
+        # row: the cached copy can be up to a TTL old, and positional updates
+        # against a sheet edited since would hit the wrong rows
+        diff = None
+        if not base.empty:
+            live = self._client.read_fresh(worksheet)
+            if live is not None and matches_sheet(base, live):
+                diff = diff_rows(base, df)
+
+        if diff is not None and diff.is_empty:
+            return
+        if diff is not None and self._client.apply_row_diff(
+            worksheet, diff, n_rows=len(base)
+        ):
+            return
+
+        self._client.write(worksheet, df)
+
+
+@st.cache_resource
+def get_write_queue(_conn: GSheetsConnection) -> WriteBehindQueue:
+    """One write-behind queue (and worker thread) per server process."""
+    return WriteBehindQueue(_conn)
+
+
+def render_write_status(conn: GSheetsConnection):
+    """
+    Show the background save state in the sidebar, polling while writes are pending.
+
+    Idle sessions do not poll: the fragment only gets a `run_every` when the rerun
+    finds writes in flight (a save made later in the run, or in a dialog, is
+    picked up by the next rerun), and once they settle it reruns the page, which
+    renders it again without one. Failed writes wait for "Retry Save".
+    """
+    queue = get_write_queue(conn)
+    in_flight = any(s["state"] != "failed" for s in queue.status().values())
+
+    @st.fragment(run_every=STATUS_POLL_SECONDS if in_flight else None)
+    def write_status():
+        status = queue.status()
+        if in_flight and all(s["state"] == "failed" for s in status.values()):
+            st.rerun()
+
+        if not status:
+            st.caption("✅ All changes saved")
+            return
+
+        failed = [ws for ws, s in status.items() if s["state"] == "failed"]
+        retrying = {ws: s for ws, s in status.items() if s["state"] == "retrying"}
+
+        if failed:
+            st.error(f"Could not save **{', '.join(failed)}**.", icon="⚠️")
+            if st.button("Retry Save", use_container_width=True):
+                queue.retry_failed()
+                st.rerun()
+        elif retrying:
+            ws, s = next(iter(retrying.items()))
+            st.warning(f"Retrying **{ws}** (attempt {s['attempts']})...", icon="⏳")
+        else:
+            st.caption(f"⏳ Saving {', '.join(status)}...")
+
+    write_status()